@@ -1,14 +1,20 @@
 import configparser
 import os
-from collections import defaultdict
+import sys
 
 from PySide6.QtCore import Qt, QUrl
 from PySide6.QtGui import QDesktopServices
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QFileDialog, QMessageBox,
-    QVBoxLayout, QHBoxLayout, QWidget, QPushButton, QTextEdit, QLabel, QLineEdit, QTreeWidget, QTreeWidgetItem
+    QVBoxLayout, QHBoxLayout, QWidget, QPushButton, QLabel, QLineEdit, QTreeWidget, QTreeWidgetItem
 )
 
+# 扫描、搜索与结果文本使用主程序的 Manager.ClassifierEngine，结果按块写入的 utils.ResultView 也与主程序共用
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'top', 'dwgx'))
+
+from Manager import ClassifierEngine  # noqa: E402
+from utils.ResultView import ResultView  # noqa: E402
+
 CONFIG_FILE = 'config.cfg'
 
 
@@ -38,39 +44,6 @@ def save_config(folder_path, filter_types, exclude_types):
         config.write(config_file)
 
 
-def scan_files(folder_path, filter_types, exclude_types):
-    file_dict = defaultdict(list)
-
-    for root, _, files in os.walk(folder_path):
-        for file in files:
-            if filter_types and not any(file.lower().endswith(ft) for ft in filter_types):
-                continue
-            if exclude_types and any(file.lower().endswith(et) for et in exclude_types):
-                continue
-            file_dict[root].append(os.path.join(root, file))
-
-    return file_dict
-
-
-def display_results(file_dict):
-    result_text = ""
-    for folder, files in file_dict.items():
-        result_text += f'文件夹: {folder}\n'
-        result_text += f'数量: {len(files)}\n'
-        for file in files:
-            result_text += f'  - {file}\n'
-        result_text += '\n'
-    return result_text
-
-
-def search_files(file_dict, keyword):
-    keyword_lower = keyword.lower()
-    return {
-        folder: [file for file in files if keyword_lower in os.path.basename(file).lower()]
-        for folder, files in file_dict.items() if any(keyword_lower in os.path.basename(file).lower() for file in files)
-    }
-
-
 class FileClassifierApp(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -144,7 +117,7 @@ class FileClassifierApp(QMainWindow):
 
         result_and_tree_layout = QHBoxLayout()
 
-        self.result_text = QTextEdit()
+        self.result_text = ResultView()
         result_and_tree_layout.addWidget(self.result_text)
         self.tree_widget = QTreeWidget()
         self.tree_widget.setHeaderLabels(["文件关系树"])
@@ -160,20 +133,19 @@ class FileClassifierApp(QMainWindow):
 
     def start_scan(self):
         folder_path = self.folder_path_entry.text().strip()
-        filter_types = self.filter_entry.text().strip().split(',') if self.filter_entry.text().strip() else []
-        exclude_types = self.exclude_entry.text().strip().split(',') if self.exclude_entry.text().strip() else []
+        filter_types = ClassifierEngine.parse_types(self.filter_entry.text())
+        exclude_types = ClassifierEngine.parse_types(self.exclude_entry.text())
 
         if not folder_path:
             QMessageBox.warning(self, "警告", "请先选择文件夹路径")
             return
 
-        self.result_text.clear()
+        self.result_text.clear_results()
 
         save_config(folder_path, filter_types, exclude_types)
 
-        self.file_dict = scan_files(folder_path, filter_types, exclude_types)
-        result_text = display_results(self.file_dict)
-        self.result_text.insertPlainText(result_text)
+        self.file_dict = ClassifierEngine.scan_files(folder_path, filter_types, exclude_types)
+        self.result_text.show_results(self.file_dict)
 
     def show_graph(self):
         self.tree_widget.clear()
@@ -203,10 +175,8 @@ class FileClassifierApp(QMainWindow):
             QMessageBox.warning(self, "警告", "请先进行文件扫描")
             return
 
-        filtered_dict = search_files(self.file_dict, keyword)
-        result_text = display_results(filtered_dict)
-        self.result_text.clear()
-        self.result_text.insertPlainText(result_text)
+        filtered_dict = ClassifierEngine.search_files(self.file_dict, keyword)
+        self.result_text.show_results(filtered_dict)
 
         self.file_dict = filtered_dict
         self.show_graph()
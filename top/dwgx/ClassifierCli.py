@@ -0,0 +1,122 @@
+# 文件分类工具的命令行入口：不导入 PySide6、不创建窗口，适合在服务器上由 cron 或脚本调用
+#
+#   python ClassifierCli.py D:\data -f .py,.txt -s report -o csv > result.csv
+#
+# 找到文件时退出码为 0，没有匹配的文件为 1，参数或正则错误为 2。
+
+import argparse
+import csv
+import json
+import logging
+import os
+import re
+import sys
+import time
+
+from Manager import ClassifierEngine
+from Manager.FileSearchIndex import SUBSTRING, GLOB, REGEX
+
+logger = logging.getLogger("ClassifierCli")
+
+FORMATS = ('jsonl', 'csv', 'text')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="扫描文件夹并按文件夹输出匹配的文件（JSON Lines、CSV 或文本）")
+    parser.add_argument('folder', help="要扫描的文件夹")
+    parser.add_argument('-f', '--filter', default='', help="筛选文件类型，用逗号分隔，例如：.py,.txt")
+    parser.add_argument('-e', '--exclude', default='', help="排除文件类型，用逗号分隔，例如：.log,.tmp")
+    parser.add_argument('-s', '--search', default='', help="只输出文件名匹配该关键词的文件")
+    parser.add_argument('-m', '--mode', choices=(SUBSTRING, GLOB, REGEX), default=SUBSTRING,
+                        help="搜索方式：包含（默认）、通配符或正则")
+    parser.add_argument('-o', '--format', choices=FORMATS, default='jsonl', help="输出格式，默认 jsonl")
+    parser.add_argument('--stat', action='store_true', help="同时输出文件大小和修改时间（jsonl/csv）")
+    parser.add_argument('--index', metavar='PATH', help="使用持久化增量索引文件，只重新列出有变化的文件夹")
+    parser.add_argument('-q', '--quiet', action='store_true', help="不在标准错误输出统计信息")
+    return parser.parse_args(argv)
+
+
+class ResultWriter:
+    def __init__(self, stream, output_format, with_stat):
+        self.stream = stream
+        self.output_format = output_format
+        self.with_stat = with_stat
+        self.csv_writer = None
+        if output_format == 'csv':
+            self.csv_writer = csv.writer(stream)
+            self.csv_writer.writerow(['folder', 'path', 'size', 'mtime'] if with_stat else ['folder', 'path'])
+
+    def write(self, folder, files):
+        # files 为路径列表，with_stat 时为 (路径, 大小, 修改时间) 列表
+        if self.output_format == 'text':
+            paths = [file[0] for file in files] if self.with_stat else files
+            self.stream.writelines(ClassifierEngine.iter_display_chunks({folder: paths}))
+        elif self.output_format == 'csv':
+            rows = ([folder, *file] for file in files) if self.with_stat else ([folder, file] for file in files)
+            self.csv_writer.writerows(rows)
+        elif self.with_stat:
+            self.stream.writelines(json.dumps({'folder': folder, 'path': path, 'size': size, 'mtime': mtime},
+                                              ensure_ascii=False) + '\n' for path, size, mtime in files)
+        else:
+            self.stream.writelines(json.dumps({'folder': folder, 'path': path}, ensure_ascii=False) + '\n'
+                                   for path in files)
+
+
+def run(args, stream):
+    if not os.path.isdir(args.folder):
+        logger.error(f"文件夹不存在: {args.folder}")
+        return 2
+    match = None
+    if args.search:
+        try:
+            match = ClassifierEngine.compile_matcher(args.search, args.mode)
+        except re.error as e:
+            logger.error(f"正则表达式错误: {e}")
+            return 2
+
+    writer = ResultWriter(stream, args.format, args.stat)
+    started = time.perf_counter()
+    first_result = None
+    file_count = 0
+    folder_count = 0
+    # 按文件夹边扫描边输出，结果不在内存中累积
+    for folder, files in ClassifierEngine.iter_scan_files(args.folder, args.filter, args.exclude, args.index,
+                                                          with_stat=args.stat):
+        if match is not None:
+            files = [file for file in files if match(file[0] if args.stat else file)]
+            if not files:
+                continue
+        if first_result is None:
+            first_result = time.perf_counter() - started
+        writer.write(folder, files)
+        file_count += len(files)
+        folder_count += 1
+
+    if not args.quiet:
+        elapsed = time.perf_counter() - started
+        summary = f"共 {folder_count} 个文件夹、{file_count} 个文件，用时 {elapsed:.2f} 秒"
+        if first_result is not None:
+            summary += f"，首个结果 {first_result * 1000:.0f} 毫秒"
+        logger.info(summary)
+    return 0 if file_count else 1
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stderr)
+    args = parse_args(argv)
+    # 统一以 UTF-8 输出；无法解码的文件名按原始字节写出
+    sys.stdout.reconfigure(encoding='utf-8', errors='surrogateescape', newline='' if args.format == 'csv' else None)
+    try:
+        code = run(args, sys.stdout)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # 输出被 head 等命令提前关闭，不再打印异常
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        code = 0
+    except KeyboardInterrupt:
+        code = 130
+    return code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
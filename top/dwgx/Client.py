@@ -1,13 +1,15 @@
 # main.py
 
 import logging
+import os
 import sys
 
 from PySide6.QtCore import Qt
-from PySide6.QtGui import QPixmap, QPalette, QBrush
+from PySide6.QtGui import QPixmap, QColor
 from PySide6.QtWidgets import QApplication
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QSplitter, QListWidget, QStackedWidget, QListWidgetItem
+    QWidget, QVBoxLayout, QSplitter, QListWidget, QStackedWidget, QListWidgetItem, QLabel, QStyleFactory,
+    QSplashScreen
 )
 
 from Manager.ConfigManager import ConfigManager
@@ -15,12 +17,19 @@ from Manager.ModuleManager import ModuleManager
 from Manager.ModuleManager import logger
 from utils.IconImageUtils import icon_image_utils
 from utils.loggerUtils import LogEmitter, setup_logger
+from utils.StartupProfiler import startup_profiler
 
 
 class MainPanel(QWidget):
     def __init__(self):
         super().__init__()
-        self.config_manager = ConfigManager()
+        with startup_profiler.span('ConfigManager.load'):
+            self.config_manager = ConfigManager.shared()
+        # 懒加载模式：导航列表只登记模块描述，首次切换到模块时才实例化
+        self.lazy_modules = self.config_manager.get('ui_settings', 'lazy_modules', True)
+        self.module_entries = {}  # 模块名 -> ModuleDescriptor
+        self.module_pages = {}  # 模块名 -> 堆栈中的页面（占位页或模块实例）
+        self.loaded_modules = set()
         self.setWindowTitle('ToolBox')
         self.resize(800, 600)
         self.center()
@@ -47,41 +56,106 @@ class MainPanel(QWidget):
 
         self.setLayout(main_layout)
 
-        self.module_manager = ModuleManager()
-        self.load_modules()
+        # 模块发现缓存与 config.json 放在同一目录
+        config_dir = os.path.dirname(os.path.abspath(self.config_manager.file_path))
+        with startup_profiler.span('ModuleManager.discover'):
+            self.module_manager = ModuleManager(cache_file=os.path.join(config_dir, 'module_cache.json'))
+        with startup_profiler.span('MainPanel.load_modules', lazy=self.lazy_modules):
+            self.load_modules()
 
-        self.apply_background_image()
+        if self.lazy_modules:
+            self.apply_saved_ui_settings()
+        with startup_profiler.span('apply_background_image'):
+            self.apply_background_image()
+        startup_profiler.watch_first_paint(self)
 
     def load_modules(self):
-        logger.info("=== 开始加载所有模块 ===")
+        logger.info(f"=== 开始加载所有模块 (懒加载: {self.lazy_modules}) ===")
         try:
             modules = self.module_manager.get_modules()  # 获取模块
-            for module_cls, is_special in modules:
+            if not self.lazy_modules:
+                self.preload_modules(modules)
+                # 导入失败的模块已记录错误，不再重复导入
+                modules = [d for d in modules if d.module_cls is not None]
+            folder_icon = icon_image_utils.get_icon('folder-open.png')
+            for descriptor in modules:
+                module_name = descriptor.module_name
                 try:
-                    module_name = module_cls.__name__
-                    logger.info(f"正在加载模块: {module_name}")
-                    # 实例化模块
-                    if is_special and module_name == 'Setting':
-                        module_instance = module_cls(main_panel=self)
+                    logger.info(f"正在登记模块: {module_name}")
+                    self.module_entries[module_name] = descriptor
+                    if self.lazy_modules:
+                        page = self.create_placeholder_page(module_name)
                     else:
-                        module_instance = module_cls()  # 实例化模块
+                        page = self.instantiate_module(module_name)
 
-                    # 将模块添加到界面
-                    folder_icon = icon_image_utils.get_icon('folder-open.png')
-                    list_item = QListWidgetItem(folder_icon, f"{module_name}")
+                    # 将模块添加到界面，列表项记录模块名，拖动排序后仍能找到对应页面
+                    list_item = QListWidgetItem(folder_icon, f"{descriptor.display_name}")
+                    list_item.setData(Qt.ItemDataRole.UserRole, module_name)
                     self.navigation_list.addItem(list_item)
-                    self.stack.addWidget(module_instance)
+                    self.stack.addWidget(page)
+                    self.module_pages[module_name] = page
 
-                    logger.info(f"模块加载成功: {module_name}")
+                    logger.info(f"模块登记成功: {module_name}")
                 except Exception as e:
+                    self.module_entries.pop(module_name, None)
                     logger.error(f"加载模块 {module_name} 时发生错误: {e}", exc_info=True)
         except Exception as e:
             logger.error(f"加载所有模块失败: {e}", exc_info=True)
 
+    def preload_modules(self, modules):
+        # 非懒加载模式：在工作线程中并行导入所有模块文件，启动画面显示每个模块的导入耗时
+        splash = ImportSplash(len(modules))
+        splash.show()
+        QApplication.processEvents()
+        self.module_manager.import_modules(modules, on_imported=splash.module_imported)
+        splash.finish(self)
+
+    def create_placeholder_page(self, module_name):
+        display_name = self.module_entries[module_name].display_name
+        placeholder = QLabel(f"{display_name} 将在首次打开时加载...")
+        placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        return placeholder
+
+    def instantiate_module(self, module_name):
+        descriptor = self.module_entries[module_name]
+        # 模块文件在此时才真正执行导入
+        module_cls = self.module_manager.load_single_module(descriptor)
+        if module_cls is None:
+            raise RuntimeError(f"模块 {module_name} 导入失败")
+        logger.info(f"正在实例化模块: {module_name}")
+        with startup_profiler.span(f'construct {module_name}', category='module'):
+            if descriptor.is_special and descriptor.class_name == 'Setting':
+                module_instance = module_cls(main_panel=self)
+            else:
+                module_instance = module_cls()  # 实例化模块
+        self.loaded_modules.add(module_name)
+        logger.info(f"模块实例化成功: {module_name}")
+        return module_instance
+
+    def ensure_module_loaded(self, module_name):
+        page = self.module_pages[module_name]
+        if module_name in self.loaded_modules:
+            return page
+        try:
+            module_instance = self.instantiate_module(module_name)
+        except Exception as e:
+            logger.error(f"加载模块 {module_name} 时发生错误: {e}", exc_info=True)
+            page.setText(f"模块 {module_name} 加载失败: {e}")
+            return page
+
+        # 用模块实例替换占位页
+        index = self.stack.indexOf(page)
+        self.stack.insertWidget(index, module_instance)
+        self.stack.removeWidget(page)
+        page.deleteLater()
+        self.module_pages[module_name] = module_instance
+        return module_instance
+
     def switch_module(self, index):
         if index != -1:
-            self.stack.setCurrentIndex(index)
-            module_name = self.navigation_list.item(index).text()
+            module_name = self.navigation_list.item(index).data(Qt.ItemDataRole.UserRole)
+            page = self.ensure_module_loaded(module_name)
+            self.stack.setCurrentWidget(page)
             logger.info(f"→ 切换到模块: {module_name} (索引: {index})")
 
     def center(self):
@@ -93,6 +167,20 @@ class MainPanel(QWidget):
         )
         logger.info("窗口已居中")
 
+    def apply_saved_ui_settings(self):
+        # 懒加载模式下 Setting 模块不会在启动时实例化，由主窗口应用已保存的文本颜色与界面风格
+        try:
+            app = QApplication.instance()
+            text_color = self.config_manager.get('ui_settings', 'text_color', '#000000')
+            if text_color:
+                app.setStyleSheet(f"QWidget {{ color: {text_color}; }}")
+            ui_style = self.config_manager.get('ui_settings', 'ui_style', 'Fusion')
+            if ui_style in QStyleFactory.keys():
+                QApplication.setStyle(QStyleFactory.create(ui_style))
+            logger.info(f"应用界面设置: 风格 {ui_style}, 文本颜色 {text_color}")
+        except Exception as e:
+            logger.error(f"应用界面设置失败: {e}", exc_info=True)
+
     def apply_background_image(self):
         try:
             background_image_path = self.config_manager.get('ui_settings', 'background_image')
@@ -100,10 +188,7 @@ class MainPanel(QWidget):
 
             pixmap = QPixmap(background_image_path)
             if not pixmap.isNull():
-                palette = QPalette()
-                palette.setBrush(QPalette.ColorRole.Window, QBrush(pixmap))
-                self.setPalette(palette)
-                self.setAutoFillBackground(True)
+                icon_image_utils.update_background(self, background_image_path, "保持比例")
                 logger.info(f"应用背景图片: {background_image_path}")
             else:
                 logger.error(f"背景图片路径不存在或无效: {background_image_path}")
@@ -111,6 +196,26 @@ class MainPanel(QWidget):
         except Exception as e:
             logger.error(f"应用背景图片失败: {e}", exc_info=True)
 
+class ImportSplash(QSplashScreen):
+    def __init__(self, total):
+        pixmap = QPixmap(420, 160)
+        pixmap.fill(QColor("#2E2E2E"))
+        super().__init__(pixmap)
+        self.total = total
+        self.done = 0
+        self.lines = []
+        self.showMessage("正在导入模块...", Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignBottom, Qt.GlobalColor.white)
+
+    def module_imported(self, descriptor, module_cls, elapsed):
+        self.done += 1
+        status = "完成" if module_cls is not None else "失败"
+        self.lines.append(f"{descriptor.display_name}: {elapsed * 1000:.0f} ms {status}")
+        # 只保留最近几行，避免超出启动画面
+        message = "\n".join(self.lines[-6:] + [f"正在导入模块 ({self.done}/{self.total})"])
+        self.showMessage(message, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignBottom, Qt.GlobalColor.white)
+        QApplication.processEvents()
+
+
 class CustomListWidget(QListWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -140,7 +245,10 @@ def main():
     )
     logger = logging.getLogger("MainPanel")
 
-    app = QApplication(sys.argv)
+    # 启动性能记录: 设置 TOOLBOX_STARTUP_TRACE 环境变量或 --startup-trace [文件] 参数
+    argv = startup_profiler.configure(sys.argv)
+    with startup_profiler.span('QApplication'):
+        app = QApplication(argv)
 
     # 设置全局日志记录（如果有 GUI 显示日志的需求）
     # 这里假设您有一个 LogEmitter 和 setup_logger 来处理日志显示
@@ -148,8 +256,10 @@ def main():
     setup_logger("MainPanel", log_emitter)
 
     # 初始化并加载模块
-    main_window = MainPanel()
-    main_window.show()
+    with startup_profiler.span('MainPanel.__init__'):
+        main_window = MainPanel()
+    with startup_profiler.span('MainPanel.show'):
+        main_window.show()
 
     logger.info("主窗口已显示")
     sys.exit(app.exec())
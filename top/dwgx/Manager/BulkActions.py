@@ -0,0 +1,209 @@
+import json
+import logging
+import os
+import shutil
+import time
+from datetime import datetime
+
+from PySide6.QtCore import QFile
+
+logger = logging.getLogger("BulkActions")
+
+# 操作类型
+TRASH = 'trash'
+MOVE = 'move'
+COPY = 'copy'
+CLASSIFY_EXTENSION = 'classify_extension'
+CLASSIFY_DATE = 'classify_date'
+
+ACTION_NAMES = {
+    TRASH: "移到回收站",
+    MOVE: "移动",
+    COPY: "复制",
+    CLASSIFY_EXTENSION: "按扩展名分类",
+    CLASSIFY_DATE: "按修改日期分类",
+}
+
+
+def unique_destination(path, reserved):
+    # 目标已存在（或已被本批次其他文件占用）时追加序号，不覆盖任何文件
+    if path not in reserved and not os.path.lexists(path):
+        return path
+    stem, ext = os.path.splitext(path)
+    number = 1
+    while True:
+        candidate = f"{stem} ({number}){ext}"
+        if candidate not in reserved and not os.path.lexists(candidate):
+            return candidate
+        number += 1
+
+
+def classify_folder(path, action):
+    if action == CLASSIFY_EXTENSION:
+        ext = os.path.splitext(path)[1].lower().lstrip('.')
+        return ext or "无扩展名"
+    return datetime.fromtimestamp(os.stat(path).st_mtime).strftime('%Y-%m')
+
+
+def new_journal_path(journal_dir, action):
+    # 文件名以精确到微秒的时间开头，按名称排序即按时间排序；同一时刻已有日志时顺延，不同操作也不会同名
+    taken = {name[:22] for name in os.listdir(journal_dir)}
+    stamp = time.time_ns() // 1000
+    while True:
+        prefix = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(stamp // 1000000))}-{stamp % 1000000:06d}"
+        if prefix not in taken:
+            return os.path.join(journal_dir, f"{prefix}-{action}.jsonl")
+        stamp += 1
+
+
+def move_file(src, dst):
+    # 同一文件系统内直接重命名，跨设备时 shutil.move 退回复制后删除
+    try:
+        os.rename(src, dst)
+    except OSError:
+        shutil.move(src, dst)
+
+
+class BulkJob:
+    """
+    批量文件操作：先为全部文件规划目标路径并一次性创建目标文件夹，再逐个执行，
+    每完成一个文件立即把操作记录追加并刷新到撤销日志（JSON Lines），可随时取消，已完成的部分仍可撤销。
+    """
+
+    def __init__(self, action, paths, target_dir=None, journal_dir=None, batch_size=200):
+        self.action = action
+        self.paths = list(paths)
+        self.target_dir = target_dir
+        self.batch_size = batch_size  # 每完成多少个文件报告一次进度
+        self.journal_path = None
+        self.journal = None
+        if journal_dir:
+            os.makedirs(journal_dir, exist_ok=True)
+            self.journal_path = new_journal_path(journal_dir, action)
+        self.completed = []  # [(操作, 源路径, 目标路径), ...]
+        self.errors = []  # [(源路径, 错误信息), ...]
+
+    def plan(self):
+        if self.action == TRASH:
+            return [(path, None) for path in self.paths]
+        planned = []
+        reserved = set()
+        folders = set()
+        for path in self.paths:
+            try:
+                folder = self.target_dir
+                if self.action in (CLASSIFY_EXTENSION, CLASSIFY_DATE):
+                    folder = os.path.join(self.target_dir, classify_folder(path, self.action))
+                dst = unique_destination(os.path.join(folder, os.path.basename(path)), reserved)
+            except OSError as e:
+                self.errors.append((path, str(e)))
+                continue
+            reserved.add(dst)
+            folders.add(folder)
+            planned.append((path, dst))
+        for folder in folders:
+            os.makedirs(folder, exist_ok=True)
+        return planned
+
+    def run(self, should_stop=None, progress=None):
+        planned = self.plan()
+        try:
+            for done, (src, dst) in enumerate(planned, 1):
+                if should_stop and should_stop():
+                    break
+                try:
+                    dst = self.apply(src, dst)
+                except OSError as e:
+                    self.errors.append((src, str(e)))
+                    logger.warning(f"{ACTION_NAMES[self.action]} {src} 失败: {e}")
+                else:
+                    self.completed.append((self.action, src, dst))
+                    self.write_journal({'action': self.action, 'src': src, 'dst': dst})
+                if progress and (done % self.batch_size == 0 or done == len(planned)):
+                    progress(done, len(planned))
+        finally:
+            if self.journal is not None:
+                self.journal.close()
+                self.journal = None
+        return self.completed
+
+    def apply(self, src, dst):
+        if self.action == TRASH:
+            trash_file = QFile(src)
+            if not trash_file.moveToTrash():
+                raise OSError(f"无法移到回收站: {trash_file.errorString()}")
+            return trash_file.fileName()  # 文件在回收站中的位置，撤销时移回
+        if self.action == COPY:
+            shutil.copy2(src, dst)
+        else:
+            move_file(src, dst)
+        return dst
+
+    def write_journal(self, entry):
+        # 日志在第一个文件完成时才创建，每条记录写入后立即刷新，程序中途退出也不会漏记已处理的文件
+        if not self.journal_path:
+            return
+        if self.journal is None:
+            self.journal = open(self.journal_path, 'a', encoding='utf-8')
+        self.journal.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self.journal.flush()
+
+    @staticmethod
+    def latest_journal(journal_dir):
+        try:
+            journals = sorted(name for name in os.listdir(journal_dir) if name.endswith('.jsonl'))
+        except OSError:
+            return None
+        return os.path.join(journal_dir, journals[-1]) if journals else None
+
+    @staticmethod
+    def undo(journal_path, should_stop=None, progress=None):
+        """
+        按相反顺序撤销日志中的操作，返回已撤销的 [(操作, 源路径, 目标路径), ...]。
+        全部撤销后删除日志；中途取消或部分失败时，日志只保留尚未撤销的记录。
+        """
+        with open(journal_path, encoding='utf-8') as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+        undone = []
+        remaining = []
+        for done, entry in enumerate(reversed(entries), 1):
+            if should_stop and should_stop():
+                # 尚未处理的记录加上已撤销失败的记录，保持原顺序
+                remaining = entries[:len(entries) - done + 1] + remaining
+                break
+            action, src, dst = entry['action'], entry['src'], entry['dst']
+            try:
+                if action == COPY:
+                    os.remove(dst)
+                else:
+                    if os.path.lexists(src):
+                        raise OSError(f"原位置已存在同名文件: {src}")
+                    os.makedirs(os.path.dirname(src), exist_ok=True)
+                    move_file(dst, src)
+                    if action == TRASH:
+                        BulkJob.remove_trash_info(dst)
+            except OSError as e:
+                logger.warning(f"撤销 {ACTION_NAMES.get(action, action)} {src} 失败: {e}")
+                remaining.insert(0, entry)
+                continue
+            undone.append((action, src, dst))
+            if progress and (done % 200 == 0 or done == len(entries)):
+                progress(done, len(entries))
+
+        if remaining:
+            with open(journal_path, 'w', encoding='utf-8') as f:
+                f.writelines(json.dumps(entry, ensure_ascii=False) + '\n' for entry in remaining)
+        else:
+            os.remove(journal_path)
+        return undone
+
+    @staticmethod
+    def remove_trash_info(trash_path):
+        # freedesktop 回收站在 info 目录中记录原路径，文件移回后一并删除
+        files_dir, name = os.path.split(trash_path)
+        if os.path.basename(files_dir) == 'files':
+            info_path = os.path.join(os.path.dirname(files_dir), 'info', name + '.trashinfo')
+            try:
+                os.remove(info_path)
+            except OSError:
+                pass
@@ -0,0 +1,115 @@
+import os
+import re
+import time
+from collections import defaultdict
+
+from Manager.FileIndex import FileIndex
+from Manager.FileScanner import FileScanner
+from Manager.FileSearchIndex import SUBSTRING, GLOB, glob_to_regex
+
+# 文件分类工具的扫描、搜索与结果输出，不依赖 PySide6。
+# Modules/FileClassifierTool.py、programtool/FileClassifierTool.py 与 ClassifierCli.py 都只通过本模块遍历文件，
+# 扫描引擎的优化对所有入口同时生效。
+
+
+def parse_types(text):
+    """
+    把界面或配置中逗号分隔的类型字符串拆成列表，去掉空白和空项，例如 " .py, .TXT," -> [".py", ".TXT"]。
+    """
+    return [item.strip() for item in (text or '').split(',') if item.strip()]
+
+
+def scan_files(folder_path, filter_types, exclude_types, index_path=None):
+    file_dict = defaultdict(list)
+    for root, files in iter_scan_files(folder_path, filter_types, exclude_types, index_path):
+        file_dict[root].extend(files)
+    return file_dict
+
+
+def iter_scan_files(folder_path, filter_types, exclude_types, index_path=None, should_stop=None, with_stat=False):
+    """
+    逐个文件夹产出 (文件夹, 匹配的文件路径列表)，供后台线程分批回传结果。
+    指定 index_path 时使用持久化增量索引，只重新列出修改时间变化的目录。
+    with_stat 为 True 时列表项为 (路径, 大小, 修改时间)。
+    """
+    if not index_path:
+        yield from FileScanner(filter_types, exclude_types, with_stat=with_stat).iter_scan(folder_path, should_stop)
+        return
+    with FileIndex(index_path) as index:
+        yield from index.iter_update(folder_path, filter_types, exclude_types, with_stat=with_stat,
+                                     should_stop=should_stop)
+
+
+def iter_files(folder_path, filter_types=(), exclude_types=(), index_path=None, should_stop=None, with_stat=False):
+    """
+    逐个产出匹配的文件（路径，with_stat 时为 (路径, 大小, 修改时间)），找到即产出，不等整个目录树遍历完。
+    """
+    for _, files in iter_scan_files(folder_path, filter_types, exclude_types, index_path, should_stop, with_stat):
+        yield from files
+
+
+def iter_scan_batches(folder_path, filter_types, exclude_types, index_path=None, should_stop=None, with_stat=False,
+                      batch_size=500, interval=0.2):
+    """
+    把 iter_scan_files 的结果合并成批产出 [(文件夹, 文件列表), ...]：累计 batch_size 个文件或距上一批超过 interval 秒即产出一批，
+    界面据此分批刷新，不会每个文件夹都触发一次重绘。
+    """
+    last_yield = time.monotonic()
+    batch = []
+    batch_files = 0
+    for folder, files in iter_scan_files(folder_path, filter_types, exclude_types, index_path, should_stop, with_stat):
+        if should_stop and should_stop():
+            return
+        batch.append((folder, files))
+        batch_files += len(files)
+        now = time.monotonic()
+        if batch_files >= batch_size or now - last_yield >= interval:
+            yield batch
+            batch = []
+            batch_files = 0
+            last_yield = now
+    if batch and not (should_stop and should_stop()):
+        yield batch
+
+
+def display_results(file_dict):
+    return "".join(iter_display_chunks(file_dict))
+
+
+def iter_display_chunks(file_dict, chunk_lines=5000):
+    """
+    按块产出扫描结果文本，每块约 chunk_lines 行，以换行结尾，界面可以逐块追加显示。
+    """
+    lines = []
+    for folder, files in file_dict.items():
+        lines.append(f"文件夹: {folder}")
+        lines.append(f"数量: {len(files)}")
+        lines.extend([f"  {file}" for file in files])
+        while len(lines) >= chunk_lines:
+            yield "\n".join(lines[:chunk_lines]) + "\n"
+            del lines[:chunk_lines]
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def compile_matcher(keyword, mode=SUBSTRING):
+    """
+    返回判断文件路径是否匹配的函数，只比较文件名且不区分大小写。正则无效时抛出 re.error。
+    """
+    if mode == SUBSTRING:
+        keyword = keyword.lower()
+        return lambda path: keyword in os.path.basename(path).lower()
+    # 正则按输入原样编译，大小写由 re.IGNORECASE 处理；转为小写会改变 \D、\W 等转义的含义
+    pattern = re.compile(glob_to_regex(keyword) if mode == GLOB else keyword, re.IGNORECASE)
+    return lambda path: pattern.search(os.path.basename(path)) is not None
+
+
+def search_files(file_dict, keyword, mode=SUBSTRING):
+    # 不建索引的逐个匹配，一次性搜索或索引尚未建立时使用；重复搜索请使用 FileSearchIndex
+    match = compile_matcher(keyword, mode)
+    filtered_dict = defaultdict(list)
+    for folder, files in file_dict.items():
+        filtered_files = [file for file in files if match(file)]
+        if filtered_files:
+            filtered_dict[folder].extend(filtered_files)
+    return filtered_dict
@@ -1,6 +1,18 @@
+import atexit
 import json
+import logging
 import os
-from collections import defaultdict
+import shutil
+import tempfile
+import threading
+
+from PySide6.QtCore import QObject, Signal, QTimer, QCoreApplication
+
+from Manager import ClassifierEngine
+from Manager.FileSearchIndex import SUBSTRING
+from utils.FileLock import FileLock
+
+logger = logging.getLogger("ConfigManager")
 
 ALLOWED_LANGUAGES = {
     "en": "英语",
@@ -23,11 +35,50 @@ ALLOWED_LANGUAGES = {
 }
 
 
-class ConfigManager:
-    def __init__(self, file_path='config.json'):
+class ConfigManager(QObject):
+    # 配置项变化信号: 分区, 选项, 新值
+    value_changed = Signal(str, str, object)
+    # 分区变化信号: 分区
+    section_changed = Signal(str)
+    # 请求延迟保存，从其他线程调用 set 时由 Qt 排队到配置对象所在线程
+    save_requested = Signal()
+
+    # 进程内共享实例: 配置文件绝对路径 -> ConfigManager
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, file_path='config.json', save_delay_ms=500, backup_count=1):
+        super().__init__()
         self.file_path = file_path
+        self.lock = threading.RLock()
+        # 保存前保留的历史备份数量: config.json.bak.1 为最新
+        self.backup_count = backup_count
         self.config = self.load_config()
 
+        # 延迟写入：set 只标记配置已修改，静默 save_delay_ms 毫秒后统一写盘一次
+        self.save_delay_ms = save_delay_ms
+        self.dirty = False
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(save_delay_ms)
+        self.save_timer.timeout.connect(self.flush)
+        self.save_requested.connect(self.schedule_save)
+        self.quit_hooked = False
+        atexit.register(self.flush)
+
+    @classmethod
+    def shared(cls, file_path='config.json'):
+        """
+        返回该配置文件在进程内唯一的 ConfigManager，所有模块共用同一份已解析的配置。
+        """
+        key = os.path.abspath(file_path)
+        with cls._instances_lock:
+            instance = cls._instances.get(key)
+            if instance is None:
+                instance = cls(file_path)
+                cls._instances[key] = instance
+            return instance
+
     def load_config(self):
         if not os.path.exists(self.file_path):
             default_config = {
@@ -39,66 +90,161 @@ class ConfigManager:
                     "target_lang1": "en",
                     "target_lang2": "zh",
                     "copy_delay_ms": 100,
+                    "cache_max_entries": 1000,  # 内存中保留的翻译结果条数
+                    "cache_ttl_days": 30,  # 磁盘缓存的翻译结果保留天数
                     "languages": list(ALLOWED_LANGUAGES.keys())
                 },
                 "file_classifier": {
                     "folder_path": "",
                     "filter_types": "",
-                    "exclude_types": ""
+                    "exclude_types": "",
+                    "use_index": True  # 使用增量索引加速重复扫描
                 },
                 "ui_settings": {
                     "background_image": "",
                     "language": "zh",
-                    "text_color": "#000000"  # 默认文本颜色为黑色
+                    "text_color": "#000000",  # 默认文本颜色为黑色
+                    "lazy_modules": True  # 模块在首次打开时才实例化
                 }
             }
             self.save_config(default_config)
             return default_config
-        with open(self.file_path, 'r', encoding='utf-8') as file:
-            return json.load(file)
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except ValueError as e:
+            logger.error(f"配置文件已损坏: {self.file_path}: {e}")
+        return self.recover_config()
+
+    def recover_config(self):
+        # 损坏的配置文件另存一份便于排查，然后依次尝试从备份恢复
+        corrupt_path = self.file_path + '.corrupt'
+        os.replace(self.file_path, corrupt_path)
+        logger.warning(f"损坏的配置文件已移动到: {corrupt_path}")
+        for backup_path in self.backup_paths():
+            if not os.path.exists(backup_path):
+                continue
+            try:
+                with open(backup_path, 'r', encoding='utf-8') as file:
+                    config = json.load(file)
+            except ValueError as e:
+                logger.error(f"备份文件同样无法解析: {backup_path}: {e}")
+                continue
+            logger.warning(f"已从备份恢复配置: {backup_path}")
+            self.save_config(config)
+            return config
+        logger.warning("没有可用的配置备份，使用默认配置")
+        return self.load_config()
+
+    def backup_paths(self):
+        return [f"{self.file_path}.bak.{index}" for index in range(1, self.backup_count + 1)]
 
     def save_config(self, config=None):
-        if config is None:
-            config = self.config
-        with open(self.file_path, 'w', encoding='utf-8') as file:
-            json.dump(config, file, indent=4, ensure_ascii=False)
+        # 原子保存：先写入同目录临时文件并 fsync，再替换原文件；文件锁防止多个进程同时写入
+        with self.lock, FileLock(self.file_path + '.lock'):
+            if config is None:
+                config = self.config
+            directory = os.path.dirname(os.path.abspath(self.file_path))
+            fd, temp_path = tempfile.mkstemp(prefix='.config-', suffix='.tmp', dir=directory)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                    json.dump(config, file, indent=4, ensure_ascii=False)
+                    file.flush()
+                    os.fsync(file.fileno())
+                self.rotate_backups()
+                os.replace(temp_path, self.file_path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+            if os.name != 'nt':
+                # 确保重命名本身也落盘
+                dir_fd = os.open(directory, os.O_RDONLY)
+                try:
+                    os.fsync(dir_fd)
+                finally:
+                    os.close(dir_fd)
+
+    def rotate_backups(self):
+        if self.backup_count <= 0 or not os.path.exists(self.file_path):
+            return
+        backups = self.backup_paths()
+        for older, newer in zip(reversed(backups[1:]), reversed(backups[:-1])):
+            if os.path.exists(newer):
+                os.replace(newer, older)
+        # 复制而不是移动，保证替换前 config.json 始终存在
+        shutil.copy2(self.file_path, backups[0])
+
+    def flush(self):
+        """
+        立即写入尚未保存的修改。
+        """
+        with self.lock:
+            if not self.dirty:
+                return
+            self.dirty = False
+            self.save_config()
+
+    def schedule_save(self):
+        app = QCoreApplication.instance()
+        if not self.quit_hooked:
+            app.aboutToQuit.connect(self.flush)
+            self.quit_hooked = True
+        # 重新计时，连续修改只在最后一次修改后写盘
+        self.save_timer.start()
 
     def get(self, section, option, default=None):
         return self.config.get(section, {}).get(option, default)
 
     def set(self, section, option, value):
-        if section not in self.config:
-            self.config[section] = {}
-        self.config[section][option] = value
-        self.save_config()
+        with self.lock:
+            if section not in self.config:
+                self.config[section] = {}
+            changed = self.config[section].get(option) != value
+            self.config[section][option] = value
+            self.dirty = True
+        if self.save_delay_ms <= 0 or QCoreApplication.instance() is None:
+            # 没有事件循环时无法延迟，直接写盘
+            self.flush()
+        else:
+            self.save_requested.emit()
+        if changed:
+            self.value_changed.emit(section, option, value)
+            self.section_changed.emit(section)
+
+    def subscribe(self, section, option, callback):
+        """
+        订阅配置变化，option 为 None 时订阅整个分区。回调参数为 (选项, 新值)，返回可用于 unsubscribe 的句柄。
+        """
+        def on_value_changed(changed_section, changed_option, value):
+            if changed_section == section and (option is None or changed_option == option):
+                callback(changed_option, value)
+
+        self.value_changed.connect(on_value_changed)
+        return on_value_changed
+
+    def unsubscribe(self, handle):
+        self.value_changed.disconnect(handle)
+
+    # 扫描与搜索的实现位于 Manager.ClassifierEngine（不依赖 PySide6，命令行也可使用），这里保留原有的调用方式
+
+    @staticmethod
+    def scan_files(folder_path, filter_types, exclude_types, index_path=None):
+        return ClassifierEngine.scan_files(folder_path, filter_types, exclude_types, index_path)
 
     @staticmethod
-    def scan_files(folder_path, filter_types, exclude_types):
-        file_dict = defaultdict(list)
-        for root, _, files in os.walk(folder_path):
-            for file in files:
-                if filter_types and not any(file.lower().endswith(ft.lower()) for ft in filter_types):
-                    continue
-                if exclude_types and any(file.lower().endswith(et.lower()) for et in exclude_types):
-                    continue
-                file_dict[root].append(os.path.join(root, file))
-        return file_dict
+    def iter_scan_files(folder_path, filter_types, exclude_types, index_path=None, should_stop=None, with_stat=False):
+        return ClassifierEngine.iter_scan_files(folder_path, filter_types, exclude_types, index_path,
+                                                should_stop, with_stat)
 
     @staticmethod
     def display_results(file_dict):
-        result_text = ""
-        for folder, files in file_dict.items():
-            result_text += f"文件夹: {folder}\n"
-            result_text += f"数量: {len(files)}\n"
-            for file in files:
-                result_text += f"  {file}\n"
-        return result_text
+        return ClassifierEngine.display_results(file_dict)
+
+    @staticmethod
+    def iter_display_chunks(file_dict, chunk_lines=5000):
+        return ClassifierEngine.iter_display_chunks(file_dict, chunk_lines)
 
     @staticmethod
-    def search_files(file_dict, keyword):
-        filtered_dict = defaultdict(list)
-        for folder, files in file_dict.items():
-            filtered_files = [file for file in files if keyword.lower() in os.path.basename(file).lower()]
-            if filtered_files:
-                filtered_dict[folder].extend(filtered_files)
-        return filtered_dict
+    def search_files(file_dict, keyword, mode=SUBSTRING):
+        return ClassifierEngine.search_files(file_dict, keyword, mode)
@@ -0,0 +1,264 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("ContentSniffer")
+
+# 只读文件头，耗时主要在打开文件的系统调用上，线程数可以高于 CPU 核数
+DEFAULT_WORKERS = min(16, (os.cpu_count() or 1) * 4)
+
+# 类别
+IMAGE = "图片"
+AUDIO = "音频"
+VIDEO = "视频"
+DOCUMENT = "文档"
+ARCHIVE = "压缩包"
+EXECUTABLE = "可执行文件"
+FONT = "字体"
+DATABASE = "数据库"
+TEXT = "文本"
+EMPTY = "空文件"
+UNKNOWN = "未知"
+
+# (MIME 类型, 类别, ((偏移, 字节), ...))，所有条件都满足才算匹配，按顺序取第一个匹配项，较具体的签名放在前面
+SIGNATURES = (
+    ('image/png', IMAGE, ((0, b'\x89PNG\r\n\x1a\n'),)),
+    ('image/jpeg', IMAGE, ((0, b'\xff\xd8\xff'),)),
+    ('image/gif', IMAGE, ((0, b'GIF87a'),)),
+    ('image/gif', IMAGE, ((0, b'GIF89a'),)),
+    ('image/webp', IMAGE, ((0, b'RIFF'), (8, b'WEBP'))),
+    ('image/tiff', IMAGE, ((0, b'II*\x00'),)),
+    ('image/tiff', IMAGE, ((0, b'MM\x00*'),)),
+    ('image/x-icon', IMAGE, ((0, b'\x00\x00\x01\x00'),)),
+    ('image/vnd.adobe.photoshop', IMAGE, ((0, b'8BPS'),)),
+    ('image/heic', IMAGE, ((4, b'ftypheic'),)),
+    ('image/avif', IMAGE, ((4, b'ftypavif'),)),
+    ('image/bmp', IMAGE, ((0, b'BM'),)),
+    ('audio/mpeg', AUDIO, ((0, b'ID3'),)),
+    ('audio/flac', AUDIO, ((0, b'fLaC'),)),
+    ('audio/ogg', AUDIO, ((0, b'OggS'),)),
+    ('audio/wav', AUDIO, ((0, b'RIFF'), (8, b'WAVE'))),
+    ('audio/mp4', AUDIO, ((4, b'ftypM4A '),)),
+    ('audio/midi', AUDIO, ((0, b'MThd'),)),
+    ('audio/mpeg', AUDIO, ((0, b'\xff\xfb'),)),
+    ('audio/mpeg', AUDIO, ((0, b'\xff\xf3'),)),
+    ('video/x-msvideo', VIDEO, ((0, b'RIFF'), (8, b'AVI '))),
+    ('video/quicktime', VIDEO, ((4, b'ftypqt  '),)),
+    ('video/mp4', VIDEO, ((4, b'ftyp'),)),
+    ('video/x-matroska', VIDEO, ((0, b'\x1a\x45\xdf\xa3'),)),
+    ('video/x-flv', VIDEO, ((0, b'FLV\x01'),)),
+    ('application/pdf', DOCUMENT, ((0, b'%PDF-'),)),
+    ('application/rtf', DOCUMENT, ((0, b'{\\rtf'),)),
+    ('application/x-ole-storage', DOCUMENT, ((0, b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'),)),  # 旧版 doc/xls/ppt
+    ('application/zip', ARCHIVE, ((0, b'PK\x03\x04'),)),
+    ('application/zip', ARCHIVE, ((0, b'PK\x05\x06'),)),
+    ('application/gzip', ARCHIVE, ((0, b'\x1f\x8b'),)),
+    ('application/x-bzip2', ARCHIVE, ((0, b'BZh'),)),
+    ('application/x-xz', ARCHIVE, ((0, b'\xfd7zXZ\x00'),)),
+    ('application/x-7z-compressed', ARCHIVE, ((0, b"7z\xbc\xaf'\x1c"),)),
+    ('application/vnd.rar', ARCHIVE, ((0, b'Rar!\x1a\x07'),)),
+    ('application/zstd', ARCHIVE, ((0, b'\x28\xb5\x2f\xfd'),)),
+    ('application/x-tar', ARCHIVE, ((257, b'ustar'),)),
+    ('application/x-executable', EXECUTABLE, ((0, b'\x7fELF'),)),
+    ('application/vnd.microsoft.portable-executable', EXECUTABLE, ((0, b'MZ'),)),
+    ('application/x-mach-binary', EXECUTABLE, ((0, b'\xcf\xfa\xed\xfe'),)),
+    ('application/x-mach-binary', EXECUTABLE, ((0, b'\xce\xfa\xed\xfe'),)),
+    ('application/java-vm', EXECUTABLE, ((0, b'\xca\xfe\xba\xbe'),)),
+    ('application/wasm', EXECUTABLE, ((0, b'\x00asm'),)),
+    ('font/woff', FONT, ((0, b'wOFF'),)),
+    ('font/woff2', FONT, ((0, b'wOF2'),)),
+    ('font/otf', FONT, ((0, b'OTTO'),)),
+    ('font/ttf', FONT, ((0, b'\x00\x01\x00\x00\x00'),)),
+    ('application/vnd.sqlite3', DATABASE, ((0, b'SQLite format 3\x00'),)),
+)
+
+# ZIP 容器中第一个条目的名称可以区分 Office 文档、安装包等
+ZIP_ENTRY_TYPES = (
+    (b'[Content_Types].xml', 'application/vnd.openxmlformats-officedocument', DOCUMENT),
+    (b'word/', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document', DOCUMENT),
+    (b'xl/', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', DOCUMENT),
+    (b'ppt/', 'application/vnd.openxmlformats-officedocument.presentationml.presentation', DOCUMENT),
+    (b'META-INF/', 'application/java-archive', EXECUTABLE),
+    (b'AndroidManifest.xml', 'application/vnd.android.package-archive', EXECUTABLE),
+)
+
+# 偏移 0 处的签名按首字节分桶，每个文件只需比对少数几条；其他偏移的签名数量很少，附在每个桶之后
+SIGNATURES_BY_FIRST_BYTE = {}
+OFFSET_SIGNATURES = []
+for _signature in SIGNATURES:
+    _offset, _magic = _signature[2][0]
+    if _offset == 0:
+        SIGNATURES_BY_FIRST_BYTE.setdefault(_magic[:1], []).append(_signature)
+    else:
+        OFFSET_SIGNATURES.append(_signature)
+for _first_byte, _signatures in SIGNATURES_BY_FIRST_BYTE.items():
+    _signatures.extend(OFFSET_SIGNATURES)
+
+def is_bmp(header):
+    # 'BM' 只有两个字节，文本文件也常以此开头：再检查偏移 14 的 DIB 头长度是已知取值，
+    # 且文件头中的文件大小与像素数据偏移都不小于两个头部之和
+    if len(header) < 18:
+        return False
+    dib_size = int.from_bytes(header[14:18], 'little')
+    if dib_size not in (12, 40, 52, 56, 64, 108, 124):
+        return False
+    file_size = int.from_bytes(header[2:6], 'little')
+    data_offset = int.from_bytes(header[10:14], 'little')
+    return 14 + dib_size <= data_offset <= file_size
+
+
+def is_pe(header):
+    # 'MZ' 后偏移 0x3C 处的 e_lfanew 必须指向文件头范围内的 'PE\0\0'，否则不视为可执行文件
+    if len(header) < 64:
+        return False
+    pe_offset = int.from_bytes(header[60:64], 'little')
+    return pe_offset >= 64 and header.startswith(b'PE\x00\x00', pe_offset)
+
+
+# 签名过短、容易与普通文本重合的类型，签名匹配后还需通过的结构检查
+HEADER_CHECKS = {
+    'image/bmp': is_bmp,
+    'application/vnd.microsoft.portable-executable': is_pe,
+}
+
+TEXT_SIGNATURES = (
+    (b'<?xml', 'text/xml'),
+    (b'<!doctype html', 'text/html'),
+    (b'<html', 'text/html'),
+    (b'#!', 'text/x-script'),
+    (b'{', 'application/json'),
+    (b'[', 'application/json'),
+)
+
+
+def sniff_zip(header):
+    # 本地文件头：偏移 26 为文件名长度，28 为扩展字段长度，30 起为文件名；ODF/EPUB 的第一个条目 mimetype 直接存放类型
+    name_length = int.from_bytes(header[26:28], 'little')
+    extra_length = int.from_bytes(header[28:30], 'little')
+    name = header[30:30 + name_length]
+    if name == b'mimetype':
+        start = 30 + name_length + extra_length
+        mime = header[start:start + 80].split(b'PK', 1)[0].decode('ascii', 'ignore').strip()
+        if mime:
+            return mime, DOCUMENT
+    for prefix, mime, category in ZIP_ENTRY_TYPES:
+        if name.startswith(prefix):
+            return mime, category
+    return 'application/zip', ARCHIVE
+
+
+PRINTABLE_BYTES = bytes(range(32, 256)) + b'\t\n\r\f\x1b'
+
+
+def is_text(header):
+    if b'\x00' in header:
+        return False
+    try:
+        header.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # 文件头可能截断在多字节字符中间，只要错误出现在末尾几个字节内就仍算 UTF-8
+        if e.start < len(header) - 3:
+            try:
+                header.decode('gbk')
+            except UnicodeDecodeError:
+                return False
+    # 删除可打印字符和常见空白后剩下的就是控制字符
+    return len(header.translate(None, PRINTABLE_BYTES)) <= len(header) // 100
+
+
+def sniff_bytes(header):
+    """
+    根据文件头识别类型，返回 (MIME 类型, 类别)。
+    """
+    if not header:
+        return 'application/x-empty', EMPTY
+    for mime, category, conditions in SIGNATURES_BY_FIRST_BYTE.get(header[:1], OFFSET_SIGNATURES):
+        if all(header.startswith(magic, offset) for offset, magic in conditions):
+            check = HEADER_CHECKS.get(mime)
+            if check is not None and not check(header):
+                continue
+            if mime == 'application/zip' and header.startswith(b'PK\x03\x04'):
+                return sniff_zip(header)
+            return mime, category
+    if header.startswith((b'\xef\xbb\xbf', b'\xff\xfe', b'\xfe\xff')):
+        return 'text/plain', TEXT
+    if is_text(header):
+        lower = header.lstrip()[:16].lower()
+        for magic, mime in TEXT_SIGNATURES:
+            if lower.startswith(magic):
+                return mime, TEXT
+        return 'text/plain', TEXT
+    return 'application/octet-stream', UNKNOWN
+
+
+class ContentSniffer:
+    """
+    按文件内容识别类型：每个文件只读开头 header_size 字节，与内置的文件头签名表比对。
+    文件分批交给线程池读取；结果按路径缓存，大小和修改时间都没变的文件再次识别时不读盘。
+    """
+
+    def __init__(self, header_size=512, max_workers=DEFAULT_WORKERS, batch_size=256):
+        self.header_size = header_size  # tar 的签名位于偏移 257，不能小于 262
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.cache = {}  # 路径 -> (大小, 修改时间, MIME 类型, 类别)
+
+    def sniff_file(self, path):
+        try:
+            with open(path, 'rb') as f:
+                return sniff_bytes(f.read(self.header_size))
+        except OSError as e:
+            logger.warning(f"读取 {path} 失败: {e}")
+            return None
+
+    def sniff_batch(self, paths):
+        return [self.sniff_file(path) for path in paths]
+
+    def classify(self, entries, should_stop=None, progress=None):
+        """
+        entries 为 (路径, 大小, 修改时间) 的可迭代对象，返回 {路径: (MIME 类型, 类别)}，读取失败的文件不在结果中。
+        progress(已完成数, 总数) 在调用线程中调用；should_stop 返回 True 时提前结束，返回已识别的部分。
+        """
+        results = {}
+        pending = []
+        cache = self.cache
+        for path, size, mtime in entries:
+            cached = cache.get(path)
+            if cached is not None and cached[0] == size and cached[1] == mtime:
+                results[path] = cached[2:]
+            else:
+                pending.append((path, size, mtime))
+        total = len(results) + len(pending)
+        if progress:
+            progress(len(results), total)
+        if not pending:
+            return results
+
+        batches = [pending[start:start + self.batch_size] for start in range(0, len(pending), self.batch_size)]
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ContentSniffer")
+        try:
+            # 缓存只在调用线程中更新，工作线程只负责读文件头
+            sniffed = executor.map(lambda batch: self.sniff_batch([path for path, _, _ in batch]), batches)
+            for batch, types in zip(batches, sniffed):
+                if should_stop and should_stop():
+                    break
+                for (path, size, mtime), content_type in zip(batch, types):
+                    if content_type is not None:
+                        results[path] = content_type
+                        cache[path] = (size, mtime, *content_type)
+                if progress:
+                    progress(len(results), total)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return results
+
+    @staticmethod
+    def group_by_type(results):
+        """
+        按类别和 MIME 类型分组，返回 [(类别, MIME 类型, [路径, ...]), ...]，文件多的组在前。
+        """
+        groups = {}
+        for path, content_type in results.items():
+            groups.setdefault(content_type, []).append(path)
+        return sorted(((category, mime, sorted(paths)) for (mime, category), paths in groups.items()),
+                      key=lambda group: (-len(group[2]), group[0], group[1]))
@@ -0,0 +1,136 @@
+import csv
+import json
+import os
+from collections import defaultdict
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，没有时逐项累加
+    np = None
+
+
+class FolderUsage:
+    def __init__(self, path):
+        self.path = path
+        self.size = 0  # 含所有子文件夹
+        self.file_count = 0
+        self.extensions = defaultdict(lambda: [0, 0])  # 扩展名 -> [文件数, 大小]
+
+    def to_dict(self):
+        return {
+            'path': self.path,
+            'size': self.size,
+            'file_count': self.file_count,
+            'extensions': {ext: {'file_count': count, 'size': size}
+                           for ext, (count, size) in sorted(self.extensions.items(), key=lambda item: -item[1][1])},
+        }
+
+
+class DiskUsageReport:
+    """
+    根据扫描时已记录的文件大小统计每个文件夹（含子文件夹）的总大小、文件数和各扩展名占用，不重新读取磁盘。
+    """
+
+    def __init__(self, root, folders, extensions):
+        self.root = root
+        self.folders = folders  # 文件夹路径 -> FolderUsage
+        self.extensions = extensions  # 扩展名 -> [文件数, 大小]
+
+    @classmethod
+    def from_store(cls, store, root):
+        # 增量索引保存的是绝对路径，相对路径的 root 也要先转换，否则向上累加时找不到 root
+        root = os.path.normpath(os.path.abspath(root))
+        direct = cls.direct_usage(store)
+
+        # 先为每个有文件的文件夹及其到 root 之间的所有上级建立节点，再按路径深度从深到浅累加到父文件夹
+        # 扫描根目录带结尾分隔符时目录路径形式不统一，先规范化
+        paths = {dir_id: os.path.normpath(os.path.abspath(store.folders[dir_id])) for dir_id in direct}
+        folders = {}
+        for path in paths.values():
+            while path not in folders:
+                folders[path] = FolderUsage(path)
+                parent = os.path.dirname(path)
+                if path == root or parent == path:
+                    break
+                path = parent
+        for dir_id, counts in direct.items():
+            usage = folders[paths[dir_id]]
+            for ext_id, (count, size) in counts.items():
+                usage.file_count += count
+                usage.size += size
+                entry = usage.extensions[store.extensions[ext_id]]
+                entry[0] += count
+                entry[1] += size
+
+        for path in sorted(folders, key=lambda p: p.count(os.sep), reverse=True):
+            parent = os.path.dirname(path)
+            if path == root or parent == path or parent not in folders:
+                continue
+            usage = folders[path]
+            parent_usage = folders[parent]
+            parent_usage.size += usage.size
+            parent_usage.file_count += usage.file_count
+            for ext, (count, size) in usage.extensions.items():
+                entry = parent_usage.extensions[ext]
+                entry[0] += count
+                entry[1] += size
+
+        extensions = {}
+        for ext, count in store.count_by_extension().items():
+            extensions[ext] = [count, 0]
+        for ext, size in store.size_by_extension().items():
+            extensions[ext][1] = size
+        return cls(root, folders, extensions)
+
+    @staticmethod
+    def direct_usage(store):
+        # 目录 id -> {扩展名 id: [文件数, 大小]}，只统计直接位于该目录下的文件
+        direct = defaultdict(dict)
+        if np is not None and len(store.alive):
+            alive = np.frombuffer(store.alive, dtype=np.uint8).astype(bool)
+            dir_ids = np.frombuffer(store.dir_ids, dtype=np.uint32)[alive].astype(np.int64)
+            ext_ids = np.frombuffer(store.ext_ids, dtype=np.uint32)[alive].astype(np.int64)
+            sizes = np.frombuffer(store.sizes, dtype=np.int64)[alive]
+            keys, inverse = np.unique(dir_ids * len(store.extensions) + ext_ids, return_inverse=True)
+            counts = np.bincount(inverse)
+            totals = np.bincount(inverse, weights=sizes)
+            for key, count, total in zip(keys.tolist(), counts.tolist(), totals.tolist()):
+                dir_id, ext_id = divmod(key, len(store.extensions))
+                direct[dir_id][ext_id] = [count, int(total)]
+            return direct
+        for dir_id, ext_id, size, alive in zip(store.dir_ids, store.ext_ids, store.sizes, store.alive):
+            if alive:
+                entry = direct[dir_id].get(ext_id)
+                if entry is None:
+                    direct[dir_id][ext_id] = [1, size]
+                else:
+                    entry[0] += 1
+                    entry[1] += size
+        return direct
+
+    def largest_folders(self, limit=None):
+        folders = sorted(self.folders.values(), key=lambda usage: (-usage.size, usage.path))
+        return folders[:limit] if limit else folders
+
+    def largest_extensions(self, limit=None):
+        extensions = sorted(self.extensions.items(), key=lambda item: (-item[1][1], item[0]))
+        return extensions[:limit] if limit else extensions
+
+    def export_csv(self, file_path):
+        with open(file_path, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            writer.writerow(['类型', '路径或扩展名', '大小(字节)', '文件数'])
+            for usage in self.largest_folders():
+                writer.writerow(['文件夹', usage.path, usage.size, usage.file_count])
+            for ext, (count, size) in self.largest_extensions():
+                writer.writerow(['扩展名', ext or '(无扩展名)', size, count])
+
+    def export_json(self, file_path):
+        report = {
+            'root': self.root,
+            'folders': [usage.to_dict() for usage in self.largest_folders()],
+            'extensions': [{'extension': ext, 'file_count': count, 'size': size}
+                           for ext, (count, size) in self.largest_extensions()],
+        }
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,110 @@
+import hashlib
+import logging
+import mmap
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("DuplicateFinder")
+
+# 哈希计算时 hashlib 会释放 GIL，线程池即可并行；线程过多会让机械硬盘来回寻道
+DEFAULT_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+
+
+class DuplicateGroup:
+    def __init__(self, size, digest, paths):
+        self.size = size
+        self.digest = digest
+        self.paths = sorted(paths)
+
+    @property
+    def reclaimable(self):
+        # 每组保留一份，其余副本占用的空间可以释放
+        return self.size * (len(self.paths) - 1)
+
+
+class DuplicateFinder:
+    """
+    分级查找内容完全相同的文件：先按大小分组，再比较首尾块的部分哈希，
+    只有部分哈希仍相同的文件才通过内存映射计算完整的 BLAKE2 哈希，尽量减少读盘量。
+    """
+
+    def __init__(self, block_size=64 * 1024, chunk_size=8 * 1024 * 1024, min_size=1, max_workers=DEFAULT_WORKERS):
+        self.block_size = block_size
+        self.chunk_size = chunk_size
+        self.min_size = min_size  # 空文件默认不参与比较
+        self.max_workers = max_workers
+
+    def find(self, entries, should_stop=None, progress=None):
+        """
+        entries 为 (路径, 大小, ...) 的可迭代对象，返回按可释放空间从大到小排列的 DuplicateGroup 列表。
+        progress(阶段, 已完成数, 总数) 在工作线程中调用；should_stop 返回 True 时提前结束并返回空列表。
+        """
+        by_size = defaultdict(list)
+        for entry in entries:
+            if entry[1] >= self.min_size:
+                by_size[entry[1]].append(entry[0])
+        candidates = {(size, b''): paths for size, paths in by_size.items() if len(paths) > 1}
+        by_size.clear()
+
+        # 不超过首尾两块的文件，部分哈希已覆盖全部内容，无需再算完整哈希
+        candidates = self.refine(candidates, self.partial_hash, "部分哈希", should_stop, progress)
+        small = {key: paths for key, paths in candidates.items() if key[0] <= 2 * self.block_size}
+        large = {key: paths for key, paths in candidates.items() if key[0] > 2 * self.block_size}
+        large = self.refine(large, self.full_hash, "完整哈希", should_stop, progress)
+        if should_stop and should_stop():
+            return []
+
+        groups = [DuplicateGroup(size, digest, paths) for (size, digest), paths in {**small, **large}.items()]
+        groups.sort(key=lambda group: (-group.reclaimable, group.paths[0]))
+        return groups
+
+    def refine(self, candidates, hash_func, stage, should_stop, progress):
+        # 对每个候选组内的文件计算哈希，按 (大小, 哈希) 重新分组，只保留仍有多个文件的组
+        jobs = [(size, path) for (size, _), paths in candidates.items() for path in paths]
+        refined = defaultdict(list)
+        if not jobs:
+            return refined
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="DuplicateFinder")
+        try:
+            results = executor.map(lambda job: (job, hash_func(job[1], job[0])), jobs)
+            for done, ((size, path), digest) in enumerate(results, 1):
+                if should_stop and should_stop():
+                    return {}
+                if digest is not None:
+                    refined[(size, digest)].append(path)
+                if progress and (done % 200 == 0 or done == len(jobs)):
+                    progress(stage, done, len(jobs))
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return {key: paths for key, paths in refined.items() if len(paths) > 1}
+
+    def partial_hash(self, path, size):
+        try:
+            with open(path, 'rb') as f:
+                head = f.read(self.block_size)
+                if size > 2 * self.block_size:
+                    f.seek(-self.block_size, os.SEEK_END)
+                    tail = f.read(self.block_size)
+                else:
+                    tail = f.read()
+        except OSError as e:
+            logger.warning(f"读取 {path} 失败: {e}")
+            return None
+        if len(head) + len(tail) != min(size, 2 * self.block_size):
+            return None  # 文件在扫描后发生了变化
+        return hashlib.blake2b(head + tail, digest_size=16).digest()
+
+    def full_hash(self, path, size):
+        digest = hashlib.blake2b(digest_size=32)
+        try:
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if len(mapped) != size:
+                    return None
+                with memoryview(mapped) as view:
+                    for offset in range(0, size, self.chunk_size):
+                        digest.update(view[offset:offset + self.chunk_size])
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取 {path} 失败: {e}")
+            return None
+        return digest.digest()
@@ -0,0 +1,237 @@
+import os
+import sqlite3
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from Manager.FileScanner import FileScanner
+
+# 索引结构版本，变化时重建索引
+SCHEMA_VERSION = 1
+# 修改时间距扫描时刻过近的目录在下次扫描时仍重新列出，避免同一时间粒度内的后续修改被漏掉
+RACY_WINDOW_NS = 2_000_000_000
+
+
+class FileIndex:
+    """
+    持久化的增量文件索引（SQLite）：记录每个已扫描目录的修改时间及其中文件的路径、大小、修改时间和扩展名。
+    再次扫描时只重新列出修改时间发生变化的目录，其余目录直接读取索引中的文件名。
+    原地修改文件不会改变目录的修改时间，因此需要大小和修改时间时会逐个重新 stat 已知文件。
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.create_schema()
+
+    def create_schema(self):
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            self.connection.executescript("""
+                DROP TABLE IF EXISTS dirs;
+                DROP TABLE IF EXISTS files;
+            """)
+        self.connection.executescript(f"""
+            CREATE TABLE IF NOT EXISTS dirs (
+                path TEXT PRIMARY KEY,
+                parent TEXT,
+                mtime_ns INTEGER NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS dirs_parent ON dirs(parent);
+            CREATE TABLE IF NOT EXISTS files (
+                dir TEXT NOT NULL,
+                name TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                ext TEXT NOT NULL,
+                PRIMARY KEY (dir, name)
+            ) WITHOUT ROWID;
+            PRAGMA user_version = {SCHEMA_VERSION};
+        """)
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def iter_update(self, root, filter_types=(), exclude_types=(), with_stat=False, should_stop=None):
+        """
+        增量更新 root 下的索引，同时按目录产出 (目录, 匹配的文件列表)。
+        目录按层处理，每层的 stat 和列目录在线程池中并行执行，数据库只在当前线程读写。
+        should_stop 返回 True 时提前结束，已处理的目录会被提交。
+        """
+        root = os.path.abspath(root)
+        matcher = FileScanner(filter_types, exclude_types)
+        lister = FileScanner(with_stat=True)
+        cursor = self.connection.cursor()
+        # 一次性读出 root 下已知目录的修改时间和父子关系，未变化的目录不再逐个查询
+        known_mtimes = {}
+        children = defaultdict(list)
+        prefix, upper = self.prefix_range(root)
+        for path, parent, mtime_ns in cursor.execute(
+                "SELECT path, parent, mtime_ns FROM dirs WHERE path = ? OR (path >= ? AND path < ?)",
+                (root, prefix, upper)):
+            known_mtimes[path] = mtime_ns
+            if path != parent:
+                children[parent].append(path)
+
+        level = [root]
+        scan_started_ns = time.time_ns()
+        executor = ThreadPoolExecutor(max_workers=lister.max_workers, thread_name_prefix="FileIndex")
+        try:
+            while level:
+                if should_stop and should_stop():
+                    break
+                jobs = []
+                for folder, mtime_ns in zip(level, executor.map(stat_mtime, level)):
+                    if mtime_ns is None:
+                        self.remove_tree(cursor, folder)
+                        continue
+                    known_mtime = known_mtimes.get(folder)
+                    cached = None
+                    if known_mtime == mtime_ns:
+                        cached = cursor.execute(
+                            "SELECT name, size, mtime FROM files WHERE dir = ?", (folder,)).fetchall()
+                    jobs.append((folder, mtime_ns, known_mtime, cached))
+
+                next_level = []
+                probes = executor.map(lambda job: probe_directory(lister, job[0], job[3], with_stat), jobs)
+                for (folder, mtime_ns, known_mtime, cached), (entries, subdirs) in zip(jobs, probes):
+                    if should_stop and should_stop():
+                        break
+                    if entries is None:
+                        # 列目录失败：不记录修改时间，下次更新时重试；本次不产出也不深入该目录
+                        cursor.execute("INSERT OR REPLACE INTO dirs (path, parent, mtime_ns) VALUES (?, ?, -1)",
+                                       (folder, os.path.dirname(folder)))
+                        continue
+                    if subdirs is None:
+                        subdirs = children.get(folder, [])
+                        if with_stat:
+                            self.store_stats(cursor, folder, cached, entries)
+                    else:
+                        self.store_listing(cursor, folder, entries, subdirs, known_mtime is not None)
+                        if scan_started_ns - mtime_ns < RACY_WINDOW_NS:
+                            mtime_ns = -1
+                        cursor.execute("INSERT OR REPLACE INTO dirs (path, parent, mtime_ns) VALUES (?, ?, ?)",
+                                       (folder, os.path.dirname(folder), mtime_ns))
+
+                    if matcher.filter_suffixes or matcher.exclude_suffixes:
+                        entries = [entry for entry in entries if matcher.matches(entry[0])]
+                    if entries:
+                        join = os.path.join
+                        if with_stat:
+                            yield folder, [(join(folder, name), size, mtime) for name, size, mtime in entries]
+                        else:
+                            yield folder, [join(folder, name) for name, _, _ in entries]
+                    next_level.extend(sorted(subdirs))
+                level = next_level
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            self.connection.commit()
+
+    @staticmethod
+    def prefix_range(folder):
+        # 以 folder 为前缀的所有子路径位于 [folder + sep, folder + chr(sep + 1)) 区间，可直接利用主键索引
+        prefix = folder.rstrip(os.sep) + os.sep
+        return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+    def store_listing(self, cursor, folder, entries, subdirs, known):
+        cursor.execute("DELETE FROM files WHERE dir = ?", (folder,))
+        cursor.executemany(
+            "INSERT INTO files (dir, name, size, mtime, ext) VALUES (?, ?, ?, ?, ?)",
+            [(folder, name, size, mtime, os.path.splitext(name)[1].lower()) for name, size, mtime in entries])
+        # 子目录先登记为待扫描，扫描中途停止时下次仍能找到并列出它们
+        cursor.executemany("INSERT OR IGNORE INTO dirs (path, parent, mtime_ns) VALUES (?, ?, -1)",
+                           [(path, folder) for path in subdirs])
+        if known:
+            # 已从磁盘消失的子目录连同其下的索引一起删除
+            current = set(subdirs)
+            for (path,) in cursor.execute(
+                    "SELECT path FROM dirs WHERE parent = ? AND path != ?", (folder, folder)).fetchall():
+                if path not in current:
+                    self.remove_tree(cursor, path)
+
+    @staticmethod
+    def store_stats(cursor, folder, cached, entries):
+        changed = [(size, mtime, folder, name)
+                   for (name, size, mtime), old in zip(entries, cached) if (size, mtime) != old[1:]]
+        if changed:
+            cursor.executemany("UPDATE files SET size = ?, mtime = ? WHERE dir = ? AND name = ?", changed)
+
+    @staticmethod
+    def remove_tree(cursor, folder):
+        prefix, upper = FileIndex.prefix_range(folder)
+        cursor.execute("DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)", (folder, prefix, upper))
+        cursor.execute("DELETE FROM files WHERE dir = ? OR (dir >= ? AND dir < ?)", (folder, prefix, upper))
+
+    def update(self, root, should_stop=None):
+        for _ in self.iter_update(root, should_stop=should_stop):
+            pass
+
+    def iter_files(self, root, filter_types=(), exclude_types=(), with_stat=False):
+        """
+        直接从索引读取 root 下的文件，按目录产出 (目录, 匹配的文件列表)，不访问磁盘。
+        大小和修改时间是最近一次 iter_update 时的值，需要最新值时应使用 iter_update。
+        """
+        root = os.path.abspath(root)
+        prefix, upper = self.prefix_range(root)
+        matcher = FileScanner(filter_types, exclude_types)
+        rows = self.connection.execute(
+            "SELECT dir, name, size, mtime FROM files WHERE dir = ? OR (dir >= ? AND dir < ?) ORDER BY dir",
+            (root, prefix, upper))
+        current = None
+        matched = []
+        for folder, name, size, mtime in rows:
+            if folder != current:
+                if matched:
+                    yield current, matched
+                current = folder
+                matched = []
+            if matcher.matches(name):
+                path = os.path.join(folder, name)
+                matched.append((path, size, mtime) if with_stat else path)
+        if matched:
+            yield current, matched
+
+
+def stat_mtime(folder):
+    try:
+        return os.stat(folder).st_mtime_ns
+    except OSError:
+        return None
+
+
+def probe_directory(lister, folder, cached, with_stat):
+    """
+    在工作线程中取得目录内容，返回 (文件条目, 子目录)，文件条目为 (文件名, 大小, 修改时间)。
+    目录未变化时子目录为 None，由调用方从索引读取；列目录失败时文件条目为 None。
+    """
+    if cached is not None:
+        if not with_stat:
+            return cached, None
+        refreshed = []
+        for name, size, mtime in cached:
+            try:
+                stat = os.stat(os.path.join(folder, name))
+            except FileNotFoundError:
+                # 目录修改时间未变但文件已消失（时间粒度内的修改），改为重新列出
+                break
+            except OSError:
+                refreshed.append((name, size, mtime))
+                continue
+            refreshed.append((name, stat.st_size, stat.st_mtime))
+        else:
+            return refreshed, None
+    try:
+        files, subdirs = lister.list_directory(folder)
+    except OSError:
+        return None, None
+    basename = os.path.basename
+    return [(basename(path), size, mtime) for path, size, mtime in files], subdirs
@@ -0,0 +1,157 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# 并行遍历默认使用的线程数，目录遍历主要耗时在系统调用上，线程数可以高于 CPU 核数
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+def compile_suffixes(types):
+    """
+    将逗号分隔的字符串或类型列表预处理为小写后缀元组，可直接传给 str.endswith 一次完成匹配。
+    """
+    if isinstance(types, str):
+        types = types.split(',')
+    return tuple(sorted({t.strip().lower() for t in types or () if t and t.strip()}))
+
+
+class FileScanner:
+    """
+    基于 os.scandir 的文件扫描引擎：过滤后缀预编译为元组，复用 DirEntry 中的类型与 stat 信息，
+    子目录分发到线程池中并行遍历。
+    """
+
+    def __init__(self, filter_types=(), exclude_types=(), max_workers=DEFAULT_WORKERS, with_stat=False):
+        self.filter_suffixes = compile_suffixes(filter_types)
+        self.exclude_suffixes = compile_suffixes(exclude_types)
+        self.max_workers = max_workers
+        # with_stat 为 True 时产出 (路径, 大小, 修改时间)，否则只产出路径
+        self.with_stat = with_stat
+
+    def matches(self, name):
+        lower = name.lower()
+        if self.filter_suffixes and not lower.endswith(self.filter_suffixes):
+            return False
+        if self.exclude_suffixes and lower.endswith(self.exclude_suffixes):
+            return False
+        return True
+
+    def scan_directory(self, folder):
+        """
+        列出单个目录，返回 (目录, 匹配的文件, 子目录)。与 os.walk 一致：指向目录的符号链接不递归，无权限的目录直接跳过。
+        """
+        try:
+            files, subdirs = self.list_directory(folder)
+        except OSError:
+            return folder, [], []
+        return folder, files, subdirs
+
+    def list_directory(self, folder):
+        """
+        列出单个目录，返回 (匹配的文件, 子目录)；目录本身无法列出时抛出 OSError，由调用方决定如何处理。
+        """
+        files = []
+        subdirs = []
+        filter_suffixes = self.filter_suffixes
+        exclude_suffixes = self.exclude_suffixes
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        if not entry.is_symlink():
+                            subdirs.append(entry.path)
+                        continue
+                except OSError:
+                    pass
+                lower = entry.name.lower()
+                if filter_suffixes and not lower.endswith(filter_suffixes):
+                    continue
+                if exclude_suffixes and lower.endswith(exclude_suffixes):
+                    continue
+                if self.with_stat:
+                    try:
+                        stat = entry.stat()
+                        files.append((entry.path, stat.st_size, stat.st_mtime))
+                    except OSError:
+                        files.append((entry.path, 0, 0.0))
+                else:
+                    files.append(entry.path)
+        return files, subdirs
+
+    def iter_scan(self, root, should_stop=None):
+        """
+        遍历 root，按目录完成顺序产出 (目录, 文件列表)，没有匹配文件的目录不产出。
+        提前关闭生成器会取消尚未开始的目录任务；should_stop 返回 True 时结束，即使长时间没有找到匹配的文件也能及时响应。
+        """
+        if self.max_workers <= 1:
+            yield from self.iter_scan_serial(root, should_stop)
+            return
+
+        results = queue.SimpleQueue()
+        finished = object()
+        lock = threading.Lock()
+        state = {'tasks': 1}
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="FileScanner")
+
+        def task(start_folder):
+            # 每个任务深度优先处理自己的子树；线程池有空闲时才把子目录分出去，减少任务调度开销
+            stack = [start_folder]
+            try:
+                while stack and not stop.is_set():
+                    folder, files, subdirs = self.scan_directory(stack.pop())
+                    if files:
+                        results.put((folder, files))
+                    for subdir in subdirs:
+                        with lock:
+                            share = state['tasks'] < self.max_workers
+                            if share:
+                                state['tasks'] += 1
+                        if share:
+                            try:
+                                executor.submit(task, subdir)
+                            except RuntimeError:
+                                # 生成器已关闭，线程池不再接受新任务
+                                return
+                        else:
+                            stack.append(subdir)
+            finally:
+                with lock:
+                    state['tasks'] -= 1
+                    done = state['tasks'] == 0
+                if done:
+                    results.put(finished)
+
+        stop = threading.Event()
+        try:
+            executor.submit(task, root)
+            while True:
+                try:
+                    item = results.get(timeout=0.1)
+                except queue.Empty:
+                    if should_stop and should_stop():
+                        return
+                    continue
+                if item is finished:
+                    break
+                yield item
+        finally:
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def iter_scan_serial(self, root, should_stop=None):
+        stack = [root]
+        while stack:
+            if should_stop and should_stop():
+                return
+            folder, files, subdirs = self.scan_directory(stack.pop())
+            if files:
+                yield folder, files
+            # 反向入栈，保持与 os.walk 相同的先序遍历顺序
+            stack.extend(reversed(subdirs))
+
+    def scan(self, root):
+        file_dict = {}
+        for folder, files in self.iter_scan(root):
+            file_dict[folder] = files
+        return file_dict
@@ -0,0 +1,152 @@
+import re
+from array import array
+from collections import defaultdict
+
+# 搜索模式
+SUBSTRING = 'substring'
+GLOB = 'glob'
+REGEX = 'regex'
+
+
+def glob_to_regex(pattern):
+    """
+    将通配符转换为匹配单个文件名的正则，整名匹配。
+    """
+    parts = []
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        index += 1
+        if char == '*':
+            parts.append('[^\n]*')
+        elif char == '?':
+            parts.append('[^\n]')
+        elif char == '[':
+            end = pattern.find(']', index + 1 if pattern[index:index + 1] in ('!', ']') else index)
+            if end == -1:
+                parts.append(re.escape(char))
+                continue
+            body = pattern[index:end].replace('\\', '\\\\')
+            if body.startswith('!'):
+                body = '^' + body[1:]
+            parts.append(f'[{body}]')
+            index = end + 1
+        else:
+            parts.append(re.escape(char))
+    return '^' + ''.join(parts) + '$'
+
+
+def glob_literals(pattern):
+    """
+    返回通配符中的字面量片段：按 *、? 与方括号表达式（含 [!...]）切开，方括号中的字符不算字面量。
+    方括号的解析规则与 glob_to_regex 一致，没有闭合的 [ 按普通字符处理。
+    """
+    literals = ['']
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        index += 1
+        if char in '*?':
+            literals.append('')
+        elif char == '[':
+            end = pattern.find(']', index + 1 if pattern[index:index + 1] in ('!', ']') else index)
+            if end == -1:
+                literals[-1] += char
+                continue
+            literals.append('')
+            index = end + 1
+        else:
+            literals[-1] += char
+    return literals
+
+
+class FileSearchIndex:
+    """
+    文件名搜索索引：以扫描结果 ScanResultStore 的文件 id 为单位，对小写文件名建立三元组倒排表，
+    子串查询先求倒排表交集再逐个确认；通配符用其中最长的字面量经倒排表缩小范围；字面量过短的通配符与正则查询逐个文件名匹配。
+    索引本身只保存文件 id，文件名在确认匹配时通过 store.name(id) 取出，已删除的文件由 store 的删除标记过滤。
+    """
+
+    def __init__(self, store, should_stop=None):
+        self.store = store
+        self.count = 0  # 已建立索引的文件 id 数，store 中之后追加的文件由 sync() 补上
+        self.trigrams = defaultdict(lambda: array('I'))  # 三元组 -> 按文件 id 递增排列的 id 列表
+        self.sync(should_stop)
+
+    def __len__(self):
+        return self.store.alive[:self.count].count(1)
+
+    def sync(self, should_stop=None):
+        """
+        为 store 中尚未索引的文件建立索引。只读取调用时已追加完成的文件 id，
+        因此可以在后台线程中对界面线程仍在追加的结果建立索引。返回 False 表示被 should_stop 中断。
+        """
+        trigrams = self.trigrams
+        name = self.store.name
+        total = len(self.store.dir_ids)
+        for file_id in range(self.count, total):
+            if should_stop and file_id % 10000 == 0 and should_stop():
+                self.count = file_id
+                return False
+            lower = name(file_id).lower()
+            for gram in {lower[i:i + 3] for i in range(len(lower) - 2)}:
+                trigrams[gram].append(file_id)
+        self.count = max(self.count, total)
+        return True
+
+    def lower_name(self, file_id):
+        return self.store.name(file_id).lower()
+
+    def candidates(self, keyword):
+        lower_name = self.lower_name
+        if len(keyword) < 3:
+            alive = self.store.alive
+            return [file_id for file_id in range(self.count) if alive[file_id] and keyword in lower_name(file_id)]
+        # 只取最短的倒排表，逐个确认文件名即可，避免遍历其余较长的倒排表
+        shortest = None
+        for gram in {keyword[i:i + 3] for i in range(len(keyword) - 2)}:
+            ids = self.trigrams.get(gram)
+            if ids is None:
+                return []
+            if shortest is None or len(ids) < len(shortest):
+                shortest = ids
+        if len(keyword) == 3:
+            return list(shortest)
+        return [file_id for file_id in shortest if keyword in lower_name(file_id)]
+
+    def glob_candidates(self, pattern):
+        # 取通配符中最长的一段字面量用倒排表缩小范围，再用正则确认整名匹配
+        literal = max(glob_literals(pattern), key=len)
+        regex = re.compile(glob_to_regex(pattern), re.IGNORECASE)
+        if len(literal) < 3:
+            return self.match_names(regex)
+        name = self.store.name
+        return [file_id for file_id in self.candidates(literal) if regex.match(name(file_id))]
+
+    def match_names(self, regex):
+        # 每个文件名单独匹配，匹配不会跨越文件名边界，\A、\Z 等锚点也按单个文件名解释
+        search = regex.search
+        name = self.store.name
+        alive = self.store.alive
+        return [file_id for file_id in range(self.count) if alive[file_id] and search(name(file_id))]
+
+    def search(self, query, mode=SUBSTRING):
+        """
+        返回 {文件夹: [文件路径, ...]}。mode 为 substring（包含关键词）、glob（通配符）或 regex（正则），均不区分大小写。
+        正则语法错误时抛出 re.error。
+        """
+        if mode == GLOB:
+            ids = self.glob_candidates(query.lower())
+        elif mode == REGEX:
+            # 正则按输入原样编译，转为小写会改变 \D、\W、\S 等转义的含义
+            ids = self.match_names(re.compile(query, re.IGNORECASE))
+        else:
+            ids = self.candidates(query.lower())
+
+        store = self.store
+        alive = store.alive
+        result = {}
+        for file_id in ids:
+            if alive[file_id]:
+                result.setdefault(store.folders[store.dir_ids[file_id]], []).append(store.path(file_id))
+        return result
@@ -0,0 +1,232 @@
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+
+from Manager.FileScanner import FileScanner
+
+logger = logging.getLogger("FileWatcher")
+
+# 事件类型
+CREATED = 'created'
+DELETED = 'deleted'
+DIR_DELETED = 'dir_deleted'
+RESYNC = 'resync'  # 事件丢失（inotify 队列溢出），路径为监听根目录，需要重新扫描
+
+# inotify 常量（linux/inotify.h）
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_ONLYDIR
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class FileWatcher:
+    """
+    在后台线程中监听 root 下的文件增删，回调参数为 (事件类型, 路径)，回调在监听线程中执行。
+    Linux 上使用 inotify，不可用或监听数量超出系统限制时退回到定期轮询目录修改时间。
+    重命名按删除旧路径、创建新路径两个事件上报；事件队列溢出时上报 RESYNC，由调用方重新扫描根目录。
+    """
+
+    def __init__(self, root, callback, poll_interval=2.0, force_polling=False):
+        self.root = os.path.abspath(root)
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self.force_polling = force_polling
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.mode = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="FileWatcher", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=self.poll_interval + 1)
+        self.thread = None
+
+    def run(self):
+        try:
+            if not self.force_polling and sys.platform.startswith('linux'):
+                try:
+                    self.mode = 'inotify'
+                    InotifyBackend(self).run()
+                    return
+                except OSError as e:
+                    logger.warning(f"inotify 不可用，改用轮询: {e}")
+            self.mode = 'polling'
+            PollingBackend(self).run()
+        except Exception as e:
+            logger.error(f"监听 {self.root} 时发生错误: {e}", exc_info=True)
+
+    def emit(self, event, path):
+        try:
+            self.callback(event, path)
+        except Exception as e:
+            logger.error(f"处理文件事件 {event} {path} 时发生错误: {e}", exc_info=True)
+
+
+# 列目录与扫描共用同一实现，符号链接和无权限目录的处理保持一致
+directory_lister = FileScanner()
+
+
+class InotifyBackend:
+    def __init__(self, watcher):
+        self.watcher = watcher
+        libc_name = ctypes.util.find_library('c')
+        if not libc_name:
+            raise OSError("找不到 libc")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        self.watches = {}  # 监听描述符 -> 目录
+        try:
+            self.add_tree(self.watcher.root, report=False)
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def add_watch(self, folder):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(folder), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error == errno.ENOSPC:
+                raise OSError(error, "inotify 监听数量已达系统上限 (fs.inotify.max_user_watches)")
+            return
+        self.watches[wd] = folder
+
+    def add_tree(self, root, report=True):
+        # 新建的目录需要递归添加监听；report 为 True 时把其中已有的文件作为创建事件上报
+        stack = [root]
+        while stack:
+            folder = stack.pop()
+            self.add_watch(folder)
+            _, files, subdirs = directory_lister.scan_directory(folder)
+            if report:
+                for path in files:
+                    self.watcher.emit(CREATED, path)
+            stack.extend(subdirs)
+
+    def remove_tree(self, folder):
+        prefix = folder + os.sep
+        for wd, path in list(self.watches.items()):
+            if path == folder or path.startswith(prefix):
+                del self.watches[wd]
+
+    def run(self):
+        try:
+            while not self.watcher.stop_event.is_set():
+                ready, _, _ = select.select([self.fd], [], [], 0.5)
+                if not ready:
+                    continue
+                try:
+                    data = os.read(self.fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                self.handle(data)
+        finally:
+            os.close(self.fd)
+
+    def handle(self, data):
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # 丢失的事件中可能有新建的目录，重新补齐监听后通知调用方重新扫描
+                logger.warning("inotify 事件队列溢出，部分变化未被记录，将重新扫描")
+                self.add_tree(self.watcher.root, report=False)
+                self.watcher.emit(RESYNC, self.watcher.root)
+                continue
+            folder = self.watches.get(wd)
+            if folder is None:
+                continue
+            if mask & (IN_IGNORED | IN_DELETE_SELF):
+                if mask & IN_IGNORED:
+                    self.watches.pop(wd, None)
+                continue
+
+            path = os.path.join(folder, name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self.add_tree(path)
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    self.remove_tree(path)
+                    self.watcher.emit(DIR_DELETED, path)
+            elif mask & (IN_CREATE | IN_MOVED_TO):
+                self.watcher.emit(CREATED, path)
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                self.watcher.emit(DELETED, path)
+
+
+class PollingBackend:
+    def __init__(self, watcher):
+        self.watcher = watcher
+        self.snapshot = {}  # 目录 -> (修改时间, 文件路径集合, 子目录路径集合)
+        self.take_snapshot(self.watcher.root, report=False)
+
+    def take_snapshot(self, root, report=True):
+        stack = [root]
+        while stack:
+            folder = stack.pop()
+            try:
+                mtime_ns = os.stat(folder).st_mtime_ns
+            except OSError:
+                continue
+            _, files, subdirs = directory_lister.scan_directory(folder)
+            self.snapshot[folder] = (mtime_ns, set(files), set(subdirs))
+            if report:
+                for path in files:
+                    self.watcher.emit(CREATED, path)
+            stack.extend(subdirs)
+
+    def drop_snapshot(self, folder):
+        prefix = folder + os.sep
+        for path in [p for p in self.snapshot if p == folder or p.startswith(prefix)]:
+            del self.snapshot[path]
+
+    def run(self):
+        while not self.watcher.stop_event.wait(self.watcher.poll_interval):
+            self.poll()
+
+    def poll(self):
+        for folder, (mtime_ns, files, subdirs) in list(self.snapshot.items()):
+            if folder not in self.snapshot:
+                continue
+            try:
+                current_mtime = os.stat(folder).st_mtime_ns
+            except OSError:
+                continue  # 由父目录的变化负责上报
+            if current_mtime == mtime_ns:
+                continue
+            _, current_files, current_subdirs = directory_lister.scan_directory(folder)
+            current_files, current_subdirs = set(current_files), set(current_subdirs)
+            self.snapshot[folder] = (current_mtime, current_files, current_subdirs)
+            for path in files - current_files:
+                self.watcher.emit(DELETED, path)
+            for path in current_files - files:
+                self.watcher.emit(CREATED, path)
+            for path in subdirs - current_subdirs:
+                self.drop_snapshot(path)
+                self.watcher.emit(DIR_DELETED, path)
+            for path in current_subdirs - subdirs:
+                self.take_snapshot(path)
@@ -1,58 +1,315 @@
+import ast
+import hashlib
 import importlib.util
 import inspect
+import json
 import logging
 import os
 import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from PySide6.QtWidgets import QWidget, QMessageBox
 
+from utils.StartupProfiler import startup_profiler
+
 logger = logging.getLogger("ModuleManager")
 
+# 可选的模块清单，位于模块目录下，存在时优先于源码解析
+MANIFEST_FILE = 'modules.json'
+# 模块发现缓存格式版本，格式变化时旧缓存整体失效
+CACHE_VERSION = 2
+CACHE_ENTRY_KEYS = {'mtime_ns', 'size', 'hash', 'class_name', 'display_name', 'is_special'}
+
+# 从 QtWidgets 导入但不是 QWidget 子类的常见名称
+NON_WIDGET_NAMES = {
+    'QApplication', 'QStyleFactory', 'QSizePolicy', 'QStyle', 'QButtonGroup', 'QCompleter',
+    'QDataWidgetMapper', 'QFileSystemModel', 'QGraphicsScene', 'QScroller', 'QSystemTrayIcon',
+    'QUndoStack', 'QUndoGroup', 'QGesture', 'QColormap', 'QFileIconProvider',
+}
+NON_WIDGET_SUFFIXES = ('Layout', 'Item', 'Delegate', 'Event', 'Option', 'Model', 'Painter')
+# 对话框类不会作为模块页面，仅在没有其他控件类时才选用
+DIALOG_SUFFIXES = ('Dialog', 'MessageBox')
+
+
+class ModuleDescriptor:
+    def __init__(self, module_name, class_name, module_file, is_special=False, display_name=None):
+        # 轻量级模块描述：只记录元数据，模块文件在首次打开时才执行
+        self.module_name = module_name
+        self.class_name = class_name
+        self.module_file = Path(module_file)
+        self.is_special = is_special
+        self.display_name = display_name or class_name
+        self.module_cls = None
+
+    def __repr__(self):
+        return f"ModuleDescriptor({self.module_name}.{self.class_name})"
+
+
 class ModuleManager:
-    def __init__(self, modules_folder: str = None):
+    def __init__(self, modules_folder: str = None, cache_file: str = 'module_cache.json'):
         # 初始化模块管理器
         base_path = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
         current_dir = Path(base_path).resolve().parent
         self.modules_folder = Path(modules_folder) if modules_folder else current_dir / 'Modules'
+        self.cache_file = Path(cache_file) if cache_file else None
+        # 发现结果缓存: 文件路径 -> {mtime_ns, size, hash, class_name, display_name, is_special}
+        self.discovery_cache = self.load_discovery_cache()
+        self.cache_dirty = False
         self.modules = []
         self.load_modules()
 
     def load_modules(self):
-        logger.info("=== 开始加载所有模块 ===")
+        logger.info("=== 开始发现所有模块 ===")
         if not self.modules_folder.is_dir():
             logger.error(f"指定的模块路径不存在: {self.modules_folder}")
             QMessageBox.critical(None, "加载模块失败", f"指定的模块路径不存在: {self.modules_folder}")
             return
 
+        manifest = self.load_manifest()
         module_files = [f for f in self.modules_folder.iterdir() if f.suffix == '.py' and f.name != '__init__.py']
         for module_file in module_files:
             module_name = module_file.stem
-            self.load_single_module(module_file, module_name)
+            descriptor = self.discover_module(module_file, module_name, manifest.get(module_name))
+            if descriptor:
+                self.modules.append(descriptor)
+
+        # 清理已删除模块文件的缓存条目
+        existing = {str(f) for f in module_files}
+        for path in [path for path in self.discovery_cache if path not in existing]:
+            del self.discovery_cache[path]
+            self.cache_dirty = True
+        self.save_discovery_cache()
+
+    def load_discovery_cache(self):
+        if not self.cache_file or not self.cache_file.is_file():
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as file:
+                cache = json.load(file)
+            if not isinstance(cache, dict) or cache.get('version') != CACHE_VERSION:
+                logger.info("模块发现缓存版本不匹配，将重新扫描")
+                return {}
+            entries = cache.get('modules')
+            # 缓存只是加速手段，内容不完整（如写入中途被中断的旧版本缓存）时整体丢弃，不能因此跳过模块
+            if not isinstance(entries, dict) or not all(
+                    isinstance(entry, dict) and CACHE_ENTRY_KEYS <= entry.keys() for entry in entries.values()):
+                logger.warning(f"模块发现缓存 {self.cache_file} 内容无效，将重新扫描")
+                return {}
+            logger.info(f"已读取模块发现缓存: {self.cache_file} ({len(entries)} 项)")
+            return entries
+        except Exception as e:
+            logger.warning(f"读取模块发现缓存 {self.cache_file} 失败，将重新扫描: {e}")
+            return {}
+
+    def save_discovery_cache(self):
+        if not self.cache_file or not self.cache_dirty:
+            return
+        # 与 ConfigManager.save_config 相同：先写同目录临时文件再替换，写入中途退出也不会留下半个缓存
+        temp_path = None
+        try:
+            directory = self.cache_file.resolve().parent
+            fd, temp_path = tempfile.mkstemp(prefix='.module_cache-', suffix='.tmp', dir=directory)
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump({'version': CACHE_VERSION, 'modules': self.discovery_cache}, file,
+                          indent=4, ensure_ascii=False)
+            os.replace(temp_path, self.cache_file)
+            temp_path = None
+            self.cache_dirty = False
+            logger.info(f"已保存模块发现缓存: {self.cache_file}")
+        except Exception as e:
+            logger.error(f"保存模块发现缓存 {self.cache_file} 失败: {e}")
+        finally:
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def load_manifest(self):
+        manifest_file = self.modules_folder / MANIFEST_FILE
+        if not manifest_file.is_file():
+            return {}
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as file:
+                manifest = json.load(file)
+            logger.info(f"已读取模块清单: {manifest_file}")
+            return manifest
+        except Exception as e:
+            logger.error(f"读取模块清单 {manifest_file} 失败: {e}")
+            return {}
+
+    def discover_module(self, module_file, module_name, manifest_entry=None):
+        manifest_entry = manifest_entry or {}
+        if not manifest_entry.get('enabled', True):
+            logger.info(f"模块 {module_name} 已在清单中禁用，跳过")
+            return None
+        class_name = manifest_entry.get('class')
+        display_name = manifest_entry.get('display_name')
+        is_special = module_name == "Setting"
+        if not class_name:
+            entry = self.scan_module_source(module_file, module_name)
+            if entry is None:
+                return None
+            class_name = entry['class_name']
+            display_name = display_name or entry['display_name']
+            is_special = entry['is_special']
+        is_special = manifest_entry.get('special', is_special)
+
+        logger.info(f"  → 已发现模块类: {class_name} ({module_name})")
+        return ModuleDescriptor(module_name, class_name, module_file, is_special, display_name)
 
-    def load_single_module(self, module_file, module_name):
+    def scan_module_source(self, module_file, module_name):
+        # 解析源码查找模块的 QWidget 子类，不执行模块代码；文件未变化时直接使用缓存
+        path = str(module_file)
+        try:
+            stat = module_file.stat()
+            cached = self.discovery_cache.get(path)
+            if cached and cached['mtime_ns'] == stat.st_mtime_ns and cached['size'] == stat.st_size:
+                return cached if cached['class_name'] else None
+
+            with open(module_file, 'rb') as file:
+                source = file.read()
+            digest = hashlib.sha1(source).hexdigest()
+            if cached and cached['hash'] == digest:
+                # 仅时间戳变化（如重新检出），内容相同无需重新解析
+                entry = dict(cached, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            else:
+                logger.info(f"正在解析模块源码: {module_name}")
+                discovered = find_widget_class(ast.parse(source, filename=path), module_name)
+                class_name, display_name = discovered or (None, None)
+                entry = {
+                    'mtime_ns': stat.st_mtime_ns,
+                    'size': stat.st_size,
+                    'hash': digest,
+                    'class_name': class_name,
+                    'display_name': display_name,
+                    'is_special': module_name == "Setting",
+                }
+            self.discovery_cache[path] = entry
+            self.cache_dirty = True
+            if not entry['class_name']:
+                logger.warning(f"未找到 QWidget 子类于模块 {module_name}，跳过加载")
+                return None
+            return entry
+        except SyntaxError as e:
+            logger.error(f"模块 {module_name} 存在语法错误: {e}")
+        except Exception as e:
+            logger.error(f"解析模块 {module_name} 时发生错误: {e}", exc_info=True)
+        return None
+
+    def load_single_module(self, descriptor):
+        if descriptor.module_cls is not None:
+            return descriptor.module_cls
+        module_name = descriptor.module_name
         try:
             logger.info(f"正在加载模块: {module_name}")
-            spec = importlib.util.spec_from_file_location(module_name, module_file)
+            spec = importlib.util.spec_from_file_location(module_name, descriptor.module_file)
             module = importlib.util.module_from_spec(spec)
             # 注意：在执行模块前，先检查是否有全局执行的代码
             # 因为我们无法控制模块中的代码，因此需要确保模块中没有在导入时执行需要 QApplication 初始化的代码
-            spec.loader.exec_module(module)
+            with startup_profiler.span(f'import {module_name}', category='module'):
+                spec.loader.exec_module(module)
             logger.info(f"模块 {module_name} 导入成功")
 
-            for name, obj in inspect.getmembers(module, inspect.isclass):
-                if issubclass(obj, QWidget) and obj.__module__ == module_name:
-                    logger.info(f"找到 QWidget 子类: {name}")
-                    is_special = module_name == "Setting"
-                    self.modules.append((obj, is_special))
-                    logger.info(f"  → 已加载模块类: {name} ({module_name})")
-                    break
-            else:
-                logger.warning(f"未找到 QWidget 子类于模块 {module_name}，跳过加载")
+            obj = getattr(module, descriptor.class_name, None)
+            if inspect.isclass(obj) and issubclass(obj, QWidget):
+                descriptor.module_cls = obj
+                logger.info(f"  → 已加载模块类: {descriptor.class_name} ({module_name})")
+                return obj
+            logger.warning(f"模块 {module_name} 中的 {descriptor.class_name} 不是 QWidget 子类，跳过加载")
         except ImportError as e:
             logger.error(f"模块 {module_name} 无法导入: {e}")
         except Exception as e:
             logger.error(f"加载模块 {module_name} 时发生错误: {e}", exc_info=True)
+        return None
+
+    def import_modules(self, descriptors, on_imported=None, max_workers=None):
+        # 在工作线程中并发导入模块文件，完成回调在调用线程（GUI 线程）中按完成顺序执行
+        pending = [d for d in descriptors if d.module_cls is None]
+        if not pending:
+            return
+        logger.info(f"=== 开始并行导入 {len(pending)} 个模块 ===")
+        started = time.perf_counter()
+        workers = max_workers or min(8, len(pending))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ModuleImport") as executor:
+            futures = {executor.submit(self.timed_load_single_module, d): d for d in pending}
+            for future in as_completed(futures):
+                descriptor = futures[future]
+                module_cls, elapsed = future.result()
+                logger.info(f"模块 {descriptor.module_name} 导入耗时 {elapsed * 1000:.0f} ms")
+                if on_imported:
+                    on_imported(descriptor, module_cls, elapsed)
+        logger.info(f"=== 并行导入完成，总耗时 {(time.perf_counter() - started) * 1000:.0f} ms ===")
+
+    def timed_load_single_module(self, descriptor):
+        started = time.perf_counter()
+        module_cls = self.load_single_module(descriptor)
+        return module_cls, time.perf_counter() - started
 
     def get_modules(self):
-        sorted_modules = sorted(self.modules, key=lambda m: (m[1], m[0].__name__))
+        sorted_modules = sorted(self.modules, key=lambda m: (m.is_special, m.class_name))
         return sorted_modules
+
+
+def find_widget_class(tree, module_name=None):
+    # 收集从 QtWidgets 导入的控件类名和模块别名
+    widget_names = set()
+    dialog_names = set()
+    module_aliases = set()
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.module and node.module.endswith('QtWidgets'):
+            for alias in node.names:
+                name = alias.name
+                if name in NON_WIDGET_NAMES or name.endswith(NON_WIDGET_SUFFIXES):
+                    continue
+                widget_names.add(alias.asname or name)
+                if name.endswith(DIALOG_SUFFIXES):
+                    dialog_names.add(alias.asname or name)
+        elif isinstance(node, ast.ImportFrom) and node.module in ('PySide6', 'PyQt6', 'PyQt5'):
+            module_aliases.update(alias.asname or alias.name for alias in node.names if alias.name == 'QtWidgets')
+        elif isinstance(node, ast.Import):
+            module_aliases.update(alias.asname for alias in node.names
+                                  if alias.asname and alias.name.endswith('QtWidgets'))
+
+    def base_name(base):
+        return base.id if isinstance(base, ast.Name) else getattr(base, 'attr', None)
+
+    def is_widget_base(base):
+        if isinstance(base, ast.Name):
+            return base.id in widget_names
+        if isinstance(base, ast.Attribute) and base.attr not in NON_WIDGET_NAMES:
+            return ast.unparse(base.value).split('.')[-1] in module_aliases | {'QtWidgets'}
+        return False
+
+    classes = [node for node in tree.body if isinstance(node, ast.ClassDef)]
+    # 同一文件中继承自控件类的类同样视为控件类，循环直到不再新增
+    changed = True
+    while changed:
+        changed = False
+        for node in classes:
+            if node.name not in widget_names and any(is_widget_base(base) for base in node.bases):
+                widget_names.add(node.name)
+                changed = True
+            if node.name not in dialog_names and any(
+                    base_name(base) in dialog_names or str(base_name(base)).endswith(DIALOG_SUFFIXES)
+                    for base in node.bases):
+                dialog_names.add(node.name)
+                changed = True
+
+    candidates = sorted(node.name for node in classes if node.name in widget_names)
+    if not candidates:
+        return None
+    # 优先与模块文件同名的类，其次非对话框类，最后按类名排序取第一个
+    if module_name in candidates:
+        return module_name, find_display_name(tree)
+    pages = [name for name in candidates if name not in dialog_names]
+    return (pages or candidates)[0], find_display_name(tree)
+
+
+def find_display_name(tree):
+    # 模块可通过 MODULE_DISPLAY_NAME = "..." 声明导航列表中显示的名称
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name) and node.targets[0].id == 'MODULE_DISPLAY_NAME'
+                and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str)):
+            return node.value.value
+    return None
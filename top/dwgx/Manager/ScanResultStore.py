@@ -0,0 +1,290 @@
+import os
+from array import array
+from itertools import accumulate, islice
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，没有时聚合统计逐项累加
+    np = None
+
+
+def format_size(size):
+    for unit in ('B', 'KB', 'MB', 'GB', 'TB'):
+        if abs(size) < 1024 or unit == 'TB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.2f} {unit}"
+        size /= 1024
+
+
+def encode_name(name):
+    # 无法解码的文件名（surrogateescape）原样保存，取出时可还原
+    return name.encode('utf-8', 'surrogateescape')
+
+
+class PathSequence:
+    """
+    某个文件夹下文件路径的只读序列，保存的是文件 id，访问时才拼出完整路径。
+    """
+
+    def __init__(self, store, ids):
+        self.store = store
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.store.path(file_id) for file_id in self.ids[index]]
+        return self.store.path(self.ids[index])
+
+    def __iter__(self):
+        folder = self.store.folders[self.store.dir_ids[self.ids[0]]] if self.ids else None
+        name = self.store.name
+        for file_id in self.ids:
+            yield os.path.join(folder, name(file_id))
+
+    def __contains__(self, path):
+        return self.store.find(path) in self.ids
+
+
+class ScanResultStore:
+    """
+    按列存储的扫描结果：目录路径只保存一次，每个文件只占用文件名字节、目录 id、大小、修改时间和扩展名 id 几个数组项。
+    删除文件时只做标记，不移动数组。提供与 {文件夹: [路径, ...]} 相同的 items()/get()/keys() 接口，路径按需生成。
+    """
+
+    def __init__(self):
+        self.folders = []  # 目录 id -> 目录路径
+        self.folder_ids = {}
+        self.runs = []  # 目录 id -> [(起始文件 id, 结束文件 id), ...]，同一目录的文件通常是连续的一段
+        self.live_counts = array('I')  # 目录 id -> 有效文件数
+        self.names = bytearray()  # 所有文件名的 UTF-8 字节
+        self.name_offsets = array('Q', (0,))  # 文件 id 的文件名位于 names[offsets[i]:offsets[i + 1]]
+        self.dir_ids = array('I')
+        self.sizes = array('q')
+        self.mtimes = array('d')
+        self.ext_ids = array('I')
+        self.extensions = []  # 扩展名 id -> 小写扩展名（含点，无扩展名为空串）
+        self.extension_ids = {}
+        self.alive = bytearray()  # 1 为有效，0 为已删除
+        self.file_total = 0
+
+    # ---- 写入 ----
+
+    def folder_id(self, folder):
+        dir_id = self.folder_ids.get(folder)
+        if dir_id is None:
+            dir_id = len(self.folders)
+            self.folders.append(folder)
+            self.folder_ids[folder] = dir_id
+            self.runs.append([])
+            self.live_counts.append(0)
+        return dir_id
+
+    def extension_id(self, name):
+        ext = os.path.splitext(name)[1].lower()
+        ext_id = self.extension_ids.get(ext)
+        if ext_id is None:
+            ext_id = len(self.extensions)
+            self.extensions.append(ext)
+            self.extension_ids[ext] = ext_id
+        return ext_id
+
+    def add_folder(self, folder, entries):
+        """
+        追加一个目录下的文件，entries 为路径列表或 (路径, 大小, 修改时间) 列表。
+        """
+        if not entries:
+            return
+        dir_id = self.folder_id(folder)
+        start = len(self.dir_ids)
+        if isinstance(entries[0], tuple):
+            names = [os.path.basename(path) for path, _, _ in entries]
+            self.sizes.extend([size for _, size, _ in entries])
+            self.mtimes.extend([mtime for _, _, mtime in entries])
+        else:
+            names = [os.path.basename(path) for path in entries]
+            self.sizes.extend([0] * len(names))
+            self.mtimes.extend([0.0] * len(names))
+        encoded = [encode_name(name) for name in names]
+        base = self.name_offsets[-1]
+        self.names += b''.join(encoded)
+        self.name_offsets.extend(islice(accumulate((len(name) for name in encoded), initial=base), 1, None))
+        self.dir_ids.extend([dir_id] * len(names))
+        self.ext_ids.extend([self.extension_id(name) for name in names])
+        self.alive.extend(b'\x01' * len(names))
+
+        end = start + len(names)
+        runs = self.runs[dir_id]
+        if runs and runs[-1][1] == start:
+            runs[-1] = (runs[-1][0], end)
+        else:
+            runs.append((start, end))
+        self.live_counts[dir_id] += len(names)
+        self.file_total += len(names)
+
+    def add(self, path, size=0, mtime=0.0):
+        self.add_folder(os.path.dirname(path), [(path, size, mtime)])
+
+    def remove(self, path):
+        file_id = self.find(path)
+        if file_id is None:
+            return False
+        self.alive[file_id] = 0
+        self.live_counts[self.dir_ids[file_id]] -= 1
+        self.file_total -= 1
+        return True
+
+    def remove_tree(self, folder):
+        """
+        删除 folder 及其子目录下的全部文件，返回删除的文件数。
+        """
+        prefix = folder + os.sep
+        removed = 0
+        for dir_id, path in enumerate(self.folders):
+            if self.live_counts[dir_id] and (path == folder or path.startswith(prefix)):
+                for file_id in self.folder_file_ids(dir_id):
+                    self.alive[file_id] = 0
+                removed += self.live_counts[dir_id]
+                self.live_counts[dir_id] = 0
+        self.file_total -= removed
+        return removed
+
+    def snapshot(self):
+        """
+        返回当前结果的独立副本，供后台线程读取；此后对本对象的增删不影响副本。数组按内存块复制，百万级结果也很快。
+        """
+        copy = ScanResultStore.__new__(ScanResultStore)
+        copy.folders = list(self.folders)
+        copy.folder_ids = dict(self.folder_ids)
+        copy.runs = [list(runs) for runs in self.runs]
+        copy.live_counts = self.live_counts[:]
+        copy.names = self.names[:]
+        copy.name_offsets = self.name_offsets[:]
+        copy.dir_ids = self.dir_ids[:]
+        copy.sizes = self.sizes[:]
+        copy.mtimes = self.mtimes[:]
+        copy.ext_ids = self.ext_ids[:]
+        copy.extensions = list(self.extensions)
+        copy.extension_ids = dict(self.extension_ids)
+        copy.alive = self.alive[:]
+        copy.file_total = self.file_total
+        return copy
+
+    # ---- 读取 ----
+
+    def name(self, file_id):
+        offsets = self.name_offsets
+        return self.names[offsets[file_id]:offsets[file_id + 1]].decode('utf-8', 'surrogateescape')
+
+    def path(self, file_id):
+        return os.path.join(self.folders[self.dir_ids[file_id]], self.name(file_id))
+
+    def folder_file_ids(self, dir_id):
+        alive = self.alive
+        ids = array('I')
+        for start, end in self.runs[dir_id]:
+            ids.extend([file_id for file_id in range(start, end) if alive[file_id]])
+        return ids
+
+    def find(self, path):
+        dir_id = self.folder_ids.get(os.path.dirname(path))
+        if dir_id is None or not self.live_counts[dir_id]:
+            return None
+        target = encode_name(os.path.basename(path))
+        names = self.names
+        offsets = self.name_offsets
+        for file_id in self.folder_file_ids(dir_id):
+            if names[offsets[file_id]:offsets[file_id + 1]] == target:
+                return file_id
+        return None
+
+    def contains_file(self, path):
+        return self.find(path) is not None
+
+    def file_count(self):
+        return self.file_total
+
+    def iter_entries(self):
+        """
+        按文件 id 顺序产出 (路径, 大小, 修改时间)，跳过已删除的文件。
+        """
+        for file_id, alive in enumerate(self.alive):
+            if alive:
+                yield self.path(file_id), self.sizes[file_id], self.mtimes[file_id]
+
+    # ---- 与 {文件夹: [路径, ...]} 兼容的接口 ----
+
+    def __len__(self):
+        return sum(1 for count in self.live_counts if count)
+
+    def __bool__(self):
+        return self.file_total > 0
+
+    def __iter__(self):
+        return self.keys()
+
+    def __contains__(self, folder):
+        dir_id = self.folder_ids.get(folder)
+        return dir_id is not None and self.live_counts[dir_id] > 0
+
+    def __getitem__(self, folder):
+        if folder not in self:
+            raise KeyError(folder)
+        return PathSequence(self, self.folder_file_ids(self.folder_ids[folder]))
+
+    def get(self, folder, default=None):
+        return self[folder] if folder in self else default
+
+    def keys(self):
+        for dir_id, folder in enumerate(self.folders):
+            if self.live_counts[dir_id]:
+                yield folder
+
+    def values(self):
+        for _, files in self.items():
+            yield files
+
+    def items(self):
+        for dir_id, folder in enumerate(self.folders):
+            if self.live_counts[dir_id]:
+                yield folder, PathSequence(self, self.folder_file_ids(dir_id))
+
+    # ---- 聚合统计 ----
+
+    def aggregate(self, keys, weights, labels):
+        # 按 keys（目录 id 或扩展名 id）累加 weights，有 numpy 时向量化计算
+        if np is not None:
+            alive = np.frombuffer(self.alive, dtype=np.uint8).astype(bool)
+            key_array = np.frombuffer(keys, dtype=np.uint32)[alive]
+            weight_array = None if weights is None else np.frombuffer(weights, dtype=np.int64)[alive]
+            totals = np.bincount(key_array, weights=weight_array, minlength=len(labels))
+            return {labels[key]: int(total) for key, total in enumerate(totals) if total}
+        totals = [0] * len(labels)
+        alive = self.alive
+        if weights is None:
+            for key, live in zip(keys, alive):
+                if live:
+                    totals[key] += 1
+        else:
+            for key, weight, live in zip(keys, weights, alive):
+                if live:
+                    totals[key] += weight
+        return {labels[key]: total for key, total in enumerate(totals) if total}
+
+    def count_by_folder(self):
+        return {folder: count for folder, count in zip(self.folders, self.live_counts) if count}
+
+    def size_by_folder(self):
+        return self.aggregate(self.dir_ids, self.sizes, self.folders)
+
+    def count_by_extension(self):
+        return self.aggregate(self.ext_ids, None, self.extensions)
+
+    def size_by_extension(self):
+        return self.aggregate(self.ext_ids, self.sizes, self.extensions)
+
+    def nbytes(self):
+        # 列数据占用的字节数，不含目录表与扩展名表
+        columns = (self.name_offsets, self.dir_ids, self.sizes, self.mtimes, self.ext_ids)
+        return len(self.names) + len(self.alive) + sum(column.itemsize * len(column) for column in columns)
@@ -1,73 +1,495 @@
 
 
 import os
+import re
 import sys
-from collections import defaultdict
-from PySide6.QtCore import Qt, QUrl
+import time
+from PySide6.QtCore import Qt, QUrl, QThread, Signal, QTimer, QAbstractItemModel, QModelIndex, QCoreApplication
 from PySide6.QtGui import QDesktopServices, QIcon, QFont
 from PySide6.QtWidgets import (
     QApplication, QFileDialog, QMainWindow, QMessageBox, QVBoxLayout, QHBoxLayout, QWidget,
-    QPushButton, QTextEdit, QLabel, QLineEdit, QTreeWidget, QTreeWidgetItem, QStatusBar,
-    QGroupBox, QGridLayout, QDialog, QMenu
+    QPushButton, QLabel, QLineEdit, QTreeView, QStatusBar,
+    QGroupBox, QGridLayout, QMenu, QCheckBox, QComboBox, QAbstractItemView
 )
-from top.dwgx.Manager.ConfigManager import ConfigManager
+from Manager import ClassifierEngine
+from Manager.ConfigManager import ConfigManager
+from Manager.FileScanner import FileScanner
+from Manager.FileSearchIndex import FileSearchIndex, SUBSTRING, GLOB, REGEX
+from Manager.ScanResultStore import ScanResultStore, format_size
+from Manager.DuplicateFinder import DuplicateFinder
+from Manager.DiskUsage import DiskUsageReport
+from Manager.ContentSniffer import ContentSniffer
+from Manager.BulkActions import BulkJob, ACTION_NAMES, TRASH, MOVE, COPY, CLASSIFY_EXTENSION, CLASSIFY_DATE
+from Manager.FileWatcher import FileWatcher, CREATED, DELETED, DIR_DELETED, RESYNC
+from utils.DiskUsageDialog import DiskUsageDialog
+from utils.ResultView import ResultView
 
-class FileTreeDialog(QDialog):
-    def __init__(self, file_dict):
+class FolderNode:
+    def __init__(self, node_id, row, path, files):
+        self.node_id = node_id
+        self.row = row
+        self.path = path
+        self.files = files
+        self.fetched = 0  # 已交给视图的文件行数
+
+
+class FileTreeModel(QAbstractItemModel):
+    """
+    扫描结果的树模型：第一层为文件夹，第二层为文件。两层都通过 canFetchMore/fetchMore 按批交给视图，
+    只有展开并滚动到的行才会被创建，百万级结果也不会一次性生成全部节点。
+    """
+
+    FETCH_BATCH = 1000
+
+    def __init__(self, headers=("文件关系树",), show_full_path=False):
         super().__init__()
-        self.setWindowTitle("文件关系树")
-        self.resize(600, 400)
-        layout = QVBoxLayout(self)
-        self.tree_widget = QTreeWidget()
-        self.tree_widget.setHeaderLabels(["路径", "类型"])
-        self.tree_widget.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
-        self.tree_widget.customContextMenuRequested.connect(self.create_right_click_menu)
-        self.tree_widget.itemDoubleClicked.connect(self.open_item)
-        self.populate_tree(file_dict)
-        layout.addWidget(self.tree_widget)
-        self.setLayout(layout)
-
-    def populate_tree(self, file_dict):
+        self.headers = list(headers)
+        self.show_full_path = show_full_path
+        self.folders = []  # FolderNode 列表，顺序即第一层的行号
+        self.nodes = {}  # 文件夹路径 -> FolderNode
+        self.nodes_by_id = {}
+        self.next_id = 1  # 文件索引的 internalId 为所属文件夹的 node_id，文件夹索引为 0
+        self.fetched_folders = 0
+        self.fetching = False
+        self.folder_font = QFont()
+        self.folder_font.setBold(True)
+
+    def set_results(self, file_dict):
+        self.beginResetModel()
+        self.folders = []
+        self.nodes = {}
+        self.nodes_by_id = {}
+        self.fetched_folders = 0
         for folder, files in file_dict.items():
-            folder_item = QTreeWidgetItem([folder, "文件夹"])
-            self.tree_widget.addTopLevelItem(folder_item)
-            for file in files:
-                file_item = QTreeWidgetItem([file, "文件"])
-                file_item.setData(0, Qt.ItemDataRole.UserRole, file)
-                folder_item.addChild(file_item)
-        self.tree_widget.expandAll()
-
-    def create_right_click_menu(self, position):
-        item = self.tree_widget.itemAt(position)
-        if item and item.parent():
-            menu = QMenu(self.tree_widget)
-            open_action = menu.addAction(QIcon.fromTheme("document-open"), "打开")
-            delete_action = menu.addAction(QIcon.fromTheme("list-remove"), "删除")
-            open_action.triggered.connect(lambda: self.open_item(item, 0))
-            delete_action.triggered.connect(lambda: self.delete_item(item, 0))
-            menu.exec(self.tree_widget.mapToGlobal(position))
-
-    def open_item(self, item, column):
-        path = item.data(column, Qt.ItemDataRole.UserRole)
-        if os.path.isfile(path):
-            QDesktopServices.openUrl(QUrl.fromLocalFile(path))
-
-    def delete_item(self, item, column):
-        path = item.data(column, Qt.ItemDataRole.UserRole)
-        if os.path.isfile(path):
-            os.remove(path)
-            parent = item.parent()
-            parent.removeChild(item)
-            if parent.childCount() == 0:
-                self.tree_widget.takeTopLevelItem(self.tree_widget.indexOfTopLevelItem(parent))
+            if files:
+                # 列表可能被调用方继续修改，复制一份；其他只读序列（如 PathSequence）直接引用，修改时再转为列表
+                self.create_node(folder, list(files) if isinstance(files, list) else files)
+        self.endResetModel()
+
+    def create_node(self, folder, files):
+        node = FolderNode(self.next_id, len(self.folders), folder, files)
+        self.next_id += 1
+        self.folders.append(node)
+        self.nodes[folder] = node
+        self.nodes_by_id[node.node_id] = node
+        return node
+
+    def folder_index(self, node):
+        return self.createIndex(node.row, 0, 0)
+
+    def node_of(self, index):
+        # 文件夹索引返回其节点，文件索引返回 None
+        if index.isValid() and index.internalId() == 0:
+            return self.folders[index.row()]
+        return None
+
+    def file_path(self, index):
+        if not index.isValid() or index.internalId() == 0:
+            return None
+        return self.nodes_by_id[index.internalId()].files[index.row()]
+
+    def index(self, row, column, parent=QModelIndex()):
+        if column < 0 or column >= len(self.headers) or row < 0:
+            return QModelIndex()
+        if not parent.isValid():
+            if row < self.fetched_folders:
+                return self.createIndex(row, column, 0)
+            return QModelIndex()
+        node = self.node_of(parent)
+        if node is not None and row < node.fetched:
+            return self.createIndex(row, column, node.node_id)
+        return QModelIndex()
+
+    def parent(self, index=QModelIndex()):
+        if not index.isValid() or index.internalId() == 0:
+            return QModelIndex()
+        return self.folder_index(self.nodes_by_id[index.internalId()])
+
+    def rowCount(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return self.fetched_folders
+        if parent.column() > 0:
+            return 0
+        node = self.node_of(parent)
+        return node.fetched if node is not None else 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.headers)
+
+    def hasChildren(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return bool(self.folders)
+        node = self.node_of(parent)
+        return node is not None and parent.column() == 0 and bool(node.files)
+
+    def canFetchMore(self, parent):
+        if self.fetching:
+            return False
+        if not parent.isValid():
+            return self.fetched_folders < len(self.folders)
+        node = self.node_of(parent)
+        return node is not None and node.fetched < len(node.files)
+
+    def fetchMore(self, parent):
+        # 插入信号的处理过程中视图可能再次调用 fetchMore，这里不允许重入
+        if self.fetching:
+            return
+        self.fetching = True
+        try:
+            if not parent.isValid():
+                start = self.fetched_folders
+                count = min(self.FETCH_BATCH, len(self.folders) - start)
+                if count > 0:
+                    self.beginInsertRows(parent, start, start + count - 1)
+                    self.fetched_folders = start + count
+                    self.endInsertRows()
+                return
+            node = self.node_of(parent)
+            if node is None:
+                return
+            start = node.fetched
+            count = min(self.FETCH_BATCH, len(node.files) - start)
+            if count > 0:
+                self.beginInsertRows(parent, start, start + count - 1)
+                node.fetched = start + count
+                self.endInsertRows()
+        finally:
+            self.fetching = False
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        node = self.node_of(index)
+        if node is not None:
+            if role == Qt.ItemDataRole.DisplayRole:
+                return node.path if index.column() == 0 else "文件夹"
+            if role == Qt.ItemDataRole.ForegroundRole and index.column() == 0:
+                return Qt.GlobalColor.darkMagenta
+            if role == Qt.ItemDataRole.FontRole and index.column() == 0:
+                return self.folder_font
+            return None
+        path = self.file_path(index)
+        if role == Qt.ItemDataRole.DisplayRole:
+            if index.column() > 0:
+                return "文件"
+            return path if self.show_full_path else os.path.basename(path)
+        if role == Qt.ItemDataRole.UserRole:
+            return path
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.headers[section]
+        return None
+
+    def add_file(self, folder, path):
+        node = self.nodes.get(folder)
+        if node is None:
+            # 新文件夹：第一层已全部交给视图时直接插入，否则留给 fetchMore
+            row = len(self.folders)
+            visible = self.fetched_folders == row
+            if visible:
+                self.beginInsertRows(QModelIndex(), row, row)
+            self.create_node(folder, [path])
+            if visible:
+                self.fetched_folders += 1
+                self.endInsertRows()
+            return
+        if not isinstance(node.files, list):
+            node.files = list(node.files)
+        row = len(node.files)
+        visible = node.row < self.fetched_folders and node.fetched == row
+        if visible:
+            self.beginInsertRows(self.folder_index(node), row, row)
+        node.files.append(path)
+        if visible:
+            node.fetched += 1
+            self.endInsertRows()
+
+    def remove_file(self, folder, path):
+        node = self.nodes.get(folder)
+        if node is None:
+            return
+        if not isinstance(node.files, list):
+            node.files = list(node.files)
+        try:
+            row = node.files.index(path)
+        except ValueError:
+            return
+        visible = node.row < self.fetched_folders and row < node.fetched
+        if visible:
+            self.beginRemoveRows(self.folder_index(node), row, row)
+        del node.files[row]
+        if row < node.fetched:
+            node.fetched -= 1
+        if visible:
+            self.endRemoveRows()
+        if not node.files:
+            self.remove_folder(folder)
+
+    def remove_folder(self, folder):
+        node = self.nodes.get(folder)
+        if node is None:
+            return
+        row = node.row
+        visible = row < self.fetched_folders
+        if visible:
+            self.beginRemoveRows(QModelIndex(), row, row)
+        del self.folders[row]
+        del self.nodes[folder]
+        del self.nodes_by_id[node.node_id]
+        for later in self.folders[row:]:
+            later.row -= 1
+        if visible:
+            self.fetched_folders -= 1
+            self.endRemoveRows()
+
+
+def create_tree_view(model):
+    tree_view = QTreeView()
+    tree_view.setModel(model)
+    # 行高一致时视图无需逐行计算尺寸
+    tree_view.setUniformRowHeights(True)
+    tree_view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+    return tree_view
+
+
+def selected_paths(tree_view, model, keep_one=False):
+    # 选中的文件夹展开为其下全部文件，按选择顺序去重；
+    # keep_one 用于重复文件分组：整组都被选中时保留组内第一个文件，避免把全部副本一起删除
+    paths = []
+    seen = set()
+    chosen = {}  # 节点 id -> (节点, 该节点下被选中的文件数)
+    for index in tree_view.selectionModel().selectedRows(0):
+        node = model.node_of(index)
+        if node is not None:
+            files = node.files
+        else:
+            files = [model.file_path(index)]
+            node = model.nodes_by_id.get(index.internalId())
+        for path in files:
+            if path and path not in seen:
+                seen.add(path)
+                paths.append(path)
+                if node is not None:
+                    chosen[node.node_id] = (node, chosen.get(node.node_id, (node, 0))[1] + 1)
+    if keep_one:
+        kept = {node.files[0] for node, count in chosen.values() if node.files and count >= len(node.files)}
+        paths = [path for path in paths if path not in kept]
+    return paths
+
+
+def expand_small_tree(tree_view, model, limit=20):
+    # 文件夹较少时默认展开；文件夹很多时保持折叠，避免一次取出大量文件行
+    if len(model.folders) <= limit:
+        if model.canFetchMore(QModelIndex()):
+            model.fetchMore(QModelIndex())
+        for row in range(model.rowCount()):
+            index = model.index(row, 0)
+            if model.canFetchMore(index):
+                model.fetchMore(index)
+            tree_view.expand(index)
+
+
+class ScanThread(QThread):
+    batch_found = Signal(list)  # [(文件夹, [(文件路径, 大小, 修改时间), ...]), ...]
+    progress = Signal(int, float)  # 已找到文件数, 每秒文件数
+    indexing = Signal()  # 扫描结束，开始建立搜索索引
+    error = Signal(str)
+
+    def __init__(self, folder_path, filter_types, exclude_types, store, index_path=None, batch_size=500,
+                 emit_interval=0.2):
+        super().__init__()
+        self.folder_path = folder_path
+        self.filter_types = filter_types
+        self.exclude_types = exclude_types
+        self.index_path = index_path
+        self.batch_size = batch_size
+        self.emit_interval = emit_interval
+        self.file_count = 0
+        self.elapsed = 0.0
+        # 界面线程按批次写入的扫描结果；本线程只读取已追加完成的文件 id 建立索引，
+        # 尚未写入的批次由界面线程在扫描结束后调用 sync() 补上
+        self.store = store
+        self.search_index = None
+        self.failed = False  # 出错时置为 True，结束后界面据此判断结果是否可用
+
+    def run(self):
+        started = time.monotonic()
+        try:
+            batches = ClassifierEngine.iter_scan_batches(self.folder_path, self.filter_types, self.exclude_types,
+                                                         self.index_path, should_stop=self.isInterruptionRequested,
+                                                         with_stat=True, batch_size=self.batch_size,
+                                                         interval=self.emit_interval)
+            for batch in batches:
+                for _, files in batch:
+                    self.file_count += len(files)
+                self.emit_batch(batch, time.monotonic() - started)
+            if self.isInterruptionRequested():
+                return
+            self.elapsed = time.monotonic() - started
+            # 结果全部回传后再在本线程建立文件名搜索索引，不拖慢扫描本身
+            self.indexing.emit()
+            search_index = FileSearchIndex(self.store, should_stop=self.isInterruptionRequested)
+            if self.isInterruptionRequested():
+                return
+            self.search_index = search_index
+        except Exception as e:
+            self.elapsed = time.monotonic() - started
+            self.failed = True
+            self.error.emit(str(e))
+
+    def emit_batch(self, batch, elapsed):
+        self.batch_found.emit(batch)
+        self.progress.emit(self.file_count, self.file_count / elapsed if elapsed > 0 else 0.0)
+
+
+class DuplicateThread(QThread):
+    progress = Signal(str, int, int)  # 阶段, 已完成数, 总数
+    error = Signal(str)
+
+    def __init__(self, store):
+        super().__init__()
+        self.store = store  # 扫描结果的快照，界面线程同步文件变化时不影响本线程读取
+        self.groups = []
+        self.failed = False
+
+    def run(self):
+        try:
+            finder = DuplicateFinder()
+            self.groups = finder.find(self.store.iter_entries(), should_stop=self.isInterruptionRequested,
+                                      progress=self.progress.emit)
+        except Exception as e:
+            self.failed = True
+            self.error.emit(str(e))
+
+
+class ContentSniffThread(QThread):
+    progress = Signal(int, int)  # 已识别数, 总数
+    error = Signal(str)
+
+    def __init__(self, sniffer, store):
+        super().__init__()
+        self.sniffer = sniffer
+        self.store = store  # 扫描结果的快照
+        self.groups = []
+        self.failed = False
+
+    def run(self):
+        try:
+            results = self.sniffer.classify(self.store.iter_entries(), should_stop=self.isInterruptionRequested,
+                                            progress=self.progress.emit)
+            self.groups = ContentSniffer.group_by_type(results)
+        except Exception as e:
+            self.failed = True
+            self.error.emit(str(e))
+
+
+class DiskUsageThread(QThread):
+    error = Signal(str)
+
+    def __init__(self, store, root):
+        super().__init__()
+        self.store = store  # 扫描结果的快照
+        self.root = root
+        self.report = None
+
+    def run(self):
+        try:
+            self.report = DiskUsageReport.from_store(self.store, self.root)
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class BulkActionThread(QThread):
+    progress = Signal(int, int)  # 已完成数, 总数
+    error = Signal(str)
+
+    def __init__(self, job=None, journal_path=None):
+        super().__init__()
+        # 传入 job 时执行批量操作，否则撤销 journal_path 中记录的操作
+        self.job = job
+        self.journal_path = journal_path
+        self.completed = []
+        self.errors = []
+
+    def run(self):
+        try:
+            if self.job is not None:
+                self.job.run(should_stop=self.isInterruptionRequested, progress=self.progress.emit)
+            else:
+                self.completed = BulkJob.undo(self.journal_path, should_stop=self.isInterruptionRequested,
+                                              progress=self.progress.emit)
+        except Exception as e:
+            self.error.emit(str(e))
+        finally:
+            if self.job is not None:
+                self.completed = self.job.completed
+                self.errors = self.job.errors
+
+
+def iter_duplicate_chunks(groups):
+    for number, group in enumerate(groups, 1):
+        lines = [f"重复组 {number}: {len(group.paths)} 个文件，每个 {format_size(group.size)}，"
+                 f"可释放 {format_size(group.reclaimable)}"]
+        lines.extend(f"  {path}" for path in group.paths)
+        yield "\n".join(lines) + "\n"
+
+
+def iter_content_chunks(groups):
+    for category, mime, paths in groups:
+        lines = [f"类型: {category} ({mime})", f"数量: {len(paths)}"]
+        lines.extend(f"  {path}" for path in paths)
+        yield "\n".join(lines) + "\n"
+
 
 class FileClassifierApp(QMainWindow):
+    # 监听线程上报的文件事件，经信号排队到界面线程处理: 事件类型, 路径
+    file_event = Signal(str, str)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("文件分类工具")
         self.setGeometry(100, 100, 1000, 700)
-        self.file_dict = defaultdict(list)
-        self.config_manager = ConfigManager()
+        self.file_dict = ScanResultStore()
+        self.scan_thread = None
+        self.duplicate_thread = None
+        self.sniff_thread = None
+        # 识别结果缓存在整个会话内复用，重新扫描后未变化的文件不再读取
+        self.content_sniffer = ContentSniffer()
+        self.usage_thread = None
+        self.usage_dialog = None
+        self.bulk_thread = None
+        self.running_threads = set()
+        self.watcher = None
+        self.scan_root = None
+        self.scan_types = None  # 当前结果的 (筛选类型, 排除类型)，监听丢失事件时按同样条件重新扫描
+        self.scan_matcher = None
+        self.search_index = None
+        self.search_dict = None  # 当前搜索结果，None 表示显示全部扫描结果
+        # 文件树显示重复文件等分组结果时为 {文件路径: 分组名称}，此时文件变化不再往树中加入真实文件夹，只移除已删除的文件
+        self.group_labels = None
+        self.duplicate_view = False  # 文件树显示的是重复文件分组
+        self.pending_events = []
+        self.event_timer = QTimer(self)
+        self.event_timer.setSingleShot(True)
+        self.event_timer.setInterval(300)
+        self.event_timer.timeout.connect(self.apply_file_events)
+        # 文件变化后重绘结果的频率上限，持续变化的目录树不会让界面线程一直在重绘
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(1000)
+        self.refresh_timer.timeout.connect(self.refresh_results)
+        self.file_event.connect(self.queue_file_event)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(200)
+        self.search_timer.timeout.connect(self.run_search)
+        self.config_manager = ConfigManager.shared()
+        # 本窗口通常嵌在主程序的页面中，收不到 closeEvent，程序退出时同样要停止后台线程
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.stop_all_threads)
         central_widget = QWidget(self)
         self.setCentralWidget(central_widget)
         main_layout = QVBoxLayout(central_widget)
@@ -117,6 +539,17 @@ class FileClassifierApp(QMainWindow):
         self.exclude_entry.setPlaceholderText("例如：.log,.tmp")
         filter_layout.addWidget(self.exclude_entry, 1, 1)
 
+        self.use_index_checkbox = QCheckBox("使用增量索引（只重新扫描有变化的文件夹）")
+        self.use_index_checkbox.setChecked(self.config_manager.get('file_classifier', 'use_index', True))
+        self.use_index_checkbox.toggled.connect(
+            lambda checked: self.config_manager.set('file_classifier', 'use_index', checked))
+        filter_layout.addWidget(self.use_index_checkbox, 2, 0, 1, 2)
+
+        self.watch_checkbox = QCheckBox("监听文件变化（扫描完成后自动更新结果）")
+        self.watch_checkbox.setChecked(self.config_manager.get('file_classifier', 'watch_changes', False))
+        self.watch_checkbox.toggled.connect(self.toggle_watch)
+        filter_layout.addWidget(self.watch_checkbox, 3, 0, 1, 2)
+
         main_layout.addWidget(filter_group)
 
 
@@ -129,8 +562,18 @@ class FileClassifierApp(QMainWindow):
 
         self.search_entry = QLineEdit()
         self.search_entry.setPlaceholderText("输入关键词，例如：report")
+        # 输入时自动搜索，停止输入 200 毫秒后执行
+        self.search_entry.textChanged.connect(lambda: self.search_timer.start())
         search_layout.addWidget(self.search_entry)
 
+        self.search_mode_combo = QComboBox()
+        self.search_mode_combo.addItem("包含", SUBSTRING)
+        self.search_mode_combo.addItem("通配符", GLOB)
+        self.search_mode_combo.addItem("正则", REGEX)
+        self.search_mode_combo.setToolTip("包含：文件名包含关键词；通配符：例如 *.py；正则：例如 ^report_\\d+")
+        self.search_mode_combo.currentIndexChanged.connect(lambda: self.search_timer.start())
+        search_layout.addWidget(self.search_mode_combo)
+
         self.search_button = QPushButton("搜索")
         self.search_button.setIcon(QIcon.fromTheme("edit-find"))
         self.search_button.setToolTip("点击开始搜索")
@@ -150,12 +593,43 @@ class FileClassifierApp(QMainWindow):
         self.scan_button.clicked.connect(self.start_scan)
         action_layout.addWidget(self.scan_button)
 
+        self.cancel_button = QPushButton("取消扫描")
+        self.cancel_button.setIcon(QIcon.fromTheme("process-stop"))
+        self.cancel_button.setToolTip("点击取消正在进行的扫描、重复文件查找、内容识别或批量操作")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_scan)
+        action_layout.addWidget(self.cancel_button)
+
         self.show_tree_button = QPushButton("显示文件树")
         self.show_tree_button.setIcon(QIcon.fromTheme("folder"))
         self.show_tree_button.setToolTip("点击显示扫描结果的文件关系树")
         self.show_tree_button.clicked.connect(self.show_file_tree)
         action_layout.addWidget(self.show_tree_button)
 
+        self.duplicate_button = QPushButton("查找重复文件")
+        self.duplicate_button.setIcon(QIcon.fromTheme("edit-copy"))
+        self.duplicate_button.setToolTip("在扫描结果中查找内容完全相同的文件")
+        self.duplicate_button.clicked.connect(self.find_duplicates)
+        action_layout.addWidget(self.duplicate_button)
+
+        self.sniff_button = QPushButton("按内容识别类型")
+        self.sniff_button.setIcon(QIcon.fromTheme("document-properties"))
+        self.sniff_button.setToolTip("读取文件头识别实际类型，按类型分组显示，可找出扩展名错误或没有扩展名的文件")
+        self.sniff_button.clicked.connect(self.sniff_content)
+        action_layout.addWidget(self.sniff_button)
+
+        self.usage_button = QPushButton("磁盘占用统计")
+        self.usage_button.setIcon(QIcon.fromTheme("drive-harddisk"))
+        self.usage_button.setToolTip("按扫描结果统计各文件夹和扩展名占用的空间")
+        self.usage_button.clicked.connect(self.show_disk_usage)
+        action_layout.addWidget(self.usage_button)
+
+        self.undo_button = QPushButton("撤销批量操作")
+        self.undo_button.setIcon(QIcon.fromTheme("edit-undo"))
+        self.undo_button.setToolTip("撤销最近一次移动、复制、分类或移到回收站操作")
+        self.undo_button.clicked.connect(self.undo_bulk_action)
+        action_layout.addWidget(self.undo_button)
+
         main_layout.addWidget(action_group)
 
 
@@ -163,16 +637,17 @@ class FileClassifierApp(QMainWindow):
         result_layout = QHBoxLayout()
         result_group.setLayout(result_layout)
 
-        self.result_text = QTextEdit()
-        self.result_text.setReadOnly(True)
+        self.result_text = ResultView()
         self.result_text.setFont(QFont('Microsoft YaHei', 10))
         self.result_text.setPlaceholderText("扫描结果将在此显示")
         result_layout.addWidget(self.result_text)
 
-        self.tree_widget = QTreeWidget()
-        self.tree_widget.setHeaderLabels(["文件关系树"])
-        self.tree_widget.itemDoubleClicked.connect(self.open_item)
-        result_layout.addWidget(self.tree_widget)
+        self.tree_model = FileTreeModel()
+        self.tree_view = create_tree_view(self.tree_model)
+        self.tree_view.doubleClicked.connect(self.open_item)
+        self.tree_view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.tree_view.customContextMenuRequested.connect(self.create_tree_menu)
+        result_layout.addWidget(self.tree_view)
 
         main_layout.addWidget(result_group)
 
@@ -188,42 +663,469 @@ class FileClassifierApp(QMainWindow):
 
     def start_scan(self):
         folder_path = self.folder_path_entry.text().strip()
-        filter_types = [ft.strip() for ft in self.filter_entry.text().strip().split(',')] if self.filter_entry.text().strip() else []
-        exclude_types = [et.strip() for et in self.exclude_entry.text().strip().split(',')] if self.exclude_entry.text().strip() else []
+        filter_types = ClassifierEngine.parse_types(self.filter_entry.text())
+        exclude_types = ClassifierEngine.parse_types(self.exclude_entry.text())
         if not folder_path:
             QMessageBox.warning(self, "警告", "请先选择文件夹路径")
             return
-        self.result_text.clear()
-        self.tree_widget.clear()
-        self.file_dict.clear()
+        # 扫描结果的键与监听事件的路径都基于同一个绝对路径，相对路径、末尾斜杠或 C:/x 与 C:\x 不会对不上
+        self.run_scan(os.path.normpath(os.path.abspath(folder_path)), filter_types, exclude_types)
+
+    def run_scan(self, folder_path, filter_types, exclude_types):
+        # 开始新扫描时中止仍在进行的旧扫描
+        self.stop_scan_thread()
+        self.stop_duplicate_thread()
+        self.stop_sniff_thread()
+        self.stop_watcher()
+        self.refresh_timer.stop()
+        self.result_text.clear_results()
+        self.tree_model.set_results({})
+        self.group_labels = None
+        self.duplicate_view = False
+        self.file_dict = ScanResultStore()
+        self.search_index = None
+        self.search_dict = None
+        self.scan_root = folder_path
+        self.scan_types = (filter_types, exclude_types)
+        self.scan_matcher = FileScanner(filter_types, exclude_types)
         self.status_bar.showMessage("扫描中...")
-        try:
-            self.file_dict = ConfigManager.scan_files(folder_path, filter_types, exclude_types)
-            result_text = ConfigManager.display_results(self.file_dict)
-            self.result_text.setText(result_text)
-            file_count = sum(len(files) for files in self.file_dict.values())
-            self.status_bar.showMessage(f"扫描完成，共找到 {file_count} 个文件")
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"扫描时发生错误: {str(e)}")
+
+        index_path = None
+        if self.use_index_checkbox.isChecked():
+            index_path = os.path.join(self.config_dir(), 'file_index.sqlite3')
+        thread = ScanThread(folder_path, filter_types, exclude_types, self.file_dict, index_path)
+        # 只处理当前扫描线程的信号，被中止的旧线程残留的结果直接丢弃
+        thread.batch_found.connect(lambda batch: self.on_scan_batch(thread, batch))
+        thread.progress.connect(lambda count, rate: self.on_scan_progress(thread, count, rate))
+        thread.indexing.connect(lambda: self.on_scan_indexing(thread))
+        thread.error.connect(lambda message: self.on_scan_error(thread, message))
+        thread.finished.connect(lambda: self.on_scan_finished(thread))
+        self.scan_thread = thread
+        self.running_threads.add(thread)
+        self.cancel_button.setEnabled(True)
+        thread.start()
+
+    def stop_all_threads(self):
+        # 中止并等待全部后台线程，避免窗口销毁时 QThread 仍在运行
+        self.stop_watcher()
+        self.event_timer.stop()
+        self.refresh_timer.stop()
+        self.search_timer.stop()
+        threads = list(self.running_threads)
+        for thread in threads:
+            thread.requestInterruption()
+        for thread in threads:
+            thread.wait()
+
+    def closeEvent(self, event):
+        self.stop_all_threads()
+        super().closeEvent(event)
+
+    def config_dir(self):
+        # 索引文件和批量操作的撤销日志与 config.json 放在同一目录
+        return os.path.dirname(os.path.abspath(self.config_manager.file_path))
+
+    def stop_scan_thread(self):
+        if self.scan_thread is not None:
+            self.scan_thread.requestInterruption()
+            self.scan_thread = None
+        self.cancel_button.setEnabled(False)
+
+    def cancel_scan(self):
+        if self.bulk_thread is not None:
+            # 等待线程结束后再同步已完成的部分，撤销日志中同样只记录已完成的文件
+            self.bulk_thread.requestInterruption()
+            self.status_bar.showMessage("正在取消批量操作...")
+            return
+        if self.duplicate_thread is not None:
+            self.stop_duplicate_thread()
+            self.status_bar.showMessage("已取消查找重复文件")
+            return
+        if self.sniff_thread is not None:
+            self.stop_sniff_thread()
+            self.status_bar.showMessage("已取消内容识别")
+            return
+        if self.scan_thread is None:
+            return
+        self.stop_scan_thread()
+        file_count = self.file_dict.file_count()
+        self.status_bar.showMessage(f"扫描已取消，已找到 {file_count} 个文件")
+
+    def on_scan_batch(self, thread, batch):
+        if thread is not self.scan_thread:
+            return
+        for folder, files in batch:
+            self.file_dict.add_folder(folder, files)
+        self.result_text.append_results({folder: self.file_dict[folder] for folder, _ in batch})
+
+    def on_scan_progress(self, thread, file_count, rate):
+        if thread is self.scan_thread:
+            self.status_bar.showMessage(f"扫描中... 已找到 {file_count} 个文件 ({rate:.0f} 个/秒)")
+
+    def on_scan_indexing(self, thread):
+        if thread is self.scan_thread:
+            self.status_bar.showMessage(f"已找到 {thread.file_count} 个文件，正在建立搜索索引...")
+
+    def on_scan_error(self, thread, message):
+        if thread is self.scan_thread:
+            QMessageBox.critical(self, "错误", f"扫描时发生错误: {message}")
             self.status_bar.showMessage("扫描出错")
 
+    def on_scan_finished(self, thread):
+        self.running_threads.discard(thread)
+        thread.deleteLater()
+        if thread is not self.scan_thread:
+            return
+        self.scan_thread = None
+        self.cancel_button.setEnabled(False)
+        if not thread.failed:
+            self.search_index = thread.search_index
+            if self.search_index is not None:
+                self.search_index.sync()
+            self.status_bar.showMessage(f"扫描完成，共找到 {thread.file_count} 个文件，用时 {thread.elapsed:.2f} 秒")
+            if self.watch_checkbox.isChecked():
+                self.start_watcher()
+            if self.search_entry.text().strip():
+                self.run_search()
+
+    def find_duplicates(self):
+        if self.scan_thread is not None:
+            QMessageBox.warning(self, "警告", "请等待扫描完成")
+            return
+        if not self.file_dict:
+            QMessageBox.warning(self, "警告", "请先进行文件扫描")
+            return
+        self.stop_duplicate_thread()
+        thread = DuplicateThread(self.file_dict.snapshot())
+        thread.progress.connect(lambda stage, done, total: self.on_duplicate_progress(thread, stage, done, total))
+        thread.error.connect(lambda message: self.on_duplicate_error(thread, message))
+        thread.finished.connect(lambda: self.on_duplicates_finished(thread))
+        self.duplicate_thread = thread
+        self.running_threads.add(thread)
+        self.cancel_button.setEnabled(True)
+        self.status_bar.showMessage("正在按文件大小分组...")
+        thread.start()
+
+    def stop_duplicate_thread(self):
+        if self.duplicate_thread is not None:
+            self.duplicate_thread.requestInterruption()
+            self.duplicate_thread = None
+        self.cancel_button.setEnabled(False)
+
+    def on_duplicate_progress(self, thread, stage, done, total):
+        if thread is self.duplicate_thread:
+            self.status_bar.showMessage(f"查找重复文件: 正在计算{stage} {done}/{total}")
+
+    def on_duplicate_error(self, thread, message):
+        if thread is self.duplicate_thread:
+            QMessageBox.critical(self, "错误", f"查找重复文件时发生错误: {message}")
+            self.status_bar.showMessage("查找重复文件出错")
+
+    def on_duplicates_finished(self, thread):
+        self.running_threads.discard(thread)
+        thread.deleteLater()
+        if thread is not self.duplicate_thread:
+            return
+        self.duplicate_thread = None
+        self.cancel_button.setEnabled(False)
+        if thread.failed:
+            return
+        groups = thread.groups
+        if not groups:
+            self.status_bar.showMessage("未找到重复文件")
+            return
+        reclaimable = sum(group.reclaimable for group in groups)
+        self.result_text.show_chunks(iter_duplicate_chunks(groups))
+        self.populate_tree({f"{format_size(group.size)} × {len(group.paths)}  ({group.paths[0]})": group.paths
+                            for group in groups}, grouped=True)
+        self.duplicate_view = True
+        self.status_bar.showMessage(f"找到 {len(groups)} 组重复文件，共可释放 {format_size(reclaimable)}")
+
+    def sniff_content(self):
+        if self.scan_thread is not None:
+            QMessageBox.warning(self, "警告", "请等待扫描完成")
+            return
+        if not self.file_dict:
+            QMessageBox.warning(self, "警告", "请先进行文件扫描")
+            return
+        self.stop_sniff_thread()
+        thread = ContentSniffThread(self.content_sniffer, self.file_dict.snapshot())
+        thread.progress.connect(lambda done, total: self.on_sniff_progress(thread, done, total))
+        thread.error.connect(lambda message: self.on_sniff_error(thread, message))
+        thread.finished.connect(lambda: self.on_sniff_finished(thread))
+        self.sniff_thread = thread
+        self.running_threads.add(thread)
+        self.cancel_button.setEnabled(True)
+        self.status_bar.showMessage("正在按内容识别文件类型...")
+        thread.start()
+
+    def stop_sniff_thread(self):
+        if self.sniff_thread is not None:
+            self.sniff_thread.requestInterruption()
+            self.sniff_thread = None
+        self.cancel_button.setEnabled(False)
+
+    def on_sniff_progress(self, thread, done, total):
+        if thread is self.sniff_thread:
+            self.status_bar.showMessage(f"正在按内容识别文件类型... {done}/{total}")
+
+    def on_sniff_error(self, thread, message):
+        if thread is self.sniff_thread:
+            QMessageBox.critical(self, "错误", f"识别文件类型时发生错误: {message}")
+            self.status_bar.showMessage("识别文件类型出错")
+
+    def on_sniff_finished(self, thread):
+        self.running_threads.discard(thread)
+        thread.deleteLater()
+        if thread is not self.sniff_thread:
+            return
+        self.sniff_thread = None
+        self.cancel_button.setEnabled(False)
+        if thread.failed:
+            return
+        groups = thread.groups
+        self.result_text.show_chunks(iter_content_chunks(groups))
+        self.populate_tree({f"{category}  {mime}  ({len(paths)} 个文件)": paths for category, mime, paths in groups},
+                           grouped=True)
+        file_count = sum(len(paths) for _, _, paths in groups)
+        self.status_bar.showMessage(f"内容识别完成，{file_count} 个文件分为 {len(groups)} 种类型")
+
+    def show_disk_usage(self):
+        if self.scan_thread is not None:
+            QMessageBox.warning(self, "警告", "请等待扫描完成")
+            return
+        if not self.file_dict:
+            QMessageBox.warning(self, "警告", "请先进行文件扫描")
+            return
+        if self.usage_thread is not None:
+            return
+        thread = DiskUsageThread(self.file_dict.snapshot(), self.scan_root)
+        thread.error.connect(lambda message: QMessageBox.critical(self, "错误", f"统计磁盘占用时发生错误: {message}"))
+        thread.finished.connect(lambda: self.on_disk_usage_finished(thread))
+        self.usage_thread = thread
+        self.running_threads.add(thread)
+        self.status_bar.showMessage("正在统计磁盘占用...")
+        thread.start()
+
+    def on_disk_usage_finished(self, thread):
+        self.running_threads.discard(thread)
+        thread.deleteLater()
+        self.usage_thread = None
+        if thread.report is None:
+            self.status_bar.showMessage("统计磁盘占用出错")
+            return
+        self.status_bar.showMessage(f"磁盘占用统计完成，共 {len(thread.report.folders)} 个文件夹")
+        self.usage_dialog = DiskUsageDialog(thread.report)
+        self.usage_dialog.show()
+
+    def create_tree_menu(self, position):
+        paths = selected_paths(self.tree_view, self.tree_model)
+        if not paths:
+            return
+        # 重复文件分组中每组至少保留一个副本，不会被一起移到回收站
+        trash_paths = selected_paths(self.tree_view, self.tree_model, keep_one=self.duplicate_view)
+        menu = QMenu(self.tree_view)
+        for action, icon, text in (
+                (TRASH, "user-trash", f"移到回收站 ({len(trash_paths)} 个文件)"),
+                (MOVE, "go-jump", "移动到..."),
+                (COPY, "edit-copy", "复制到..."),
+                (CLASSIFY_EXTENSION, "folder-new", "按扩展名分类到..."),
+                (CLASSIFY_DATE, "x-office-calendar", "按修改日期分类到...")):
+            menu_action = menu.addAction(QIcon.fromTheme(icon), text)
+            action_paths = trash_paths if action == TRASH else paths
+            menu_action.setEnabled(self.bulk_thread is None and bool(action_paths))
+            menu_action.triggered.connect(
+                lambda _=False, action=action, action_paths=action_paths: self.start_bulk_action(action, action_paths))
+        menu.exec(self.tree_view.mapToGlobal(position))
+
+    def start_bulk_action(self, action, paths):
+        if self.bulk_thread is not None:
+            QMessageBox.warning(self, "警告", "请等待当前批量操作完成")
+            return
+        target_dir = None
+        if action == TRASH:
+            reply = QMessageBox.question(self, "确认", f"确定将选中的 {len(paths)} 个文件移到回收站吗？")
+            if reply != QMessageBox.StandardButton.Yes:
+                return
+        else:
+            target_dir = QFileDialog.getExistingDirectory(self, f"{ACTION_NAMES[action]}到", self.scan_root or "")
+            if not target_dir:
+                return
+        job = BulkJob(action, paths, target_dir, os.path.join(self.config_dir(), 'bulk_journal'))
+        self.run_bulk_thread(BulkActionThread(job), ACTION_NAMES[action])
+
+    def undo_bulk_action(self):
+        if self.bulk_thread is not None:
+            QMessageBox.warning(self, "警告", "请等待当前批量操作完成")
+            return
+        journal_path = BulkJob.latest_journal(os.path.join(self.config_dir(), 'bulk_journal'))
+        if journal_path is None:
+            QMessageBox.information(self, "撤销", "没有可以撤销的批量操作")
+            return
+        self.run_bulk_thread(BulkActionThread(journal_path=journal_path), "撤销")
+
+    def run_bulk_thread(self, thread, label):
+        thread.progress.connect(lambda done, total: self.on_bulk_progress(thread, label, done, total))
+        thread.error.connect(lambda message: QMessageBox.critical(self, "错误", f"{label}时发生错误: {message}"))
+        thread.finished.connect(lambda: self.on_bulk_finished(thread, label))
+        self.bulk_thread = thread
+        self.running_threads.add(thread)
+        self.cancel_button.setEnabled(True)
+        self.status_bar.showMessage(f"正在{label}...")
+        thread.start()
+
+    def on_bulk_progress(self, thread, label, done, total):
+        if thread is self.bulk_thread:
+            self.status_bar.showMessage(f"正在{label}... {done}/{total}")
+
+    def on_bulk_finished(self, thread, label):
+        self.running_threads.discard(thread)
+        thread.deleteLater()
+        self.bulk_thread = None
+        self.cancel_button.setEnabled(any(other is not None
+                                          for other in (self.scan_thread, self.duplicate_thread, self.sniff_thread)))
+        # 与监听到的变化走同一条路径更新扫描结果、搜索索引和文件树；监听开启时重复的事件会被忽略
+        if self.scan_matcher is not None:
+            undo = thread.job is None
+            for action, src, dst in thread.completed:
+                if action != COPY:
+                    self.queue_file_event(CREATED if undo else DELETED, src)
+                if action != TRASH and self.in_scan_root(dst):
+                    self.queue_file_event(DELETED if undo else CREATED, dst)
+        message = f"{label}完成，共处理 {len(thread.completed)} 个文件"
+        if thread.errors:
+            message += f"，{len(thread.errors)} 个失败"
+        if thread.isInterruptionRequested():
+            message += "（已取消）"
+        self.status_bar.showMessage(message)
+
+    def in_scan_root(self, path):
+        root = os.path.normpath(self.scan_root)
+        path = os.path.normpath(path)
+        return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+    def toggle_watch(self, checked):
+        self.config_manager.set('file_classifier', 'watch_changes', checked)
+        if not checked:
+            self.stop_watcher()
+        elif self.scan_root and self.scan_thread is None:
+            self.start_watcher()
+
+    def start_watcher(self):
+        self.stop_watcher()
+        self.watcher = FileWatcher(self.scan_root, self.file_event.emit)
+        self.watcher.start()
+
+    def stop_watcher(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+        self.pending_events = []
+
+    def queue_file_event(self, event, path):
+        if event == RESYNC:
+            # 监听丢失了事件，已排队的增量变化不再可靠，直接按原条件重新扫描
+            self.event_timer.stop()
+            self.pending_events = []
+            if self.scan_thread is None and self.scan_root:
+                self.run_scan(self.scan_root, *self.scan_types)
+            return
+        # 合并短时间内的大量事件，批量更新结果
+        self.pending_events.append((event, path))
+        if not self.event_timer.isActive():
+            self.event_timer.start()
+
+    def apply_file_events(self):
+        events, self.pending_events = self.pending_events, []
+        changed = 0
+        changed_paths = []
+        # 显示搜索结果时文件树由重新搜索刷新，显示分组结果时只移除已删除的文件
+        update_tree = self.search_dict is None and self.group_labels is None
+        for event, path in events:
+            folder = os.path.dirname(path)
+            if event == CREATED:
+                if self.scan_matcher.matches(os.path.basename(path)) and not self.file_dict.contains_file(path):
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue  # 文件在处理前已被删除
+                    self.file_dict.add(path, stat.st_size, stat.st_mtime)
+                    if self.search_index is not None:
+                        self.search_index.sync()
+                    if update_tree:
+                        self.add_tree_file(folder, path)
+                    changed += 1
+                    changed_paths.append(path)
+            elif event == DELETED:
+                if self.file_dict.remove(path):
+                    if update_tree:
+                        self.remove_tree_file(folder, path)
+                    elif self.group_labels is not None and path in self.group_labels:
+                        self.tree_model.remove_file(self.group_labels.pop(path), path)
+                    changed += 1
+                    changed_paths.append(path)
+            elif event == DIR_DELETED:
+                prefix = path + os.sep
+                if update_tree:
+                    for removed in [f for f in self.file_dict if f == path or f.startswith(prefix)]:
+                        self.remove_tree_folder(removed)
+                elif self.group_labels is not None:
+                    for removed in [f for f in self.group_labels if f.startswith(prefix)]:
+                        self.tree_model.remove_file(self.group_labels.pop(removed), removed)
+                removed = self.file_dict.remove_tree(path)
+                if removed:
+                    changed += removed
+                    changed_paths.append(None)  # 无法逐个判断被删除的文件是否在搜索结果中
+        if changed:
+            # 搜索结果只在变化的文件可能匹配关键词时才需要刷新
+            if self.search_dict is None or self.search_affected(changed_paths):
+                if not self.refresh_timer.isActive():
+                    self.refresh_timer.start()
+            file_count = self.file_dict.file_count()
+            self.status_bar.showMessage(f"已同步 {changed} 个文件变化，当前共 {file_count} 个文件")
+
+    def search_affected(self, paths):
+        keyword = self.search_entry.text().strip()
+        if not keyword:
+            return True
+        try:
+            match = ClassifierEngine.compile_matcher(keyword, self.search_mode_combo.currentData())
+        except re.error:
+            return False
+        return any(path is None or match(path) for path in paths)
+
+    def refresh_results(self):
+        # 文件树已在 apply_file_events 中逐个更新，这里只重绘结果文本；显示搜索结果时重新搜索，显示分组结果时保持不变
+        if self.group_labels is not None:
+            return
+        if self.search_dict is not None:
+            self.run_search()
+        else:
+            self.result_text.show_results(self.file_dict)
+
+    def add_tree_file(self, folder, path):
+        # 文件树尚未显示时无需同步
+        if self.tree_model.folders:
+            self.tree_model.add_file(folder, path)
+
+    def remove_tree_file(self, folder, path):
+        self.tree_model.remove_file(folder, path)
+
+    def remove_tree_folder(self, folder):
+        self.tree_model.remove_folder(folder)
+
     def show_file_tree(self):
         if not self.file_dict:
             QMessageBox.warning(self, "警告", "请先进行文件扫描")
             return
-        self.tree_widget.clear()
-        for folder, files in self.file_dict.items():
-            folder_item = QTreeWidgetItem([folder, "文件夹"])
-            folder_item.setForeground(0, Qt.GlobalColor.darkMagenta)
-            font = folder_item.font(0)
-            font.setBold(True)
-            folder_item.setFont(0, font)
-            self.tree_widget.addTopLevelItem(folder_item)
-            for file in files:
-                file_item = QTreeWidgetItem([os.path.basename(file), "文件"])
-                file_item.setData(0, Qt.ItemDataRole.UserRole, file)
-                folder_item.addChild(file_item)
-        self.tree_widget.expandAll()
+        self.populate_tree(self.file_dict if self.search_dict is None else self.search_dict)
+
+    def populate_tree(self, file_dict, grouped=False):
+        # grouped 为 True 时 file_dict 的键是分组名称而不是文件夹
+        self.group_labels = {path: label for label, paths in file_dict.items() for path in paths} if grouped else None
+        self.duplicate_view = False
+        self.tree_model.set_results(file_dict)
+        expand_small_tree(self.tree_view, self.tree_model)
 
     def search_files(self):
         keyword = self.search_entry.text().strip()
@@ -233,28 +1135,55 @@ class FileClassifierApp(QMainWindow):
         if not self.file_dict:
             QMessageBox.warning(self, "警告", "请先进行文件扫描")
             return
-        self.status_bar.showMessage(f"搜索 \"{keyword}\" 中...")
+        self.search_timer.stop()
+        if not self.run_search():
+            QMessageBox.information(self, "搜索结果", f"未找到与 \"{keyword}\" 相关的文件")
+
+    def run_search(self):
+        """
+        按搜索框内容筛选扫描结果并显示，只改变显示内容，不修改 self.file_dict。
+        关键词为空时恢复显示全部结果。返回是否找到文件。
+        """
+        keyword = self.search_entry.text().strip()
+        if not keyword:
+            if self.search_dict is not None:
+                self.search_dict = None
+                self.result_text.show_results(self.file_dict)
+                if self.tree_model.folders:
+                    self.populate_tree(self.file_dict)
+            return True
+        if not self.file_dict:
+            return False
+        mode = self.search_mode_combo.currentData()
+        started = time.perf_counter()
         try:
-            filtered_dict = ConfigManager.search_files(self.file_dict, keyword)
-            if filtered_dict:
-                result_text = ConfigManager.display_results(filtered_dict)
-                self.result_text.setText(result_text)
-                file_count = sum(len(files) for files in filtered_dict.values())
-                self.status_bar.showMessage(f"搜索完成，共找到 {file_count} 个文件")
-                self.file_dict = filtered_dict
-                self.show_file_tree()
+            if self.search_index is not None:
+                filtered_dict = self.search_index.search(keyword, mode)
             else:
-                self.status_bar.showMessage(f"未找到与 \"{keyword}\" 相关的文件")
-                QMessageBox.information(self, "搜索结果", f"未找到与 \"{keyword}\" 相关的文件")
+                # 扫描尚未完成时没有索引，直接在已有结果中查找
+                filtered_dict = ClassifierEngine.search_files(self.file_dict, keyword, mode)
+        except re.error as e:
+            self.status_bar.showMessage(f"正则表达式错误: {e}")
+            return False
         except Exception as e:
             QMessageBox.critical(self, "错误", f"搜索时发生错误: {str(e)}")
             self.status_bar.showMessage("搜索出错")
+            return False
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.search_dict = filtered_dict
+        self.result_text.show_results(filtered_dict)
+        self.populate_tree(filtered_dict)
+        if filtered_dict:
+            file_count = sum(len(files) for files in filtered_dict.values())
+            self.status_bar.showMessage(f"搜索完成，共找到 {file_count} 个文件，用时 {elapsed_ms:.1f} 毫秒")
+            return True
+        self.status_bar.showMessage(f"未找到与 \"{keyword}\" 相关的文件")
+        return False
 
-    def open_item(self, item, column):
-        if item.parent() is not None:
-            path = item.data(column, Qt.ItemDataRole.UserRole)
-            if os.path.isfile(path):
-                QDesktopServices.openUrl(QUrl.fromLocalFile(os.path.dirname(path)))
+    def open_item(self, index):
+        path = self.tree_model.file_path(index)
+        if path and os.path.isfile(path):
+            QDesktopServices.openUrl(QUrl.fromLocalFile(os.path.dirname(path)))
 
 def main():
     try:
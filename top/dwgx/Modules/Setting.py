@@ -14,7 +14,7 @@ class Setting(QWidget):
 
         self.resize(800, 600)
         self.main_panel = main_panel
-        self.config_manager = ConfigManager()
+        self.config_manager = ConfigManager.shared()
 
         main_layout = QVBoxLayout(self)
 
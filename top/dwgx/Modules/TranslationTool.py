@@ -1,12 +1,13 @@
 
 
+import os
 import sys
 import threading
 from concurrent.futures import ThreadPoolExecutor
 from threading import Timer
 import keyboard
 import pyperclip
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QCoreApplication
 from PySide6.QtWidgets import (
     QWidget, QApplication, QVBoxLayout, QHBoxLayout, QGridLayout,
     QTextEdit, QPushButton, QLabel, QLineEdit, QComboBox, QSlider, QMessageBox,
@@ -14,7 +15,8 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtGui import QIcon, QFont
 from Manager.ConfigManager import ConfigManager, ALLOWED_LANGUAGES
-from utils.Translationcore import perform_translation
+from utils.Translationcore import perform_translation, client_pool
+from utils.TranslationCache import TranslationCache
 from utils.loggerUtils import LogEmitter, setup_logger
 from utils.SetApiKeyDialog import SetApiKeyDialog
 
@@ -24,14 +26,40 @@ class TranslationTool(QWidget):
         super().__init__()
         self.current_hotkeys = {"shortcut1": None, "shortcut2": None}
         self.executor = ThreadPoolExecutor(max_workers=3)
-        self.config_manager = ConfigManager()
+        self.config_manager = ConfigManager.shared()
         self.log_emitter = LogEmitter()
         self.log_emitter.log_signal.connect(self.append_log)
         self.logger = setup_logger("TranslationTool", self.log_emitter)
+        # 翻译缓存与 config.json 放在同一目录，重复翻译相同文本时不再调用 API
+        config_dir = os.path.dirname(os.path.abspath(self.config_manager.file_path))
+        self.translation_cache = TranslationCache(
+            os.path.join(config_dir, 'translation_cache.sqlite3'),
+            max_entries=self.config_manager.get("translation", "cache_max_entries", 1000),
+            ttl_seconds=self.config_manager.get("translation", "cache_ttl_days", 30) * 24 * 3600)
         self.init_ui()
         self.load_config()
+        # 其他模块修改目标语言时同步下拉框，无需重新读取配置文件
+        self.config_manager.subscribe("translation", "target_lang1",
+                                      lambda _, lang: self.sync_target_lang(self.target_lang_combo1, lang))
+        self.config_manager.subscribe("translation", "target_lang2",
+                                      lambda _, lang: self.sync_target_lang(self.target_lang_combo2, lang))
+        # 修改 API 密钥后丢弃已建立连接的翻译客户端
+        client_pool.watch(self.config_manager)
+        # 本窗口通常嵌在主程序的页面中，收不到 closeEvent，程序退出时同样要关闭翻译缓存
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.shutdown)
         self.start_listening_thread()
 
+    def shutdown(self):
+        # 等待进行中的翻译写完缓存后再关闭数据库连接
+        self.executor.shutdown(wait=True)
+        self.translation_cache.close()
+
+    def closeEvent(self, event):
+        self.shutdown()
+        super().closeEvent(event)
+
     def append_log(self, level, message):
         color = {
             "ERROR": Qt.GlobalColor.red,
@@ -272,7 +300,9 @@ class TranslationTool(QWidget):
 
     def translate_task(self, text, target_lang):
         try:
-            translation = perform_translation(text, target_lang, self.config_manager, self.logger)
+            translation = perform_translation(text, target_lang, self.config_manager, self.logger,
+                                              self.translation_cache)
+            self.logger.debug(self.translation_cache.stats_text())
             if "翻译错误" not in translation:
                 Timer(0, lambda: self.update_clipboard_and_paste(translation)).start()
             else:
@@ -341,6 +371,12 @@ class TranslationTool(QWidget):
             except Exception as e:
                 self.logger.error(f"注册{shortcut_key}失败: {str(e)}")
 
+    def sync_target_lang(self, combobox, lang_code):
+        if combobox.currentData() != lang_code:
+            combobox.blockSignals(True)
+            self.set_combobox_current_index(combobox, lang_code)
+            combobox.blockSignals(False)
+
     def set_combobox_current_index(self, combobox, lang_code):
         for index in range(combobox.count()):
             if combobox.itemData(index) == lang_code:
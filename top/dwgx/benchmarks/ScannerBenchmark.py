@@ -0,0 +1,383 @@
+# 文件分类工具扫描引擎的基准测试：生成指定形状的合成目录树，逐项测量扫描、搜索、结果文本和文件树填充，
+# 结果写成 JSON，可与之前版本的结果比较以发现性能回退。
+#
+#   python benchmarks/ScannerBenchmark.py --files 100000 --depth 3 --fanout 10 -o before.json
+#   python benchmarks/ScannerBenchmark.py --files 100000 --depth 3 --fanout 10 --compare before.json
+#
+# 每个测试项在独立的子进程中运行，峰值内存互不影响。生成大目录树较慢，可用 --root 指定目录保留并复用。
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Manager import ClassifierEngine  # noqa: E402
+from Manager.FileSearchIndex import FileSearchIndex, SUBSTRING, GLOB  # noqa: E402
+from Manager.ScanResultStore import ScanResultStore  # noqa: E402
+
+logger = logging.getLogger("ScannerBenchmark")
+
+MANIFEST_NAME = '.benchmark_tree.json'
+DEFAULT_EXTENSIONS = '.txt=30,.py=20,.jpg=15,.log=10,.pdf=10,.json=10,=5'
+FILTER_TYPES = '.py,.txt'
+SEARCH_KEYWORD = 'file_12'
+SEARCH_GLOB = 'file_1*3.py'
+# 耗时差小于该值时不判定为变慢，避免很短的测试项被计时抖动误报
+MIN_REGRESSION_SECONDS = 0.01
+
+
+def parse_extensions(spec):
+    # ".txt=30,.py=20,=5" -> ([".txt", ".py", ""], [30, 20, 5])，等号前为空表示无扩展名
+    extensions = []
+    weights = []
+    for item in spec.split(','):
+        ext, _, weight = item.partition('=')
+        extensions.append(ext.strip())
+        weights.append(float(weight) if weight else 1.0)
+    return extensions, weights
+
+
+def tree_shape(args):
+    return {'files': args.files, 'depth': args.depth, 'fanout': args.fanout,
+            'extensions': args.extensions, 'seed': args.seed}
+
+
+def tree_dir(root):
+    # 目录树放在 root/tree 下，描述文件放在 root 下，不计入扫描结果
+    return os.path.join(root, 'tree')
+
+
+def generate_tree(root, shape):
+    """
+    在 root/tree 下生成 depth 层、每层 fanout 个子目录的目录树，文件按顺序轮流放入各目录，扩展名按权重随机选取（种子固定）。
+    root 中已有形状相同的目录树时直接复用；root 非空且不是本脚本生成的目录时抛出 ValueError，不删除其中的任何文件。
+    """
+    manifest_path = os.path.join(root, MANIFEST_NAME)
+    try:
+        with open(manifest_path, encoding='utf-8') as f:
+            if json.load(f) == shape:
+                logger.info(f"复用已有的目录树: {root}")
+                return
+    except (OSError, ValueError):
+        pass
+    if os.path.isdir(root) and os.listdir(root):
+        # 只删除带描述文件的目录（本脚本生成的旧目录树），--root 写错时不会误删用户数据
+        if not os.path.isfile(manifest_path):
+            raise ValueError(f"{root} 不是空目录，也不是本脚本生成的目录树（没有 {MANIFEST_NAME}），请指定其他目录")
+        shutil.rmtree(root)
+    os.makedirs(tree_dir(root))
+
+    started = time.perf_counter()
+    folders = [tree_dir(root)]
+    level = [tree_dir(root)]
+    for _ in range(shape['depth']):
+        level = [os.path.join(parent, f"dir_{index}") for parent in level for index in range(shape['fanout'])]
+        folders.extend(level)
+    for folder in folders[1:]:
+        os.mkdir(folder)
+
+    extensions, weights = parse_extensions(shape['extensions'])
+    rng = random.Random(shape['seed'])
+    chosen = rng.choices(extensions, weights, k=shape['files'])
+    for number, ext in enumerate(chosen):
+        open(os.path.join(folders[number % len(folders)], f"file_{number}{ext}"), 'wb').close()
+        if number and number % 100000 == 0:
+            logger.info(f"已生成 {number} 个文件")
+    # 刚创建的目录处于增量索引的“修改时间过近”窗口内，每次都会被重新列出；把目录修改时间提前，使 index_warm 测到真实的增量扫描
+    past = time.time() - 60
+    for folder in folders:
+        os.utime(folder, (past, past))
+
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(shape, f)
+    logger.info(f"生成 {len(folders)} 个目录、{shape['files']} 个文件，用时 {time.perf_counter() - started:.1f} 秒")
+
+
+def peak_rss_bytes():
+    try:
+        import resource
+    except ImportError:  # Windows 没有 resource 模块，有 psutil 时读取峰值工作集
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return getattr(psutil.Process().memory_info(), 'peak_wset', None)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # Linux 单位为 KB，macOS 为字节
+
+
+def timed_scan(root, **kwargs):
+    # 返回 (总耗时, 首个结果耗时, 文件数)
+    started = time.perf_counter()
+    first_result = None
+    file_count = 0
+    for _, files in ClassifierEngine.iter_scan_files(root, kwargs.pop('filter_types', ''), '', **kwargs):
+        if first_result is None:
+            first_result = time.perf_counter() - started
+        file_count += len(files)
+    return time.perf_counter() - started, first_result, file_count
+
+
+def collect(root):
+    return ClassifierEngine.scan_files(root, '', '')
+
+
+def case_scan(root, work_dir):
+    seconds, first_result, files = timed_scan(root)
+    return {'seconds': seconds, 'first_result_seconds': first_result, 'files': files}
+
+
+def case_scan_stat(root, work_dir):
+    seconds, first_result, files = timed_scan(root, with_stat=True)
+    return {'seconds': seconds, 'first_result_seconds': first_result, 'files': files}
+
+
+def case_scan_filtered(root, work_dir):
+    seconds, first_result, files = timed_scan(root, filter_types=FILTER_TYPES)
+    return {'seconds': seconds, 'first_result_seconds': first_result, 'files': files}
+
+
+def case_index_cold(root, work_dir):
+    seconds, first_result, files = timed_scan(root, index_path=os.path.join(work_dir, 'index_cold.sqlite3'))
+    return {'seconds': seconds, 'first_result_seconds': first_result, 'files': files}
+
+
+def case_index_warm(root, work_dir):
+    index_path = os.path.join(work_dir, 'index_warm.sqlite3')
+    timed_scan(root, index_path=index_path)
+    seconds, first_result, files = timed_scan(root, index_path=index_path)
+    return {'seconds': seconds, 'first_result_seconds': first_result, 'files': files}
+
+
+def case_search_linear(root, work_dir):
+    file_dict = collect(root)
+    files = sum(len(paths) for paths in file_dict.values())
+    started = time.perf_counter()
+    ClassifierEngine.search_files(file_dict, SEARCH_KEYWORD, SUBSTRING)
+    substring_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    ClassifierEngine.search_files(file_dict, SEARCH_GLOB, GLOB)
+    glob_seconds = time.perf_counter() - started
+    return {'seconds': substring_seconds + glob_seconds, 'substring_seconds': substring_seconds,
+            'glob_seconds': glob_seconds, 'files': files}
+
+
+def case_search_index(root, work_dir):
+    file_dict = collect(root)
+    files = sum(len(paths) for paths in file_dict.values())
+    store = ScanResultStore()
+    for folder, paths in file_dict.items():
+        store.add_folder(folder, paths)
+    started = time.perf_counter()
+    index = FileSearchIndex(store)
+    build_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    index.search(SEARCH_KEYWORD, SUBSTRING)
+    substring_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    index.search(SEARCH_GLOB, GLOB)
+    glob_seconds = time.perf_counter() - started
+    return {'seconds': build_seconds, 'substring_seconds': substring_seconds, 'glob_seconds': glob_seconds,
+            'files': files}
+
+
+def case_display(root, work_dir):
+    file_dict = collect(root)
+    files = sum(len(paths) for paths in file_dict.values())
+    started = time.perf_counter()
+    ClassifierEngine.display_results(file_dict)
+    return {'seconds': time.perf_counter() - started, 'files': files}
+
+
+def case_store(root, work_dir):
+    batches = list(ClassifierEngine.iter_scan_files(root, '', '', with_stat=True))
+    started = time.perf_counter()
+    store = ScanResultStore()
+    for folder, files in batches:
+        store.add_folder(folder, files)
+    return {'seconds': time.perf_counter() - started, 'files': store.file_count(), 'store_bytes': store.nbytes()}
+
+
+def case_tree(root, work_dir):
+    try:
+        from PySide6.QtCore import QModelIndex
+        from PySide6.QtWidgets import QApplication
+    except ImportError:
+        return {'skipped': "未安装 PySide6"}
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    app = QApplication.instance() or QApplication([])  # noqa: F841 文件树模型需要 QApplication
+    from Modules.FileClassifierTool import FileTreeModel
+    store = ScanResultStore()
+    for folder, files in ClassifierEngine.iter_scan_files(root, '', '', with_stat=True):
+        store.add_folder(folder, files)
+    started = time.perf_counter()
+    model = FileTreeModel()
+    model.set_results(store)
+    # 模拟视图展开第一个文件夹：取出第一批文件夹行和该文件夹的第一批文件行
+    model.fetchMore(QModelIndex())
+    if model.rowCount():
+        model.fetchMore(model.index(0, 0))
+    return {'seconds': time.perf_counter() - started, 'files': store.file_count()}
+
+
+CASES = {
+    'scan': case_scan,
+    'scan_stat': case_scan_stat,
+    'scan_filtered': case_scan_filtered,
+    'index_cold': case_index_cold,
+    'index_warm': case_index_warm,
+    'search_linear': case_search_linear,
+    'search_index': case_search_index,
+    'display': case_display,
+    'store': case_store,
+    'tree': case_tree,
+}
+
+
+def run_case(name, root):
+    # 子进程入口：运行一项测试，把结果以 JSON 写到标准输出
+    work_dir = tempfile.mkdtemp(prefix='scanner_benchmark_')
+    try:
+        result = CASES[name](tree_dir(root), work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    if 'seconds' in result and result.get('files'):
+        result['files_per_second'] = result['files'] / result['seconds'] if result['seconds'] else None
+    result['peak_rss_bytes'] = peak_rss_bytes()
+    json.dump(result, sys.stdout)
+
+
+def run_in_subprocess(name, root, repeat):
+    # 多次运行取耗时最短的一次，减少其他进程和缓存状态的干扰
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), '--run-case', name, '--root', root],
+                                check=True, capture_output=True, text=True).stdout
+        runs.append(json.loads(output))
+    if 'skipped' in runs[0]:
+        return runs[0]
+    best = min(runs, key=lambda run: run['seconds'])
+    best['runs'] = [run['seconds'] for run in runs]
+    return best
+
+
+def compare(results, baseline_path, threshold):
+    """
+    与之前保存的结果比较耗时，返回变慢超过 threshold（比例）的测试项。
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('tree') != results['tree']:
+        logger.warning("基准结果使用的目录树形状不同，比较结果仅供参考")
+    regressions = []
+    for name, result in results['cases'].items():
+        before = baseline.get('cases', {}).get(name, {}).get('seconds')
+        after = result.get('seconds')
+        if not before or after is None:
+            continue
+        ratio = after / before
+        flag = ""
+        if ratio > 1 + threshold and after - before > MIN_REGRESSION_SECONDS:
+            regressions.append(name)
+            flag = "  <- 变慢"
+        logger.info(f"{name:<14} {before:9.3f}s -> {after:9.3f}s  ({ratio:.2f}x){flag}")
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="文件分类工具扫描引擎基准测试")
+    parser.add_argument('--files', type=int, default=10000, help="合成目录树中的文件数，默认 10000")
+    parser.add_argument('--depth', type=int, default=3, help="目录层数，默认 3")
+    parser.add_argument('--fanout', type=int, default=8, help="每个目录的子目录数，默认 8")
+    parser.add_argument('--extensions', default=DEFAULT_EXTENSIONS,
+                        help=f"扩展名及权重，默认 {DEFAULT_EXTENSIONS}（等号前为空表示无扩展名）")
+    parser.add_argument('--seed', type=int, default=1, help="随机种子，相同参数生成相同的目录树")
+    parser.add_argument('--root', help="目录树位置，指定后测试结束不删除，下次形状相同时直接复用")
+    parser.add_argument('--cases', default=','.join(CASES), help="要运行的测试项，用逗号分隔")
+    parser.add_argument('--repeat', type=int, default=3, help="每项运行次数，取最快的一次，默认 3")
+    parser.add_argument('-o', '--output', help="结果 JSON 文件，默认 benchmark-<时间>.json")
+    parser.add_argument('--compare', metavar='JSON', help="与之前的结果比较，有测试项变慢超过阈值时退出码为 1")
+    parser.add_argument('--threshold', type=float, default=0.1, help="判定变慢的比例，默认 0.1（10%%）")
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.run_case:
+        run_case(args.run_case, args.root)
+        return 0
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stderr)
+
+    cases = [name.strip() for name in args.cases.split(',') if name.strip()]
+    unknown = [name for name in cases if name not in CASES]
+    if unknown:
+        logger.error(f"未知的测试项: {', '.join(unknown)}，可选: {', '.join(CASES)}")
+        return 2
+
+    shape = tree_shape(args)
+    root = os.path.abspath(args.root) if args.root else tempfile.mkdtemp(prefix='scanner_benchmark_tree_')
+    try:
+        try:
+            generate_tree(root, shape)
+        except ValueError as e:
+            logger.error(str(e))
+            return 2
+        results = {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'tree': shape,
+            'cases': {},
+        }
+        for name in cases:
+            result = run_in_subprocess(name, root, args.repeat)
+            results['cases'][name] = result
+            if 'skipped' in result:
+                logger.info(f"{name:<14} 跳过: {result['skipped']}")
+                continue
+            rate = result.get('files_per_second')
+            rss = result.get('peak_rss_bytes')
+            logger.info(f"{name:<14} {result['seconds']:9.3f}s"
+                        + (f"  {rate:12,.0f} 文件/秒" if rate else "")
+                        + (f"  首个结果 {result['first_result_seconds'] * 1000:.1f} 毫秒"
+                           if result.get('first_result_seconds') is not None else "")
+                        + (f"  峰值内存 {rss / 1024 / 1024:.0f} MB" if rss else ""))
+    finally:
+        if not args.root:
+            shutil.rmtree(root, ignore_errors=True)
+
+    output = args.output or f"benchmark-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    logger.info(f"结果已保存到 {output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            logger.warning(f"以下测试项变慢超过 {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
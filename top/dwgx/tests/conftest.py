@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 测试按 Client.py 的方式导入 Manager、utils 等包
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
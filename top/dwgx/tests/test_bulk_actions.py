@@ -0,0 +1,91 @@
+import json
+import os
+
+from Manager.BulkActions import BulkJob, MOVE, COPY
+
+
+def make_files(folder, count):
+    os.makedirs(folder)
+    paths = []
+    for number in range(1, count + 1):
+        path = os.path.join(folder, f"f{number}.txt")
+        with open(path, 'w') as f:
+            f.write(str(number))
+        paths.append(path)
+    return paths
+
+
+def read_journal(journal_path):
+    with open(journal_path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_move_and_undo(tmp_path):
+    paths = make_files(tmp_path / 'src', 3)
+    journal_dir = tmp_path / 'journal'
+    job = BulkJob(MOVE, paths, str(tmp_path / 'dst'), str(journal_dir))
+    assert len(job.run()) == 3
+    assert not any(os.path.exists(path) for path in paths)
+
+    undone = BulkJob.undo(BulkJob.latest_journal(str(journal_dir)))
+    assert len(undone) == 3
+    assert all(os.path.exists(path) for path in paths)
+    assert BulkJob.latest_journal(str(journal_dir)) is None
+
+
+def test_copy_keeps_existing_files(tmp_path):
+    paths = make_files(tmp_path / 'src', 2)
+    target = tmp_path / 'dst'
+    target.mkdir()
+    (target / 'f1.txt').write_text('old')
+    job = BulkJob(COPY, paths, str(target))
+    job.run()
+    assert (target / 'f1.txt').read_text() == 'old'
+    assert (target / 'f1 (1).txt').read_text() == '1'
+
+
+def test_undo_failure_then_cancel_keeps_failed_entries(tmp_path):
+    paths = make_files(tmp_path / 'src', 5)
+    journal_dir = tmp_path / 'journal'
+    BulkJob(MOVE, paths, str(tmp_path / 'dst'), str(journal_dir)).run()
+    journal_path = BulkJob.latest_journal(str(journal_dir))
+
+    # f4 的原位置被占用，撤销失败；随后在处理 f3 之前取消
+    with open(paths[3], 'w') as f:
+        f.write('occupied')
+    calls = []
+
+    def should_stop():
+        calls.append(None)
+        return len(calls) >= 3
+
+    undone = BulkJob.undo(journal_path, should_stop)
+    assert [src for _, src, _ in undone] == [paths[4]]
+    assert [entry['src'] for entry in read_journal(journal_path)] == paths[:4]
+
+
+def test_latest_journal_orders_jobs_in_the_same_second(tmp_path):
+    journal_dir = str(tmp_path / 'journal')
+    first = BulkJob(MOVE, [], str(tmp_path), journal_dir)
+    open(first.journal_path, 'w').close()
+    second = BulkJob(COPY, [], str(tmp_path), journal_dir)
+    open(second.journal_path, 'w').close()
+    assert first.journal_path != second.journal_path
+    assert BulkJob.latest_journal(journal_dir) == second.journal_path
+
+
+def test_journal_written_as_each_file_completes(tmp_path):
+    paths = make_files(tmp_path / 'src', 3)
+    journal_dir = tmp_path / 'journal'
+    job = BulkJob(MOVE, paths, str(tmp_path / 'dst'), str(journal_dir))
+    seen = []
+
+    def should_stop():
+        # 每个文件执行前日志中已有此前完成的全部记录
+        journal_path = BulkJob.latest_journal(str(journal_dir))
+        seen.append(len(read_journal(journal_path)) if journal_path else 0)
+        return False
+
+    job.run(should_stop=should_stop)
+    assert seen == [0, 1, 2]
+    assert len(read_journal(job.journal_path)) == 3
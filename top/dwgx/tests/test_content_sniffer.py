@@ -0,0 +1,28 @@
+import struct
+
+from Manager.ContentSniffer import sniff_bytes, IMAGE, EXECUTABLE, TEXT
+
+
+def bmp_header(width=2, height=2):
+    pixels = width * height * 4
+    dib = struct.pack('<IiiHHIIiiII', 40, width, height, 1, 32, 0, pixels, 2835, 2835, 0, 0)
+    return b'BM' + struct.pack('<IHHI', 14 + len(dib) + pixels, 0, 0, 14 + len(dib)) + dib + b'\x00' * pixels
+
+
+def pe_header(pe_offset=0x80):
+    header = bytearray(b'MZ' + b'\x90' * (pe_offset - 2) + b'PE\x00\x00' + b'\x00' * 64)
+    header[60:64] = struct.pack('<I', pe_offset)
+    return bytes(header)
+
+
+def test_bmp_requires_dib_header():
+    assert sniff_bytes(bmp_header()) == ('image/bmp', IMAGE)
+    assert sniff_bytes(b'BMW service schedule\nOil change every 10000 km\n') == ('text/plain', TEXT)
+
+
+def test_pe_requires_pe_signature():
+    assert sniff_bytes(pe_header()) == ('application/vnd.microsoft.portable-executable', EXECUTABLE)
+    assert sniff_bytes(b'MZ notes: remember to update the changelog before the next release.\n') == \
+        ('text/plain', TEXT)
+    # e_lfanew 指向文件头之外或不是 PE 签名时同样不算可执行文件
+    assert sniff_bytes(pe_header()[:0x80])[1] != EXECUTABLE
@@ -0,0 +1,135 @@
+import os
+import shutil
+import time
+
+from Manager.FileIndex import FileIndex
+from Manager.FileScanner import FileScanner
+
+
+def make_tree(root):
+    for folder in ('a', os.path.join('a', 'b'), 'c'):
+        os.makedirs(os.path.join(root, folder))
+    for path in ('top.txt', os.path.join('a', 'x.py'), os.path.join('a', 'b', 'y.txt'), os.path.join('c', 'z.log')):
+        with open(os.path.join(root, path), 'w') as f:
+            f.write(path)
+    backdate(root)
+
+
+def backdate(root):
+    # 刚修改的目录处于“修改时间过近”窗口内，每次都会重新列出；提前修改时间才能测到读取索引的路径
+    past = time.time() - 60
+    for folder, _, _ in os.walk(root):
+        os.utime(folder, (past, past))
+
+
+def scan(index, root, **kwargs):
+    return {folder: sorted(files) for folder, files in index.iter_update(root, **kwargs)}
+
+
+def count_rescans(monkeypatch, index):
+    rescanned = []
+    original = index.store_listing
+
+    def store_listing(cursor, folder, entries, subdirs, known):
+        rescanned.append(folder)
+        return original(cursor, folder, entries, subdirs, known)
+
+    monkeypatch.setattr(index, 'store_listing', store_listing)
+    return rescanned
+
+
+def test_first_scan_matches_scanner(tmp_path):
+    root = str(tmp_path / 'tree')
+    make_tree(root)
+    with FileIndex(str(tmp_path / 'index.sqlite3')) as index:
+        indexed = scan(index, root)
+    scanned = {folder: sorted(files) for folder, files in FileScanner().scan(root).items()}
+    assert indexed == scanned
+
+
+def test_relative_root_yields_absolute_folders(tmp_path, monkeypatch):
+    make_tree(str(tmp_path / 'tree'))
+    monkeypatch.chdir(tmp_path)
+    with FileIndex(str(tmp_path / 'index.sqlite3')) as index:
+        folders = set(scan(index, 'tree/'))
+    assert folders == {str(tmp_path / 'tree'), str(tmp_path / 'tree' / 'a'), str(tmp_path / 'tree' / 'a' / 'b'),
+                       str(tmp_path / 'tree' / 'c')}
+
+
+def test_unchanged_folders_are_read_from_index(tmp_path, monkeypatch):
+    root = str(tmp_path / 'tree')
+    make_tree(root)
+    with FileIndex(str(tmp_path / 'index.sqlite3')) as index:
+        first = scan(index, root)
+        rescanned = count_rescans(monkeypatch, index)
+        assert scan(index, root) == first
+        assert rescanned == []
+
+        with open(os.path.join(root, 'a', 'new.txt'), 'w'):
+            pass
+        rescanned.clear()
+        result = scan(index, root)
+        assert rescanned == [os.path.join(root, 'a')]
+        assert os.path.join(root, 'a', 'new.txt') in result[os.path.join(root, 'a')]
+
+
+def test_removed_folder_is_dropped(tmp_path):
+    root = str(tmp_path / 'tree')
+    make_tree(root)
+    with FileIndex(str(tmp_path / 'index.sqlite3')) as index:
+        scan(index, root)
+        shutil.rmtree(os.path.join(root, 'a'))
+        result = scan(index, root)
+        assert set(result) == {root, os.path.join(root, 'c')}
+        assert {folder for folder, _ in index.iter_files(root)} == {root, os.path.join(root, 'c')}
+
+
+def test_filters_and_stat(tmp_path):
+    root = str(tmp_path / 'tree')
+    make_tree(root)
+    with FileIndex(str(tmp_path / 'index.sqlite3')) as index:
+        result = scan(index, root, filter_types='.TXT', with_stat=True)
+        assert sorted(os.path.basename(path) for files in result.values() for path, _, _ in files) == \
+            ['top.txt', 'y.txt']
+        assert [size for path, size, _ in result[root]] == [len('top.txt')]
+        # 筛选只影响产出，索引中仍保存全部文件
+        assert sum(len(files) for _, files in index.iter_files(root, exclude_types='.log')) == 3
+
+
+def test_in_place_edit_refreshes_stat(tmp_path, monkeypatch):
+    root = str(tmp_path / 'tree')
+    make_tree(root)
+    path = os.path.join(root, 'a', 'x.py')
+    with FileIndex(str(tmp_path / 'index.sqlite3')) as index:
+        scan(index, root, with_stat=True)
+        rescanned = count_rescans(monkeypatch, index)
+        with open(path, 'a') as f:
+            f.write('grown')
+        result = scan(index, root, with_stat=True)
+        assert rescanned == []
+        assert dict((p, size) for p, size, _ in result[os.path.join(root, 'a')])[path] == len('a/x.py') + 5
+        sizes = {p: size for _, files in index.iter_files(root, with_stat=True) for p, size, _ in files}
+        assert sizes[path] == len('a/x.py') + 5
+
+
+def test_failed_listing_is_retried(tmp_path, monkeypatch):
+    root = str(tmp_path / 'tree')
+    make_tree(root)
+    broken = os.path.join(root, 'a')
+    original = FileScanner.list_directory
+
+    def list_directory(self, folder):
+        if folder == broken:
+            raise PermissionError(folder)
+        return original(self, folder)
+
+    with FileIndex(str(tmp_path / 'index.sqlite3')) as index:
+        monkeypatch.setattr(FileScanner, 'list_directory', list_directory)
+        assert broken not in scan(index, root)
+        mtime_ns, = index.connection.execute("SELECT mtime_ns FROM dirs WHERE path = ?", (broken,)).fetchone()
+        assert mtime_ns == -1
+
+        monkeypatch.setattr(FileScanner, 'list_directory', original)
+        result = scan(index, root)
+        assert result[broken] == [os.path.join(broken, 'x.py')]
+        assert os.path.join(broken, 'b') in result
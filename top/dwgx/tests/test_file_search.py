@@ -0,0 +1,82 @@
+import os
+import re
+
+import pytest
+
+from Manager import ClassifierEngine
+from Manager.FileSearchIndex import FileSearchIndex, SUBSTRING, GLOB, REGEX, glob_literals
+from Manager.ScanResultStore import ScanResultStore
+
+FOLDER = os.path.join('root', 'docs')
+NAMES = ['ab.txt', 'cd.txt', 'Report_2024.TXT', 'adef', 'bdef', 'xdef', 'notes.md']
+FILE_DICT = {FOLDER: [os.path.join(FOLDER, name) for name in NAMES]}
+
+
+def make_store():
+    store = ScanResultStore()
+    for folder, files in FILE_DICT.items():
+        store.add_folder(folder, files)
+    return store
+
+
+def names(result):
+    return sorted(os.path.basename(path) for files in result.values() for path in files)
+
+
+def search_both(query, mode):
+    # 索引搜索与逐个匹配的结果必须一致
+    indexed = names(FileSearchIndex(make_store()).search(query, mode))
+    assert names(ClassifierEngine.search_files(FILE_DICT, query, mode)) == indexed
+    return indexed
+
+
+@pytest.mark.parametrize('query, mode, expected', [
+    ('def', SUBSTRING, ['adef', 'bdef', 'xdef']),
+    ('REPORT', SUBSTRING, ['Report_2024.TXT']),
+    ('*.txt', GLOB, ['Report_2024.TXT', 'ab.txt', 'cd.txt']),
+    ('[abc]def', GLOB, ['adef', 'bdef']),
+    ('[!abc]def', GLOB, ['xdef']),
+    ('report_*', GLOB, ['Report_2024.TXT']),
+    (r'^\D+\.txt$', REGEX, ['ab.txt', 'cd.txt']),
+    (r'\d', REGEX, ['Report_2024.TXT']),
+    (r'txt\Z', REGEX, ['Report_2024.TXT', 'ab.txt', 'cd.txt']),
+    (r'\W', REGEX, ['Report_2024.TXT', 'ab.txt', 'cd.txt', 'notes.md']),
+    ('[^.]+', REGEX, sorted(NAMES)),
+    ('^[a-c]', REGEX, ['ab.txt', 'adef', 'bdef', 'cd.txt']),
+])
+def test_search_modes(query, mode, expected):
+    assert search_both(query, mode) == expected
+
+
+def test_invalid_regex_raises():
+    with pytest.raises(re.error):
+        FileSearchIndex(make_store()).search('(', REGEX)
+    with pytest.raises(re.error):
+        ClassifierEngine.compile_matcher('(', REGEX)
+
+
+def test_glob_literals_skip_bracket_expressions():
+    assert glob_literals('[abc]def') == ['', 'def']
+    assert glob_literals('[!abc]def*.py') == ['', 'def', '.py']
+    assert glob_literals('a[b') == ['a[b']
+
+
+def test_index_follows_store_changes():
+    store = make_store()
+    index = FileSearchIndex(store)
+    store.remove(os.path.join(FOLDER, 'adef'))
+    assert names(index.search('def', SUBSTRING)) == ['bdef', 'xdef']
+    store.add(os.path.join(FOLDER, 'ydef'))
+    index.sync()
+    assert names(index.search('?def', GLOB)) == ['bdef', 'xdef', 'ydef']
+    assert len(index) == len(NAMES)
+    store.remove_tree('root')
+    assert index.search('def', SUBSTRING) == {}
+
+
+def test_interrupted_build_resumes():
+    store = make_store()
+    index = FileSearchIndex(store, should_stop=lambda: True)
+    assert index.count == 0
+    assert index.sync()
+    assert names(index.search('def', SUBSTRING)) == ['adef', 'bdef', 'xdef']
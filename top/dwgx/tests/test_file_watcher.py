@@ -0,0 +1,38 @@
+import os
+import sys
+
+import pytest
+
+from Manager.FileWatcher import (FileWatcher, InotifyBackend, PollingBackend, CREATED, DELETED, DIR_DELETED, RESYNC,
+                                 EVENT_HEADER, IN_Q_OVERFLOW)
+
+
+def make_watcher(root):
+    events = []
+    return FileWatcher(str(root), lambda event, path: events.append((event, path))), events
+
+
+def test_polling_reports_changes(tmp_path):
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'old.txt').write_text('x')
+    watcher, events = make_watcher(tmp_path)
+    backend = PollingBackend(watcher)
+
+    (tmp_path / 'old.txt').unlink()
+    (tmp_path / 'new.txt').write_text('x')
+    (tmp_path / 'sub').rmdir()
+    os.utime(tmp_path, ns=(0, 0))  # 保证目录修改时间与快照不同
+    backend.poll()
+    assert sorted(events) == [(CREATED, str(tmp_path / 'new.txt')), (DELETED, str(tmp_path / 'old.txt')),
+                              (DIR_DELETED, str(tmp_path / 'sub'))]
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="inotify 仅在 Linux 上可用")
+def test_inotify_overflow_requests_resync(tmp_path):
+    watcher, events = make_watcher(tmp_path)
+    backend = InotifyBackend(watcher)
+    try:
+        backend.handle(EVENT_HEADER.pack(-1, IN_Q_OVERFLOW, 0, 0))
+    finally:
+        os.close(backend.fd)
+    assert events == [(RESYNC, str(tmp_path))]
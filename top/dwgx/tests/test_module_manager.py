@@ -0,0 +1,70 @@
+import ast
+import json
+import os
+
+from Manager.ModuleManager import ModuleManager, find_widget_class
+
+MODULES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Modules')
+
+
+def parse(source):
+    return ast.parse(source)
+
+
+def test_file_classifier_tool_resolves_to_app():
+    path = os.path.join(MODULES_DIR, 'FileClassifierTool.py')
+    with open(path, 'rb') as f:
+        tree = ast.parse(f.read(), filename=path)
+    class_name, _ = find_widget_class(tree, 'FileClassifierTool')
+    assert class_name == 'FileClassifierApp'
+
+
+def test_prefers_class_named_after_module():
+    tree = parse(
+        "from PySide6.QtWidgets import QWidget\n"
+        "class Alpha(QWidget): pass\n"
+        "class Tool(QWidget): pass\n"
+    )
+    assert find_widget_class(tree, 'Tool')[0] == 'Tool'
+    assert find_widget_class(tree)[0] == 'Alpha'
+
+
+def test_dialogs_are_not_picked_over_pages():
+    tree = parse(
+        "from PySide6.QtWidgets import QDialog, QMainWindow\n"
+        "class BaseDialog(QDialog): pass\n"
+        "class AboutBox(BaseDialog): pass\n"
+        "class ZMain(QMainWindow): pass\n"
+    )
+    assert find_widget_class(tree)[0] == 'ZMain'
+
+
+def test_dialog_only_module_still_resolves():
+    tree = parse("from PySide6.QtWidgets import QDialog\nclass Picker(QDialog): pass\n")
+    assert find_widget_class(tree)[0] == 'Picker'
+
+
+def make_modules(tmp_path):
+    modules = tmp_path / 'Modules'
+    modules.mkdir()
+    (modules / 'Tool.py').write_text("from PySide6.QtWidgets import QWidget\nclass Tool(QWidget): pass\n")
+    return modules
+
+
+def test_corrupt_cache_is_treated_as_empty(tmp_path):
+    modules = make_modules(tmp_path)
+    cache_file = tmp_path / 'module_cache.json'
+    broken_entry = json.dumps({'version': 2, 'modules': {str(modules / 'Tool.py'): {'size': 1}}})
+    for content in ('{"version": 2, "modu', broken_entry):
+        cache_file.write_text(content)
+        manager = ModuleManager(str(modules), str(cache_file))
+        assert [module.class_name for module in manager.get_modules()] == ['Tool']
+
+
+def test_cache_is_replaced_atomically(tmp_path):
+    modules = make_modules(tmp_path)
+    cache_file = tmp_path / 'module_cache.json'
+    ModuleManager(str(modules), str(cache_file))
+    with open(cache_file, encoding='utf-8') as f:
+        assert list(json.load(f)['modules']) == [str(modules / 'Tool.py')]
+    assert sorted(os.listdir(tmp_path)) == ['Modules', 'module_cache.json']
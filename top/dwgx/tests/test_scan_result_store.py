@@ -0,0 +1,24 @@
+import os
+
+from Manager.ScanResultStore import ScanResultStore
+
+FOLDER = os.path.join('root', 'a')
+
+
+def make_store():
+    store = ScanResultStore()
+    store.add_folder(FOLDER, [(os.path.join(FOLDER, 'x.txt'), 10, 1.0), (os.path.join(FOLDER, 'y.py'), 20, 2.0)])
+    return store
+
+
+def test_snapshot_is_independent():
+    store = make_store()
+    snapshot = store.snapshot()
+    store.remove(os.path.join(FOLDER, 'x.txt'))
+    store.add(os.path.join('root', 'b', 'z.txt'), 30, 3.0)
+    assert list(snapshot.iter_entries()) == [(os.path.join(FOLDER, 'x.txt'), 10, 1.0),
+                                             (os.path.join(FOLDER, 'y.py'), 20, 2.0)]
+    assert snapshot.file_count() == 2
+    assert list(snapshot.keys()) == [FOLDER]
+    assert store.file_count() == 2
+    assert store.size_by_extension() == {'.py': 20, '.txt': 30}
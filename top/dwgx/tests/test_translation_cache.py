@@ -0,0 +1,55 @@
+import time
+
+from utils.TranslationCache import TranslationCache, normalize_text
+
+
+def test_normalize_text():
+    assert normalize_text(' 你好\r\n世界 ') == '你好\n世界'
+    assert normalize_text('é') == 'é'
+
+
+def test_memory_hits_and_lru_eviction():
+    cache = TranslationCache(max_entries=2)
+    cache.put('a', 'auto', 'en', 'A')
+    cache.put('b', 'auto', 'en', 'B')
+    assert cache.get('a ', 'auto', 'en') == 'A'  # 首尾空白不影响命中，同时 a 成为最近使用
+    cache.put('c', 'auto', 'en', 'C')
+    assert cache.get('b', 'auto', 'en') is None
+    assert cache.get('a', 'auto', 'en') == 'A'
+    assert cache.get('a', 'auto', 'ja') is None
+    assert (cache.memory_hits, cache.disk_hits, cache.misses) == (2, 0, 2)
+
+
+def test_disk_cache_survives_restart(tmp_path):
+    db_path = str(tmp_path / 'cache.sqlite3')
+    cache = TranslationCache(db_path)
+    cache.put('hello', 'auto', 'zh', '你好')
+    cache.close()
+
+    cache = TranslationCache(db_path)
+    assert cache.get('hello', 'auto', 'zh') == '你好'
+    assert cache.disk_hits == 1
+    cache.close()
+
+
+def test_expired_entries_are_ignored_and_purged(tmp_path, monkeypatch):
+    db_path = str(tmp_path / 'cache.sqlite3')
+    cache = TranslationCache(db_path, ttl_seconds=60)
+    cache.put('hello', 'auto', 'zh', '你好')
+    cache.close()
+
+    later = time.time() + 120
+    monkeypatch.setattr(time, 'time', lambda: later)
+    cache = TranslationCache(db_path, ttl_seconds=60)
+    assert cache.get('hello', 'auto', 'zh') is None
+    assert cache.connection.execute("SELECT COUNT(*) FROM translations").fetchone()[0] == 0
+    cache.close()
+
+
+def test_close_falls_back_to_memory(tmp_path):
+    cache = TranslationCache(str(tmp_path / 'cache.sqlite3'))
+    cache.close()
+    cache.close()
+    cache.put('hello', 'auto', 'zh', '你好')
+    assert cache.get('hello', 'auto', 'zh') == '你好'
+    assert cache.memory_hits == 1
@@ -0,0 +1,93 @@
+import logging
+
+import pytest
+
+pytest.importorskip("tencentcloud")
+
+from utils import Translationcore  # noqa: E402
+from utils.TranslationCache import TranslationCache  # noqa: E402
+
+logger = logging.getLogger("test")
+
+
+class FakeConfig:
+    def __init__(self, values=None):
+        self.values = values or {}
+        self.subscribers = []
+
+    def get(self, section, option, default=None):
+        return self.values.get(option, default)
+
+    def subscribe(self, section, option, callback):
+        self.subscribers.append((option, callback))
+
+
+def test_cached_translation_does_not_need_keys():
+    cache = TranslationCache()
+    cache.put('hello', 'auto', 'zh', '你好')
+    assert Translationcore.perform_translation('hello', 'zh', FakeConfig(), logger, cache) == '你好'
+    assert Translationcore.perform_translation('other', 'zh', FakeConfig(), logger, cache).startswith("翻译错误")
+
+
+def make_pool(monkeypatch, **kwargs):
+    pool = Translationcore.TmtClientPool(**kwargs)
+    created = []
+
+    def create_client(secret_id, secret_key, region):
+        client = (secret_id, secret_key, region, len(created))
+        created.append(client)
+        return client
+
+    monkeypatch.setattr(pool, 'create_client', create_client)
+    return pool, created
+
+
+def test_pool_reuses_returned_clients(monkeypatch):
+    pool, created = make_pool(monkeypatch)
+    with pool.client('id', 'key') as first:
+        pass
+    with pool.client('id', 'key') as second:
+        assert second is first
+    with pool.client('id', 'other') as third:
+        assert third is not first
+    assert len(created) == 2
+
+
+def test_pool_lends_each_client_to_one_user(monkeypatch):
+    pool, created = make_pool(monkeypatch, max_idle=1)
+    with pool.client('id', 'key') as first:
+        with pool.client('id', 'key') as second:
+            assert second is not first
+    # 空闲列表已满，第二个归还的客户端被丢弃
+    assert pool.idle[('id', 'key', Translationcore.DEFAULT_REGION)] == [second]
+
+
+def test_pool_drops_failed_clients(monkeypatch):
+    pool, created = make_pool(monkeypatch)
+    with pytest.raises(RuntimeError):
+        with pool.client('id', 'key'):
+            raise RuntimeError("连接断开")
+    with pool.client('id', 'key'):
+        pass
+    assert len(created) == 2
+
+
+def test_clear_discards_clients_in_use(monkeypatch):
+    pool, created = make_pool(monkeypatch)
+    with pool.client('id', 'key'):
+        pool.clear()
+    with pool.client('id', 'key'):
+        pass
+    assert len(created) == 2
+
+
+def test_watch_clears_pool_on_key_change(monkeypatch):
+    pool, created = make_pool(monkeypatch)
+    config = FakeConfig()
+    pool.watch(config)
+    pool.watch(config)
+    assert sorted(option for option, _ in config.subscribers) == ['SECRET_ID', 'SECRET_KEY']
+    with pool.client('id', 'key'):
+        pass
+    config.subscribers[0][1]('new', 'old')
+    assert pool.idle == {}
@@ -0,0 +1,92 @@
+# top/dwgx/utils/DiskUsageDialog.py
+
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QIcon
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTabWidget, QTableWidget, QTableWidgetItem,
+    QHeaderView, QFileDialog, QMessageBox
+)
+
+from Manager.ScanResultStore import format_size
+
+
+class SortableItem(QTableWidgetItem):
+    # 显示格式化后的文字，按 UserRole 中的原始数值排序
+    def __init__(self, text, value):
+        super().__init__(text)
+        self.setData(Qt.ItemDataRole.UserRole, value)
+        self.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+
+    def __lt__(self, other):
+        return self.data(Qt.ItemDataRole.UserRole) < other.data(Qt.ItemDataRole.UserRole)
+
+
+class DiskUsageDialog(QDialog):
+    def __init__(self, report, folder_limit=1000):
+        super().__init__()
+        self.report = report
+        self.setWindowTitle(f"磁盘占用统计 - {report.root}")
+        self.resize(900, 600)
+        layout = QVBoxLayout(self)
+
+        tabs = QTabWidget()
+        folders = report.largest_folders(folder_limit)
+        self.folder_table = self.create_table(["文件夹", "大小", "文件数", "主要类型"], len(folders))
+        for row, usage in enumerate(folders):
+            top_ext = max(usage.extensions.items(), key=lambda item: item[1][1])[0] if usage.extensions else None
+            self.folder_table.setItem(row, 0, QTableWidgetItem(usage.path))
+            self.folder_table.setItem(row, 1, SortableItem(format_size(usage.size), usage.size))
+            self.folder_table.setItem(row, 2, SortableItem(str(usage.file_count), usage.file_count))
+            self.folder_table.setItem(row, 3, QTableWidgetItem("" if top_ext is None else top_ext or "(无扩展名)"))
+        self.folder_table.setSortingEnabled(True)
+        self.folder_table.sortItems(1, Qt.SortOrder.DescendingOrder)
+        tabs.addTab(self.folder_table, "最大的文件夹")
+
+        extensions = report.largest_extensions()
+        total_size = sum(size for _, (_, size) in extensions) or 1
+        self.extension_table = self.create_table(["扩展名", "大小", "文件数", "占比"], len(extensions))
+        for row, (ext, (count, size)) in enumerate(extensions):
+            self.extension_table.setItem(row, 0, QTableWidgetItem(ext or "(无扩展名)"))
+            self.extension_table.setItem(row, 1, SortableItem(format_size(size), size))
+            self.extension_table.setItem(row, 2, SortableItem(str(count), count))
+            self.extension_table.setItem(row, 3, SortableItem(f"{size / total_size:.1%}", size))
+        self.extension_table.setSortingEnabled(True)
+        self.extension_table.sortItems(1, Qt.SortOrder.DescendingOrder)
+        tabs.addTab(self.extension_table, "最大的扩展名")
+        layout.addWidget(tabs)
+
+        button_layout = QHBoxLayout()
+        summary = report.folders.get(report.root)
+        if summary is not None:
+            button_layout.addWidget(QLabel(f"共 {summary.file_count} 个文件，{format_size(summary.size)}"))
+        button_layout.addStretch()
+        export_button = QPushButton("导出报告")
+        export_button.setIcon(QIcon.fromTheme("document-save"))
+        export_button.clicked.connect(self.export_report)
+        button_layout.addWidget(export_button)
+        layout.addLayout(button_layout)
+
+    @staticmethod
+    def create_table(headers, rows):
+        table = QTableWidget(rows, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        return table
+
+    def export_report(self):
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self, "导出报告", "disk_usage.csv", "CSV 文件 (*.csv);;JSON 文件 (*.json)")
+        if not file_path:
+            return
+        try:
+            if file_path.lower().endswith('.json') or ('json' in selected_filter.lower() and
+                                                       not file_path.lower().endswith('.csv')):
+                self.report.export_json(file_path)
+            else:
+                self.report.export_csv(file_path)
+        except OSError as e:
+            QMessageBox.critical(self, "错误", f"导出报告失败: {e}")
+            return
+        QMessageBox.information(self, "导出完成", f"报告已保存到 {file_path}")
@@ -0,0 +1,76 @@
+# top/dwgx/utils/ResultView.py
+
+from collections import deque
+
+from PySide6.QtCore import QTimer
+from PySide6.QtGui import QTextCursor
+from PySide6.QtWidgets import QPlainTextEdit
+
+from Manager import ClassifierEngine
+
+
+class ResultView(QPlainTextEdit):
+    """
+    扫描结果的纯文本视图：结果按块追加，每轮事件循环只写入一块，大量结果不会让界面长时间无响应；
+    显示超过 max_lines 行后不再追加，提示使用搜索或文件树查看其余结果。
+    """
+
+    def __init__(self, max_lines=200000, chunk_lines=5000):
+        super().__init__()
+        self.setReadOnly(True)
+        self.max_lines = max_lines
+        self.chunk_lines = chunk_lines
+        self.line_count = 0
+        self.truncated = False
+        self.pending = deque()  # 待写入的结果块生成器
+        self.write_timer = QTimer(self)
+        self.write_timer.setInterval(0)
+        self.write_timer.timeout.connect(self.write_next_chunk)
+
+    def clear_results(self):
+        self.write_timer.stop()
+        self.pending.clear()
+        self.line_count = 0
+        self.truncated = False
+        self.clear()
+
+    def show_results(self, file_dict):
+        self.clear_results()
+        self.append_results(file_dict)
+
+    def append_results(self, file_dict):
+        if file_dict:
+            # 结果块在之后的事件循环中才生成，期间 file_dict 可能被文件变化修改，先取快照：
+            # 列表复制一份，PathSequence 只引用当时的文件 id，文件夹顺序也固定下来
+            snapshot = {folder: list(files) if isinstance(files, list) else files for folder, files in file_dict.items()}
+            self.append_chunks(ClassifierEngine.iter_display_chunks(snapshot, self.chunk_lines))
+
+    def show_chunks(self, chunks):
+        self.clear_results()
+        self.append_chunks(chunks)
+
+    def append_chunks(self, chunks):
+        # chunks 为以换行结尾的文本块迭代器，按需逐块取出
+        if self.truncated:
+            return
+        self.pending.append(iter(chunks))
+        if not self.write_timer.isActive():
+            self.write_timer.start()
+
+    def write_next_chunk(self):
+        while self.pending:
+            chunk = next(self.pending[0], None)
+            if chunk is None:
+                self.pending.popleft()
+                continue
+            if self.line_count >= self.max_lines:
+                self.truncated = True
+                self.pending.clear()
+                chunk = f"……结果过多，仅显示前 {self.line_count} 行，请使用搜索缩小范围\n"
+            else:
+                self.line_count += chunk.count("\n")
+            cursor = self.textCursor()
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            cursor.insertText(chunk)
+            return
+        self.write_timer.stop()
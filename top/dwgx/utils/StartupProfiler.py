@@ -0,0 +1,120 @@
+# top/dwgx/utils/StartupProfiler.py
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from PySide6.QtCore import QObject, QEvent
+
+# 设置环境变量或命令行参数后，启动时间线以 Chrome Trace 格式写入文件（可在 chrome://tracing 或 Perfetto 中查看）
+TRACE_ENV_VAR = 'TOOLBOX_STARTUP_TRACE'
+TRACE_CLI_FLAG = '--startup-trace'
+DEFAULT_TRACE_FILE = 'startup_trace.json'
+# 环境变量取这些值时按开关处理，其他值作为输出文件名
+TRACE_OFF_VALUES = ('', '0', 'false', 'no', 'off')
+TRACE_ON_VALUES = ('1', 'true', 'yes', 'on')
+
+logger = logging.getLogger("StartupProfiler")
+
+
+class StartupProfiler:
+    def __init__(self):
+        self.enabled = False
+        self.output_path = None
+        self.origin_ns = time.perf_counter_ns()
+        self.events = []
+        self.lock = threading.Lock()
+        self.written = False
+
+    def configure(self, argv):
+        """
+        根据环境变量或命令行参数启用性能记录，返回去除性能参数后的命令行参数。
+        """
+        argv = list(argv)
+        output_path = os.environ.get(TRACE_ENV_VAR, '').strip()
+        if output_path.lower() in TRACE_OFF_VALUES:
+            output_path = None
+        elif output_path.lower() in TRACE_ON_VALUES:
+            output_path = DEFAULT_TRACE_FILE
+        for index, arg in enumerate(argv):
+            if arg == TRACE_CLI_FLAG:
+                has_value = index + 1 < len(argv) and not argv[index + 1].startswith('-')
+                output_path = argv[index + 1] if has_value else DEFAULT_TRACE_FILE
+                del argv[index:index + (2 if has_value else 1)]
+                break
+            if arg.startswith(TRACE_CLI_FLAG + '='):
+                output_path = arg.split('=', 1)[1] or DEFAULT_TRACE_FILE
+                del argv[index]
+                break
+
+        if output_path:
+            self.enabled = True
+            self.output_path = os.path.abspath(output_path)
+            atexit.register(self.write)
+            logger.info(f"启动性能记录已启用，输出文件: {self.output_path}")
+        return argv
+
+    def now_us(self):
+        return (time.perf_counter_ns() - self.origin_ns) / 1000
+
+    @contextmanager
+    def span(self, name, category='startup', **args):
+        if not self.enabled:
+            yield
+            return
+        start = self.now_us()
+        try:
+            yield
+        finally:
+            self.add_event({
+                'name': name, 'cat': category, 'ph': 'X',
+                'ts': start, 'dur': self.now_us() - start, 'args': args,
+            })
+
+    def mark(self, name, category='startup', **args):
+        if self.enabled:
+            self.add_event({'name': name, 'cat': category, 'ph': 'i', 's': 'p', 'ts': self.now_us(), 'args': args})
+
+    def add_event(self, event):
+        event['pid'] = os.getpid()
+        event['tid'] = threading.get_ident()
+        with self.lock:
+            self.events.append(event)
+
+    def watch_first_paint(self, widget):
+        # 首次绘制时记录时间点并写出时间线
+        if self.enabled:
+            widget.installEventFilter(FirstPaintFilter(self, widget))
+
+    def write(self):
+        if not self.enabled or self.written:
+            return
+        with self.lock:
+            trace = {'traceEvents': list(self.events), 'displayTimeUnit': 'ms'}
+        try:
+            with open(self.output_path, 'w', encoding='utf-8') as file:
+                json.dump(trace, file, ensure_ascii=False)
+            self.written = True
+            logger.info(f"启动时间线已写入: {self.output_path} ({len(trace['traceEvents'])} 个事件)")
+        except Exception as e:
+            logger.error(f"写入启动时间线失败: {e}")
+
+
+class FirstPaintFilter(QObject):
+    def __init__(self, profiler, widget):
+        super().__init__(widget)
+        self.profiler = profiler
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint:
+            obj.removeEventFilter(self)
+            self.profiler.mark('first_paint', widget=type(obj).__name__)
+            self.profiler.write()
+        return super().eventFilter(obj, event)
+
+
+startup_profiler = StartupProfiler()
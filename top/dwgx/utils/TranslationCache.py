@@ -0,0 +1,120 @@
+# top/dwgx/utils/TranslationCache.py
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+logger = logging.getLogger("TranslationCache")
+
+
+def normalize_text(text):
+    # 统一 Unicode 组合形式、换行符和首尾空白，同一段文字从不同来源复制时也能命中
+    return unicodedata.normalize('NFC', text).replace('\r\n', '\n').replace('\r', '\n').strip()
+
+
+class TranslationCache:
+    """
+    两级翻译缓存：内存中按最近使用保留 max_entries 条，SQLite 中保存 ttl_seconds 内的全部结果，重启后仍可命中。
+    键为 (规范化后的原文, 源语言, 目标语言)，只缓存翻译成功的结果。可在多个翻译线程中同时使用。
+    """
+
+    def __init__(self, db_path=None, max_entries=1000, ttl_seconds=30 * 24 * 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.memory = OrderedDict()  # 键 -> 译文，末尾为最近使用
+        self.lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.connection = None
+        if db_path:
+            try:
+                self.connection = sqlite3.connect(db_path, check_same_thread=False)
+                self.connection.execute(
+                    "CREATE TABLE IF NOT EXISTS translations ("
+                    "key TEXT PRIMARY KEY, source TEXT, target TEXT, text TEXT, translation TEXT, created REAL)")
+                self.purge_expired()
+            except sqlite3.Error as e:
+                # 磁盘缓存不可用时只使用内存缓存
+                logger.error(f"打开翻译缓存 {db_path} 失败: {e}")
+                self.connection = None
+
+    @staticmethod
+    def make_key(text, source, target):
+        # 原文可能很长，磁盘中以哈希作为主键
+        return hashlib.sha256(f"{source}\0{target}\0{normalize_text(text)}".encode('utf-8')).hexdigest()
+
+    def get(self, text, source, target):
+        key = self.make_key(text, source, target)
+        with self.lock:
+            translation = self.memory.get(key)
+            if translation is not None:
+                self.memory.move_to_end(key)
+                self.memory_hits += 1
+                return translation
+            translation = self.load(key)
+            if translation is not None:
+                self.remember(key, translation)
+                self.disk_hits += 1
+                return translation
+            self.misses += 1
+            return None
+
+    def put(self, text, source, target, translation):
+        key = self.make_key(text, source, target)
+        with self.lock:
+            self.remember(key, translation)
+            if self.connection is None:
+                return
+            try:
+                with self.connection:
+                    self.connection.execute(
+                        "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?)",
+                        (key, source, target, normalize_text(text), translation, time.time()))
+            except sqlite3.Error as e:
+                logger.error(f"写入翻译缓存失败: {e}")
+
+    def remember(self, key, translation):
+        self.memory[key] = translation
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def load(self, key):
+        if self.connection is None:
+            return None
+        try:
+            row = self.connection.execute(
+                "SELECT translation, created FROM translations WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"读取翻译缓存失败: {e}")
+            return None
+        if row is None:
+            return None
+        if time.time() - row[1] > self.ttl_seconds:
+            return None  # 过期记录在下次启动时清理
+        return row[0]
+
+    def purge_expired(self):
+        with self.connection:
+            removed = self.connection.execute(
+                "DELETE FROM translations WHERE created < ?", (time.time() - self.ttl_seconds,)).rowcount
+        if removed:
+            logger.info(f"已清理 {removed} 条过期的翻译缓存")
+
+    def stats_text(self):
+        total = self.memory_hits + self.disk_hits + self.misses
+        hit_rate = (self.memory_hits + self.disk_hits) / total if total else 0.0
+        return (f"翻译缓存: 内存命中 {self.memory_hits}，磁盘命中 {self.disk_hits}，未命中 {self.misses}，"
+                f"命中率 {hit_rate:.0%}")
+
+    def close(self):
+        # 关闭后仍可使用，只是退回到仅内存缓存
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
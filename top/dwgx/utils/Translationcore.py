@@ -1,5 +1,8 @@
 # utils/Translationcore.py
 
+import threading
+from contextlib import contextmanager
+
 from tencentcloud.common import credential
 from tencentcloud.common.exception.tencent_cloud_sdk_exception import TencentCloudSDKException
 from tencentcloud.common.profile.client_profile import ClientProfile
@@ -27,7 +30,83 @@ SUPPORTED_LANGUAGES = {
 }
 
 
-def perform_translation(text, target_lang, config_manager, logger):
+TMT_ENDPOINT = "tmt.tencentcloudapi.com"
+DEFAULT_REGION = "ap-guangzhou"
+
+
+class TmtClientPool:
+    """
+    按 (SECRET_ID, SECRET_KEY, 地域) 复用 TmtClient：客户端开启 keepAlive，连接在多次翻译间保持，省去每次的 TLS 握手和对象创建。
+    每个客户端同一时间只借给一个线程；密钥修改后 clear() 丢弃全部旧客户端，仍在使用中的归还时直接丢弃。
+    """
+
+    def __init__(self, max_idle=4):
+        self.max_idle = max_idle  # 每组密钥最多保留的空闲客户端数，与翻译线程数相当即可
+        self.idle = {}  # (SECRET_ID, SECRET_KEY, 地域) -> [TmtClient, ...]
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.watched = set()
+
+    @staticmethod
+    def create_client(secret_id, secret_key, region):
+        cred = credential.Credential(secret_id, secret_key)
+        http_profile = HttpProfile()
+        http_profile.endpoint = TMT_ENDPOINT
+        http_profile.keepAlive = True
+        client_profile = ClientProfile()
+        client_profile.httpProfile = http_profile
+        return tmt_client.TmtClient(cred, region, client_profile)
+
+    @contextmanager
+    def client(self, secret_id, secret_key, region=DEFAULT_REGION):
+        key = (secret_id, secret_key, region)
+        with self.lock:
+            idle = self.idle.get(key)
+            client = idle.pop() if idle else None
+            generation = self.generation
+        if client is None:
+            client = self.create_client(secret_id, secret_key, region)
+        # 请求出错的客户端连接可能已断开，不再放回
+        yield client
+        with self.lock:
+            idle = self.idle.setdefault(key, [])
+            if generation == self.generation and len(idle) < self.max_idle:
+                idle.append(client)
+
+    def clear(self):
+        with self.lock:
+            self.idle.clear()
+            self.generation += 1
+
+    def watch(self, config_manager):
+        """
+        订阅 SECRET_ID / SECRET_KEY 的修改，修改后丢弃旧客户端，下次翻译时用新密钥重建。
+        """
+        if id(config_manager) in self.watched:
+            return
+        self.watched.add(id(config_manager))
+        for option in ("SECRET_ID", "SECRET_KEY"):
+            config_manager.subscribe("translation", option, lambda _, __: self.clear())
+
+
+client_pool = TmtClientPool()
+
+
+def perform_translation(text, target_lang, config_manager, logger, cache=None):
+    """
+    调用腾讯云机器翻译，失败时返回以“翻译错误”开头的提示。传入 cache（TranslationCache）时先查缓存，成功的结果写回缓存。
+    """
+    if target_lang not in SUPPORTED_LANGUAGES:
+        logger.error(f"不支持的目标语言代码: {target_lang}")
+        return f"翻译错误: 不支持的目标语言代码 '{target_lang}'。"
+
+    # 先查缓存：密钥未设置或正在修改时，已缓存的译文仍可使用
+    if cache is not None:
+        translation = cache.get(text, "auto", target_lang)
+        if translation is not None:
+            logger.info(f"命中翻译缓存: '{translation}'")
+            return translation
+
     secret_id = config_manager.get("translation", "SECRET_ID", "")
     secret_key = config_manager.get("translation", "SECRET_KEY", "")
 
@@ -35,26 +114,19 @@ def perform_translation(text, target_lang, config_manager, logger):
         logger.error("API密钥未设置。请通过设置界面输入并保存API密钥。")
         return "翻译错误: API密钥未设置。"
 
-    if target_lang not in SUPPORTED_LANGUAGES:
-        logger.error(f"不支持的目标语言代码: {target_lang}")
-        return f"翻译错误: 不支持的目标语言代码 '{target_lang}'。"
-
     logger.info(f"开始翻译: '{text}'")
     try:
-        cred = credential.Credential(secret_id, secret_key)
-        http_profile = HttpProfile()
-        http_profile.endpoint = "tmt.tencentcloudapi.com"
-        client_profile = ClientProfile()
-        client_profile.httpProfile = http_profile
-        client = tmt_client.TmtClient(cred, "ap-guangzhou", client_profile)
         req = models.TextTranslateRequest()
         req.SourceText = text
         req.Source = "auto"
         req.Target = target_lang
         req.ProjectId = 0
-        resp = client.TextTranslate(req)
+        with client_pool.client(secret_id, secret_key) as client:
+            resp = client.TextTranslate(req)
         translation = resp.TargetText
         logger.info(f"翻译成功: '{translation}'")
+        if cache is not None:
+            cache.put(text, "auto", target_lang, translation)
         return translation
     except TencentCloudSDKException as e:
         logger.error(f"翻译错误: {str(e)}")